@@ -1,7 +1,6 @@
+import argparse
 from datetime import datetime
 
-from rich.console import Console
-
 from scheduling.models.employee import Employee
 from scheduling.models.preferences.prefer_period import PreferPeriodPreference
 from scheduling.models.preferences.prefer_shift import PreferShiftPreference
@@ -12,8 +11,13 @@ from scheduling.solver.scheduler import Scheduler
 
 
 def main():
-    console = Console()
-    console.print("\n[bold blue]Bar Employee Scheduler[/]\n")
+    parser = argparse.ArgumentParser(description="Solve a small example schedule.")
+    parser.add_argument("--mode", choices=["rich", "plain", "tsv"], default="rich")
+    parser.add_argument("--top", type=int, help="print only the best N solutions")
+    parser.add_argument("--diff", action="store_true", help="print changes from the best")
+    parser.add_argument("--page-size", type=int, help="shifts per page")
+    parser.add_argument("--page", type=int, default=1)
+    args = parser.parse_args()
 
     employees = [
         Employee(
@@ -84,13 +88,29 @@ def main():
         ),
     ]
 
-    print_input_summary(employees, shifts, console)
+    console = None
+    if args.mode == "rich":
+        from rich.console import Console
+
+        console = Console()
+        console.print("\n[bold blue]Bar Employee Scheduler[/]\n")
+
+    print_input_summary(employees, shifts, console, mode=args.mode)
 
-    console.print("[bold]Solving...[/]\n")
     scheduler = Scheduler(employees=employees, shifts=shifts)
     solutions = scheduler.solve(max_solutions=5)
 
-    print_solutions(solutions, employees, shifts, console)
+    print_solutions(
+        solutions,
+        employees,
+        shifts,
+        console,
+        mode=args.mode,
+        top=args.top,
+        diff=args.diff,
+        page_size=args.page_size,
+        page=args.page,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""Admission control for optimize requests, from the solve's estimated cost.
+
+After a request compiles, its model size and cost are estimated (see
+scheduling/solver/estimate.py) and the request is accepted, queued or
+rejected before any model is built. Requests whose estimated CPU time
+reaches `heavy_cpu_seconds` go through a heavy lane with `heavy_slots`
+concurrent solves per worker, so a few large rosters cannot starve the
+small ones; a request that waits longer than `queue_timeout` for a slot is
+turned away with 503. Requests with more than `max_variables` model
+variables are rejected outright with 413. Heavy solves run under a memory
+limit of twice their estimated peak, capped by `max_memory_mb`; with
+`max_memory_mb` set, every solve does.
+"""
+
+import asyncio
+import math
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Literal
+
+from scheduling.models.estimate import ProblemEstimate
+
+Decision = Literal["accept", "queue", "reject"]
+
+DEFAULT_MAX_VARIABLES = 2_000_000
+DEFAULT_HEAVY_CPU_SECONDS = 30.0
+DEFAULT_HEAVY_SLOTS = 1
+DEFAULT_QUEUE_TIMEOUT = 30.0
+MIN_MEMORY_MB = 256
+MEMORY_HEADROOM = 2.0
+
+_MIB = 1024 * 1024
+
+
+class AdmissionRejected(Exception):
+    """A request turned away by admission control, with the HTTP status to send."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass(frozen=True)
+class AdmissionPolicy:
+    """Thresholds for admitting a request; None disables a limit."""
+
+    max_variables: int | None = DEFAULT_MAX_VARIABLES
+    heavy_cpu_seconds: float = DEFAULT_HEAVY_CPU_SECONDS
+    heavy_slots: int = DEFAULT_HEAVY_SLOTS
+    queue_timeout: float = DEFAULT_QUEUE_TIMEOUT
+    max_memory_mb: int | None = None
+
+    def decide(self, estimate: ProblemEstimate) -> tuple[Decision, str | None]:
+        """What to do with a request, and why when it is not simply accepted."""
+        if self.max_variables is not None and estimate.variables > self.max_variables:
+            return "reject", (
+                f"Problem too large: about {estimate.variables} model variables, "
+                f"the limit is {self.max_variables}"
+            )
+        if estimate.cpu_seconds >= self.heavy_cpu_seconds:
+            return "queue", (
+                f"Estimated {estimate.cpu_seconds:.1f} CPU seconds, "
+                f"the heavy lane starts at {self.heavy_cpu_seconds:g}"
+            )
+        return "accept", None
+
+    def memory_limit_mb(self, estimate: ProblemEstimate) -> int | None:
+        """The memory cap for the solve: headroom over the estimate, within the maximum.
+
+        None, leaving CP-SAT uncapped, for a request that is not heavy when no
+        maximum is configured.
+        """
+        if self.max_memory_mb is None and estimate.cpu_seconds < self.heavy_cpu_seconds:
+            return None
+        limit = max(MIN_MEMORY_MB, math.ceil(MEMORY_HEADROOM * estimate.memory_bytes / _MIB))
+        return limit if self.max_memory_mb is None else min(limit, self.max_memory_mb)
+
+    @classmethod
+    def from_env(cls) -> "AdmissionPolicy":
+        """The policy the environment configures.
+
+        SCHEDULING_MAX_VARIABLES (0 disables rejection),
+        SCHEDULING_HEAVY_CPU_SECONDS, SCHEDULING_HEAVY_SLOTS,
+        SCHEDULING_QUEUE_TIMEOUT and SCHEDULING_MAX_SOLVE_MEMORY_MB.
+        """
+        max_variables = int(os.environ.get("SCHEDULING_MAX_VARIABLES", DEFAULT_MAX_VARIABLES))
+        max_memory_mb = os.environ.get("SCHEDULING_MAX_SOLVE_MEMORY_MB")
+        return cls(
+            max_variables=max_variables or None,
+            heavy_cpu_seconds=float(
+                os.environ.get("SCHEDULING_HEAVY_CPU_SECONDS", DEFAULT_HEAVY_CPU_SECONDS)
+            ),
+            heavy_slots=int(os.environ.get("SCHEDULING_HEAVY_SLOTS", DEFAULT_HEAVY_SLOTS)),
+            queue_timeout=float(os.environ.get("SCHEDULING_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT)),
+            max_memory_mb=int(max_memory_mb) if max_memory_mb else None,
+        )
+
+
+class Admission:
+    """An admission policy and the heavy lane of one API worker."""
+
+    def __init__(self, policy: AdmissionPolicy):
+        self.policy = policy
+        self.heavy_waiting = 0
+        self.heavy_running = 0
+        # Created on first use so that it belongs to the server's event loop.
+        self._heavy: asyncio.Semaphore | None = None
+
+    @asynccontextmanager
+    async def heavy_slot(self, timeout: float) -> AsyncIterator[None]:
+        """Hold a heavy-lane slot, waiting at most `timeout` seconds for one."""
+        if self._heavy is None:
+            self._heavy = asyncio.Semaphore(self.policy.heavy_slots)
+        timeout = max(timeout, 0.0)
+        self.heavy_waiting += 1
+        try:
+            if self._heavy.locked():
+                await asyncio.wait_for(self._heavy.acquire(), timeout)
+            else:
+                await self._heavy.acquire()
+        except asyncio.TimeoutError:
+            raise AdmissionRejected(
+                f"Server busy: no heavy solve slot freed up within {timeout:.1f}s", 503
+            ) from None
+        finally:
+            self.heavy_waiting -= 1
+        self.heavy_running += 1
+        try:
+            yield
+        finally:
+            self.heavy_running -= 1
+            self._heavy.release()
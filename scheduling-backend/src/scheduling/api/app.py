@@ -1,13 +1,70 @@
 """FastAPI application setup."""
 
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from scheduling.api.routes import router
 
-app = FastAPI(
-    title="Shift Scheduling Optimizer",
-    description="Stateless optimization service for shift scheduling using OR-Tools",
-    version="1.0.0",
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start the warm-up in the background; SCHEDULING_WARMUP=0 skips it."""
+    from scheduling.api.warmup import start_warm_up
+
+    state = app.state.warmup
+    state.app_import_seconds = app.state.app_import_seconds
+    if os.environ.get("SCHEDULING_WARMUP", "1") == "0":
+        state.status = "ready"
+        state.done.set()
+    else:
+        start_warm_up(state)
+    yield
+    app.state.store.close()
+
+
+def create_app() -> FastAPI:
+    """Build the service.
+
+    The service's modules are imported here, and the time that takes is
+    reported by /api/ready as the app import time. None of them imports
+    OR-Tools; the warm-up does.
+    """
+    started = time.perf_counter()
+    from scheduling.api.admission import Admission, AdmissionPolicy
+    from scheduling.api.coalesce import Coalescer
+    from scheduling.api.compression import CompressionMiddleware
+    from scheduling.api.lanes import SolveQueue
+    from scheduling.api.recorder import recorder_from_env
+    from scheduling.api.routes import router
+    from scheduling.api.store import open_store
+    from scheduling.api.warmup import WarmupState
+
+    import_seconds = time.perf_counter() - started
+
+    app = FastAPI(
+        title="Shift Scheduling Optimizer",
+        description="Stateless optimization service for shift scheduling using OR-Tools",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+    app.state.app_import_seconds = import_seconds
+    app.state.warmup = WarmupState(app_import_seconds=import_seconds)
+    # Result cache and job state; a SQLite path shares them between uvicorn workers.
+    app.state.store = open_store(os.environ.get("SCHEDULING_STORE"))
+    # Keeps slow requests for /api/captures; see scheduling/api/recorder.py.
+    app.state.recorder = recorder_from_env()
+    # Estimates each request's cost to reject, queue or limit it; see scheduling/api/admission.py.
+    app.state.admission = Admission(AdmissionPolicy.from_env())
+    # Interactive and batch solve lanes, fair per tenant; see scheduling/api/lanes.py.
+    app.state.solve_queue = SolveQueue.from_env()
+    # Lets identical in-flight requests share one solve; see scheduling/api/coalesce.py.
+    app.state.coalescer = Coalescer()
+
+    app.add_middleware(CompressionMiddleware)
+    app.include_router(router)
+    return app
+
 
-app.include_router(router)
+app = create_app()
@@ -0,0 +1,195 @@
+"""Single-flight coalescing of identical optimize requests.
+
+Double-clicks and client retries send the same request while the first copy
+is still solving. The first copy to arrive leads: it solves, and every copy
+with the same request key (which covers the tenant) and lane that arrives
+meanwhile follows it and gets its response instead of starting a solve of
+its own.
+
+Within a worker, followers await the leader's future. Across workers, the
+leader claims the key in the shared `Store` (an atomic add with a lease
+covering its time limit), and followers poll for the response it publishes
+under its job id. A follower stops waiting when its own X-Request-Deadline
+passes and answers for itself. A leader's response cut short by its own
+deadline, a disconnect or preemption (`truncated`, or the greedy fallback's
+`heuristic` schedule) is not shared: its followers start over and one of them
+leads instead.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from fastapi.concurrency import run_in_threadpool
+
+from scheduling.api.dto import CoalescingStatsDto, OptimizeResponse
+from scheduling.api.store import Store
+
+INFLIGHT = "inflight"
+SHARED = "shared"
+
+# Seconds beyond its time limit a leader holds its key, for compiling and queueing.
+LEASE_MARGIN = 60.0
+# How often a follower in another worker checks for the leader's response.
+POLL_INTERVAL = 0.05
+# Seconds a published response stays readable for followers in other workers.
+SHARED_TTL = 60.0
+
+
+def flight_key(key: str, lane: str) -> str:
+    """The coalescing key: only requests queued in the same lane share a solve."""
+    return f"{key}/{lane}"
+
+
+def _abandoned(response: OptimizeResponse) -> bool:
+    """Whether the leader's solve was cut short for reasons of its own request."""
+    return (
+        response.truncated
+        or response.heuristic
+        or (response.stats is not None and response.stats.stop_reason == "cancelled")
+    )
+
+
+class Coalescer:
+    """Lets concurrent requests with the same key share one solve."""
+
+    def __init__(self) -> None:
+        self._flights: dict[str, asyncio.Future[OptimizeResponse]] = {}
+        self._leaders: dict[str, str] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.remote_followers = 0
+        self.retries = 0
+
+    async def run(
+        self,
+        store: Store,
+        key: str,
+        job_id: str,
+        solve: Callable[[], Awaitable[OptimizeResponse]],
+        lease: float,
+        deadline: float | None = None,
+    ) -> tuple[OptimizeResponse, str | None]:
+        """Solve, or wait for the identical request already solving.
+
+        Returns the response and, for a follower, the job id of the request
+        it followed. Exceptions raised by the leader's solve reach its
+        followers in this worker too.
+        """
+        while True:
+            flight = self._flights.get(key)
+            if flight is None:
+                outcome = await self._fly(store, key, job_id, solve, lease, deadline)
+                if outcome is not None:
+                    return outcome
+                continue
+
+            self.followers += 1
+            leader = self._leaders[key]
+            try:
+                response = await asyncio.wait_for(asyncio.shield(flight), _left(deadline))
+            except asyncio.TimeoutError:
+                return await solve(), None
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                self.retries += 1  # the request we followed was cancelled or gave up
+                continue
+            if not _abandoned(response):
+                return response, leader
+            self.retries += 1
+
+    async def _fly(
+        self,
+        store: Store,
+        key: str,
+        job_id: str,
+        solve: Callable[[], Awaitable[OptimizeResponse]],
+        lease: float,
+        deadline: float | None,
+    ) -> tuple[OptimizeResponse, str | None] | None:
+        """Answer for every request with `key` in this worker; None to start over."""
+        flight: asyncio.Future[OptimizeResponse] = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self._leaders[key] = job_id
+        try:
+            outcome = await self._solve_or_follow(store, key, job_id, solve, lease, deadline)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            flight.exception()  # retrieved, even when nobody follows
+            raise
+        finally:
+            del self._flights[key]
+            del self._leaders[key]
+        if outcome is None:
+            flight.cancel()
+        else:
+            flight.set_result(outcome[0])
+        return outcome
+
+    async def _solve_or_follow(
+        self,
+        store: Store,
+        key: str,
+        job_id: str,
+        solve: Callable[[], Awaitable[OptimizeResponse]],
+        lease: float,
+        deadline: float | None,
+    ) -> tuple[OptimizeResponse, str | None] | None:
+        if await run_in_threadpool(store.add, INFLIGHT, key, job_id.encode(), lease):
+            self.leaders += 1
+            try:
+                response = await solve()
+                await run_in_threadpool(
+                    store.put, SHARED, job_id, response.model_dump_json().encode(), SHARED_TTL
+                )
+            finally:
+                await run_in_threadpool(store.delete, INFLIGHT, key)
+            return response, None
+
+        value = await run_in_threadpool(store.get, INFLIGHT, key)
+        if value is None:
+            return None  # the other worker's leader finished between the two calls
+        leader = value.decode()
+        response = await self._follow_remote(store, key, leader, deadline)
+        if response is None:
+            if deadline is not None and time.time() >= deadline:
+                return await solve(), None
+            return None
+        self.remote_followers += 1
+        if _abandoned(response):
+            self.retries += 1
+            return None
+        return response, leader
+
+    async def _follow_remote(
+        self, store: Store, key: str, leader_id: str, deadline: float | None
+    ) -> OptimizeResponse | None:
+        """The response another worker's leader publishes, or None if it never does."""
+        while True:
+            value = await run_in_threadpool(store.get, SHARED, leader_id)
+            if value is not None:
+                return OptimizeResponse.model_validate_json(value)
+            current = await run_in_threadpool(store.get, INFLIGHT, key)
+            if current is None or current.decode() != leader_id:
+                # Finished or lost its lease; it may have published just before.
+                value = await run_in_threadpool(store.get, SHARED, leader_id)
+                return None if value is None else OptimizeResponse.model_validate_json(value)
+            if deadline is not None and time.time() >= deadline:
+                return None
+            await asyncio.sleep(POLL_INTERVAL)
+
+    def stats(self) -> CoalescingStatsDto:
+        return CoalescingStatsDto(
+            leaders=self.leaders,
+            followers=self.followers,
+            remote_followers=self.remote_followers,
+            retries=self.retries,
+        )
+
+
+def _left(deadline: float | None) -> float | None:
+    return None if deadline is None else max(deadline - time.time(), 0.0)
@@ -0,0 +1,107 @@
+"""Request and response body codecs for the API.
+
+JSON request bodies are parsed with orjson instead of the standard library.
+MessagePack bodies are accepted when the optional `msgpack` package is
+installed: requests are negotiated with Content-Type and responses with
+Accept. Both encodings carry exactly the structure of the DTOs.
+"""
+
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.types import Receive, Scope
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - exercised only without the extra
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+def _media_type(header: str) -> str:
+    return header.split(";", 1)[0].strip().lower()
+
+
+def _quality(accept: str, media_type: str) -> float:
+    """Quality the Accept header gives `media_type`, ignoring wildcards; -1 if absent."""
+    for part in accept.split(","):
+        name, *params = part.split(";")
+        if name.strip().lower() != media_type:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(value)
+                except ValueError:
+                    return 0.0
+        return 1.0
+    return -1.0
+
+
+def accepts_msgpack(accept: str | None) -> bool:
+    """Whether a MessagePack response is preferred over JSON and can be produced."""
+    if msgpack is None or not accept:
+        return False
+    quality = _quality(accept, MSGPACK_MEDIA_TYPE)
+    return quality > 0 and quality > _quality(accept, JSON_MEDIA_TYPE)
+
+
+def encode_response(content: BaseModel, request: Request) -> Response:
+    """Serialize a DTO in the encoding the client asked for.
+
+    JSON is written by pydantic straight to bytes, skipping FastAPI's
+    response-model round trip.
+    """
+    if accepts_msgpack(request.headers.get("accept")):
+        return Response(
+            msgpack.packb(content.model_dump(mode="json")), media_type=MSGPACK_MEDIA_TYPE
+        )
+    return Response(content.model_dump_json(), media_type=JSON_MEDIA_TYPE)
+
+
+class _DecodingRequest(Request):
+    """A request whose body is decoded with orjson, or msgpack when flagged."""
+
+    def __init__(self, scope: Scope, receive: Receive, is_msgpack: bool):
+        super().__init__(scope, receive)
+        self._is_msgpack = is_msgpack
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            self._json = msgpack.unpackb(body) if self._is_msgpack else orjson.loads(body)
+        return self._json
+
+
+class CodecRoute(APIRoute):
+    """Route that parses JSON with orjson and accepts MessagePack request bodies.
+
+    A MessagePack request is presented to FastAPI as JSON, so body validation
+    and the OpenAPI schema are the same for both encodings.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def codec_handler(request: Request) -> Response:
+            is_msgpack = _media_type(request.headers.get("content-type", "")) == MSGPACK_MEDIA_TYPE
+            scope = request.scope
+            if is_msgpack:
+                if msgpack is None:
+                    return JSONResponse(
+                        {"detail": "MessagePack support is not installed"}, status_code=415
+                    )
+                headers = [(k, v) for k, v in scope["headers"] if k != b"content-type"]
+                headers.append((b"content-type", JSON_MEDIA_TYPE.encode()))
+                scope = {**scope, "headers": headers}
+            return await handler(_DecodingRequest(scope, request.receive, is_msgpack))
+
+        return codec_handler
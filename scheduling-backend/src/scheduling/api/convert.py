@@ -0,0 +1,226 @@
+"""Conversion between the API DTOs and the solver.
+
+Shared by the HTTP routes and the batch CLI, so both accept the same requests
+and produce the same responses.
+"""
+
+from typing import Any
+
+import numpy as np
+
+from scheduling.api.dto import (
+    CompactSolutionDto,
+    CompactSolutionsDto,
+    ConflictDto,
+    FeasibilityReportDto,
+    OptimizeRequest,
+    OptimizeRequestV2,
+    OptimizeResponse,
+    PreferPeriodDto,
+    PreferShiftDto,
+    SolutionDto,
+    SolutionMetricsDto,
+    SolveStatsDto,
+    UnavailablePeriodDto,
+)
+from scheduling.models.solution import Solution, SolutionMetrics, SolveResult
+from scheduling.solver.problem import (
+    PREFER_PERIOD,
+    PREFER_SHIFT,
+    UNASSIGNED,
+    UNAVAILABLE_PERIOD,
+    CompiledProblem,
+    PreferenceColumns,
+    ProblemBuilder,
+    ProblemValidationError,
+    compile_columns,
+)
+
+
+def parse_request(data: dict[str, Any]) -> OptimizeRequest | OptimizeRequestV2:
+    """Validate a decoded request body of either version; v2 has columnar `employees`."""
+    if isinstance(data.get("employees"), dict):
+        return OptimizeRequestV2.model_validate(data)
+    return OptimizeRequest.model_validate(data)
+
+
+def compile_request(request: OptimizeRequest | OptimizeRequestV2) -> CompiledProblem:
+    """Compile a request of either version into the solver's problem representation."""
+    if isinstance(request, OptimizeRequestV2):
+        return _compile_columns(request)
+    return _compile_objects(request)
+
+
+def _compile_objects(request: OptimizeRequest) -> CompiledProblem:
+    """Compile the request DTOs straight into the solver's problem representation.
+
+    No domain models are built; every invalid id, reference or time range in
+    the request is reported together in one ProblemValidationError.
+    """
+    builder = ProblemBuilder()
+    for shift in request.shifts:
+        builder.add_shift(shift.id, shift.start_time, shift.end_time, shift.required_abilities)
+    for employee in request.employees:
+        builder.add_employee(employee.id, employee.abilities)
+        for pref in employee.preferences:
+            if isinstance(pref, PreferShiftDto):
+                builder.add_prefer_shift(pref.shift_id, pref.is_hard)
+            elif isinstance(pref, PreferPeriodDto):
+                builder.add_prefer_period(pref.start, pref.end, pref.is_hard)
+            elif isinstance(pref, UnavailablePeriodDto):
+                builder.add_unavailable_period(pref.start, pref.end, pref.is_hard)
+    return builder.build()
+
+
+def _compile_columns(request: OptimizeRequestV2) -> CompiledProblem:
+    """Compile a columnar request; the arrays go to the IR without per-row objects.
+
+    Ability sets become bitmasks once each, and the three preference tables
+    are concatenated into the problem's preference table. All errors, here and
+    in problem.compile_columns, are reported in one ProblemValidationError.
+    """
+    errors: list[str] = []
+    num_abilities = len(request.abilities)
+    masks: list[int] = []
+    for index, ability_set in enumerate(request.ability_sets):
+        mask = 0
+        for ability in ability_set:
+            if 0 <= ability < num_abilities:
+                mask |= 1 << ability
+            else:
+                errors.append(f"Ability set {index}: ability {ability} does not exist")
+        masks.append(mask)
+
+    shifts = request.shifts
+    requirements: list[int] = []
+    for shift_id, ability_set in zip(shifts.ids, shifts.ability_set, strict=True):
+        if 0 <= ability_set < len(masks):
+            requirements.append(masks[ability_set])
+        else:
+            errors.append(f"Shift '{shift_id}': ability set {ability_set} does not exist")
+            requirements.append(0)
+
+    tables = request.preferences
+    sizes = [
+        len(tables.prefer_shift.employee),
+        len(tables.prefer_period.employee),
+        len(tables.unavailable_period.employee),
+    ]
+    preferences = PreferenceColumns(
+        employee=np.array(
+            tables.prefer_shift.employee
+            + tables.prefer_period.employee
+            + tables.unavailable_period.employee,
+            dtype=np.int64,
+        ),
+        kind=np.repeat(
+            np.array([PREFER_SHIFT, PREFER_PERIOD, UNAVAILABLE_PERIOD], dtype=np.int8), sizes
+        ),
+        hard=np.array(
+            tables.prefer_shift.is_hard
+            + tables.prefer_period.is_hard
+            + tables.unavailable_period.is_hard,
+            dtype=bool,
+        ),
+        shift=np.concatenate(
+            [
+                np.array(tables.prefer_shift.shift, dtype=np.int64),
+                np.full(sizes[1] + sizes[2], UNASSIGNED, dtype=np.int64),
+            ]
+        ),
+        start=np.array(
+            [0] * sizes[0] + tables.prefer_period.start + tables.unavailable_period.start,
+            dtype=np.int64,
+        ),
+        end=np.array(
+            [0] * sizes[0] + tables.prefer_period.end + tables.unavailable_period.end,
+            dtype=np.int64,
+        ),
+        position=np.concatenate([np.arange(size, dtype=np.int32) for size in sizes]),
+    )
+
+    try:
+        problem = compile_columns(
+            employee_ids=request.employees.ids,
+            employee_abilities=request.employees.abilities,
+            abilities=request.abilities,
+            shift_ids=shifts.ids,
+            starts=np.array(shifts.start, dtype=np.int64),
+            ends=np.array(shifts.end, dtype=np.int64),
+            requirements=requirements,
+            preferences=preferences,
+        )
+    except ProblemValidationError as e:
+        errors.extend(e.errors)
+    if errors:
+        raise ProblemValidationError(errors)
+    return problem
+
+
+def _metrics_dto(metrics: SolutionMetrics) -> SolutionMetricsDto:
+    return SolutionMetricsDto(
+        soft_preference_score=metrics.soft_preference_score,
+        fairness_score=metrics.fairness_score,
+        preferences_satisfied={str(k): v for k, v in metrics.preferences_satisfied.items()},
+        total_shifts_assigned=metrics.total_shifts_assigned,
+    )
+
+
+def _compact_solutions(
+    solutions: list[Solution], problem: CompiledProblem, delta: bool
+) -> CompactSolutionsDto:
+    """Encode solutions as employee indices per shift, optionally as deltas to the first."""
+    encoded = [problem.encode_assignments(solution.assignments) for solution in solutions]
+    compact: list[CompactSolutionDto] = []
+    for index, (solution, assigned) in enumerate(zip(solutions, encoded, strict=True)):
+        metrics = _metrics_dto(solution.metrics)
+        if delta and index > 0:
+            changed = np.flatnonzero(assigned != encoded[0])
+            compact.append(
+                CompactSolutionDto(
+                    changed_shifts=changed.tolist(),
+                    changed_employees=assigned[changed].tolist(),
+                    metrics=metrics,
+                )
+            )
+        else:
+            compact.append(CompactSolutionDto(assignments=assigned.tolist(), metrics=metrics))
+    return CompactSolutionsDto(
+        shift_ids=problem.shift_ids, employee_ids=problem.employee_ids, solutions=compact
+    )
+
+
+def to_response(
+    result: SolveResult,
+    truncated: bool,
+    heuristic: bool = False,
+    problem: CompiledProblem | None = None,
+    response_format: str = "full",
+) -> OptimizeResponse:
+    """Build the response DTO; a compact `response_format` needs the compiled `problem`."""
+    solution_dtos: list[SolutionDto] = []
+    compact = None
+    if problem is not None and response_format != "full":
+        compact = _compact_solutions(result.solutions, problem, delta=response_format == "delta")
+    else:
+        solution_dtos = [
+            SolutionDto(
+                assignments={str(k): str(v) for k, v in sol.assignments.items()},
+                metrics=_metrics_dto(sol.metrics),
+            )
+            for sol in result.solutions
+        ]
+    return OptimizeResponse(
+        success=True,
+        solutions=solution_dtos,
+        compact=compact,
+        stats=SolveStatsDto(**result.stats.model_dump()),
+        feasibility=(
+            FeasibilityReportDto.model_validate(result.feasibility.model_dump())
+            if result.feasibility is not None
+            else None
+        ),
+        conflicts=[ConflictDto(**c.model_dump()) for c in result.conflicts],
+        truncated=truncated,
+        heuristic=heuristic,
+    )
@@ -7,7 +7,7 @@ They are intentionally separate from internal domain models.
 from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 # Request DTOs
@@ -61,12 +61,116 @@ class ShiftDto(BaseModel):
     required_abilities: list[str] = Field(default_factory=list)
 
 
+class SolverOptionsDto(BaseModel):
+    """Optional stopping rules and diagnostics for the solver.
+
+    Any enabled rule ends the search early; the best solutions found so far are returned.
+    `explain_infeasibility` names the conflicting hard constraints of an infeasible request.
+    `warm_start` hints the tenant's most similar past schedule to the solver.
+    """
+
+    max_time_in_seconds: float = Field(default=60.0, gt=0, le=300)
+    relative_gap_limit: float | None = Field(default=None, ge=0)
+    stall_timeout: float | None = Field(default=None, gt=0)
+    stop_at_first_feasible: bool = False
+    objective_target: int | None = None
+    explain_infeasibility: bool = False
+    warm_start: bool = True
+
+
 class OptimizeRequest(BaseModel):
-    """Request to optimize a schedule."""
+    """Request to optimize a schedule.
+
+    `response_format` "compact" returns the solutions in `OptimizeResponse.compact`
+    as index arrays over shared id tables; "delta" additionally sends every
+    solution after the best one as its differences from the best.
+    """
 
     employees: list[EmployeeDto]
     shifts: list[ShiftDto]
     max_solutions: int = Field(default=1, ge=1, le=100)
+    options: SolverOptionsDto | None = None
+    response_format: Literal["full", "compact", "delta"] = "full"
+
+
+# Columnar (v2) request DTOs
+
+
+class _Columns(BaseModel):
+    """Parallel arrays; every list field must have the same length."""
+
+    @model_validator(mode="after")
+    def _check_lengths(self):
+        lengths = {name: len(value) for name, value in self if isinstance(value, list)}
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f"Columns must have equal lengths, got {lengths}")
+        return self
+
+
+class ShiftColumnsDto(_Columns):
+    """Shifts as columns. Times are Unix epoch seconds (UTC).
+
+    `ability_set[i]` indexes `OptimizeRequestV2.ability_sets` for the abilities
+    shift i requires.
+    """
+
+    ids: list[str]
+    start: list[int]
+    end: list[int]
+    ability_set: list[int]
+
+
+class EmployeeColumnsDto(_Columns):
+    """Employees as columns; bit j of `abilities[i]` means `OptimizeRequestV2.abilities[j]`."""
+
+    ids: list[str]
+    abilities: list[int]
+
+
+class PreferShiftColumnsDto(_Columns):
+    """prefer_shift rows, by employee index and shift index."""
+
+    employee: list[int] = Field(default_factory=list)
+    shift: list[int] = Field(default_factory=list)
+    is_hard: list[bool] = Field(default_factory=list)
+
+
+class PeriodColumnsDto(_Columns):
+    """prefer_period or unavailable_period rows, by employee index, in epoch seconds."""
+
+    employee: list[int] = Field(default_factory=list)
+    start: list[int] = Field(default_factory=list)
+    end: list[int] = Field(default_factory=list)
+    is_hard: list[bool] = Field(default_factory=list)
+
+
+class PreferenceTablesDto(BaseModel):
+    """One table per preference type."""
+
+    prefer_shift: PreferShiftColumnsDto = Field(default_factory=PreferShiftColumnsDto)
+    prefer_period: PeriodColumnsDto = Field(default_factory=PeriodColumnsDto)
+    unavailable_period: PeriodColumnsDto = Field(default_factory=PeriodColumnsDto)
+
+
+class OptimizeRequestV2(BaseModel):
+    """Columnar form of OptimizeRequest for very large rosters.
+
+    Instead of an object per employee, shift and preference, each is a row
+    across parallel arrays, and abilities are indices into one `abilities`
+    table. Employees and shifts are referenced by their position in
+    `employees.ids` and `shifts.ids`. A conflict's `preference_index` is the
+    row in the table of its `preference_type`. Responses are the same as v1.
+    """
+
+    abilities: list[str] = Field(default_factory=list)
+    # Ability sets required by shifts, as indices into `abilities`.
+    ability_sets: list[list[int]] = Field(default_factory=list)
+    shifts: ShiftColumnsDto
+    employees: EmployeeColumnsDto
+    preferences: PreferenceTablesDto = Field(default_factory=PreferenceTablesDto)
+    max_solutions: int = Field(default=1, ge=1, le=100)
+    options: SolverOptionsDto | None = None
+    response_format: Literal["full", "compact", "delta"] = "full"
 
 
 # Response DTOs
@@ -88,9 +192,263 @@ class SolutionDto(BaseModel):
     metrics: SolutionMetricsDto
 
 
+class CompactSolutionDto(BaseModel):
+    """A solution over the id tables of CompactSolutionsDto.
+
+    `assignments[i]` is the index into `employee_ids` of the employee working
+    `shift_ids[i]`, or -1. In the "delta" format only the best solution has
+    `assignments`; each other one lists the shifts where it differs from the
+    best in `changed_shifts` and their employees in `changed_employees`.
+    """
+
+    assignments: list[int] | None = None
+    changed_shifts: list[int] = Field(default_factory=list)
+    changed_employees: list[int] = Field(default_factory=list)
+    metrics: SolutionMetricsDto
+
+
+class CompactSolutionsDto(BaseModel):
+    """Solutions sent as integer arrays, with each id string sent once."""
+
+    shift_ids: list[str]
+    employee_ids: list[str]
+    solutions: list[CompactSolutionDto] = Field(default_factory=list)
+
+
+class SolveStatsDto(BaseModel):
+    """How the solver run ended.
+
+    `status` distinguishes a proven-infeasible problem ("infeasible") from one
+    where the time limit ran out before any solution was found ("unknown").
+    """
+
+    status: Literal["optimal", "feasible", "infeasible", "model_invalid", "unknown"]
+    objective_value: float | None = None
+    best_objective_bound: float | None = None
+    gap: float | None = None
+    wall_time: float = 0.0
+    user_time: float = 0.0
+    num_conflicts: int = 0
+    num_branches: int = 0
+    num_solutions: int = 0
+    stop_reason: (
+        Literal[
+            "max_solutions",
+            "first_feasible",
+            "objective_target",
+            "gap_limit",
+            "stall_timeout",
+            "cancelled",
+            "deadline",
+            "preempted",
+        ]
+        | None
+    ) = None
+    hit_time_limit: bool = False
+
+
+class UncoverableShiftDto(BaseModel):
+    """A shift nobody may take under the hard constraints."""
+
+    shift_id: str
+    reason: Literal[
+        "no_qualified_employee", "no_available_employee", "conflicting_hard_preferences"
+    ]
+
+
+class BottleneckWindowDto(BaseModel):
+    """Overlapping shifts that need more distinct employees than are available."""
+
+    start: datetime
+    end: datetime
+    shift_ids: list[str]
+    required: int
+    available: int
+    unmatched_shift_ids: list[str] = Field(default_factory=list)
+
+
+class FeasibilityReportDto(BaseModel):
+    """Why a request was proven infeasible without running the solver."""
+
+    feasible: bool
+    uncoverable_shifts: list[UncoverableShiftDto] = Field(default_factory=list)
+    bottlenecks: list[BottleneckWindowDto] = Field(default_factory=list)
+
+
+class ConflictDto(BaseModel):
+    """A hard constraint that is part of a minimal infeasible set.
+
+    "coverage" means `shift_id` must be staffed; "preference" points at the
+    hard preference at `preference_index` in the employee's preference list.
+    """
+
+    kind: Literal["coverage", "preference"]
+    shift_id: str | None = None
+    employee_id: str | None = None
+    preference_index: int | None = None
+    preference_type: str | None = None
+
+
+class WarmStartDto(BaseModel):
+    """The past schedule a solve started from.
+
+    `similarity` (0 to 1) compares it with the request, and `hinted_shifts`
+    counts the shifts it suggested an employee for.
+    """
+
+    similarity: float
+    hinted_shifts: int
+
+
 class OptimizeResponse(BaseModel):
-    """Response from the optimization endpoint."""
+    """Response from the optimization endpoint.
+
+    `truncated` is set when the search was cut short by the request deadline,
+    a client disconnect or, for batch requests, preemption by interactive
+    work; the solutions are the best found up to that point.
+    `heuristic` is set when the solution comes from the greedy fallback rather
+    than the solver. `feasibility` explains a request that the pre-check
+    proved infeasible, and `conflicts` lists a minimal set of clashing hard
+    constraints when `options.explain_infeasibility` was requested. On a
+    request that fails validation, `errors` lists every problem found and
+    `error` joins them. With a compact `response_format`, `solutions` is empty
+    and the solutions are in `compact`. `warm_start` is set when the solver
+    started from a similar past schedule of the same tenant.
+    """
 
     success: bool
     solutions: list[SolutionDto] = Field(default_factory=list)
+    compact: CompactSolutionsDto | None = None
+    stats: SolveStatsDto | None = None
+    feasibility: FeasibilityReportDto | None = None
+    conflicts: list[ConflictDto] = Field(default_factory=list)
+    truncated: bool = False
+    heuristic: bool = False
+    warm_start: WarmStartDto | None = None
+    error: str | None = None
+    errors: list[str] = Field(default_factory=list)
+
+
+class ProblemEstimateDto(BaseModel):
+    """Predicted size and cost of a solve; see scheduling/solver/estimate.py.
+
+    `terms` counts the model's non-zero coefficients. Times are in seconds;
+    `solve_seconds` is capped by the request's time limit.
+    """
+
+    variables: int
+    constraints: int
+    terms: int
+    assignment_variables: int
+    overlap_pairs: int
+    rest_pairs: int
+    preferences: int
+    build_seconds: float
+    solve_seconds: float
+    cpu_seconds: float
+    memory_bytes: int
+
+
+class AnalyzeResponse(BaseModel):
+    """Response from the analyze endpoint: the estimate and the admission decision.
+
+    `admission` is what /api/optimize would do with the same request:
+    "accept" solves it at once, "queue" waits for a slot in the heavy lane and
+    "reject" refuses it; `reason` says why for the latter two. `memory_limit_mb`
+    is the memory cap the solve would run under, if any. Validation failures
+    are reported as on /api/optimize.
+    """
+
+    success: bool
+    estimate: ProblemEstimateDto | None = None
+    admission: Literal["accept", "queue", "reject"] | None = None
+    reason: str | None = None
+    memory_limit_mb: int | None = None
     error: str | None = None
+    errors: list[str] = Field(default_factory=list)
+
+
+class LaneStatsDto(BaseModel):
+    """One solve lane of an API worker.
+
+    `waiting` is the lane's depth and `waiting_by_tenant` splits it by
+    X-Tenant-Id. `slots` is how many solves the lane may run at once;
+    `completed` and `preempted` count solves since the worker started.
+    """
+
+    waiting: int
+    running: int
+    slots: int
+    completed: int
+    preempted: int
+    waiting_by_tenant: dict[str, int] = Field(default_factory=dict)
+
+
+class CoalescingStatsDto(BaseModel):
+    """How often identical in-flight optimize requests shared a solve, since start.
+
+    `leaders` solved; `followers` waited for a leader in the same worker and
+    `remote_followers` for one in another worker. `retries` counts followers
+    whose leader was cancelled, so that they started over.
+    """
+
+    leaders: int = 0
+    followers: int = 0
+    remote_followers: int = 0
+    retries: int = 0
+
+
+class MetricsResponse(BaseModel):
+    """Load of the API worker that answered.
+
+    `lanes` has the "interactive" and "batch" solve lanes; `heavy_waiting` and
+    `heavy_running` count the expensive solves queued for or holding a
+    heavy-lane slot (see /api/analyze). `coalescing` counts requests that
+    shared the solve of an identical one.
+    """
+
+    worker: int
+    lanes: dict[str, LaneStatsDto]
+    heavy_waiting: int
+    heavy_running: int
+    coalescing: CoalescingStatsDto
+
+
+class JobDto(BaseModel):
+    """State of one optimize request, readable from any API worker.
+
+    `status` is "running" until the response is sent, then "done"; `success`
+    is the response's. `cached` is set when the response came from the result
+    cache, `coalesced_with` names the job whose solve an identical in-flight
+    request shared, and `worker` is the process id of the worker that handled it.
+    """
+
+    id: str
+    status: Literal["running", "done"]
+    request_key: str
+    worker: int
+    started_at: datetime
+    finished_at: datetime | None = None
+    cached: bool = False
+    coalesced_with: str | None = None
+    success: bool | None = None
+
+
+class CaptureDto(BaseModel):
+    """A slow optimize request kept by the flight recorder.
+
+    `latency_seconds` runs from compiling the request to building the
+    response; `phase_times` splits it by phase. The problem's shape is given
+    by its employee, shift and preference counts.
+    """
+
+    id: str
+    endpoint: str
+    recorded_at: datetime
+    latency_seconds: float
+    num_employees: int
+    num_shifts: int
+    num_preferences: int
+    status: str | None = None
+    phase_times: dict[str, float] = Field(default_factory=dict)
+    has_search_log: bool = False
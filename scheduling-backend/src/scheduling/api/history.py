@@ -0,0 +1,63 @@
+"""Solved schedules kept per tenant in the shared `Store`, for warm starts.
+
+After a solve, the best solution is kept as a PastSchedule in a namespace
+of the request's X-Tenant-Id, keyed by a digest of its roster and slots, so
+a recurring week overwrites its previous entry instead of piling up. Each
+tenant keeps its newest HISTORY_LIMIT schedules. Before a solve, only that
+tenant's namespace is listed, and its most similar past schedule is mapped
+onto the new shifts and hinted to CP-SAT (see scheduling/solver/warmstart.py).
+With a SQLite `SCHEDULING_STORE`, the history outlives restarts and is shared
+by workers.
+"""
+
+import hashlib
+import os
+
+import orjson
+
+from scheduling.api.store import Store
+from scheduling.models.history import PastSchedule
+from scheduling.models.solution import Solution
+from scheduling.solver.problem import CompiledProblem
+from scheduling.solver.warmstart import WarmStart, best_warm_start, past_schedule
+
+HISTORY = "history"
+
+# Seconds a solved schedule is kept (eight weeks); SCHEDULING_HISTORY_TTL=0 disables history.
+HISTORY_TTL = float(os.environ.get("SCHEDULING_HISTORY_TTL", str(8 * 7 * 86400)))
+# Schedules kept per tenant; older ones are dropped when a new one is kept.
+HISTORY_LIMIT = max(1, int(os.environ.get("SCHEDULING_HISTORY_LIMIT", "32")))
+# Past schedules less similar than this are not used as hints.
+MIN_SIMILARITY = float(os.environ.get("SCHEDULING_HISTORY_MIN_SIMILARITY", "0.5"))
+
+
+def _namespace(tenant: str) -> str:
+    return f"{HISTORY}/{tenant}"
+
+
+def _history_key(past: PastSchedule) -> str:
+    return hashlib.blake2b(orjson.dumps([past.employees, past.slots]), digest_size=16).hexdigest()
+
+
+def remember_solution(
+    store: Store, tenant: str, problem: CompiledProblem, solution: Solution
+) -> None:
+    if HISTORY_TTL <= 0:
+        return
+    past = past_schedule(problem, solution)
+    namespace = _namespace(tenant)
+    store.put(namespace, _history_key(past), past.model_dump_json().encode(), HISTORY_TTL)
+    for key in store.keys(namespace)[:-HISTORY_LIMIT]:
+        store.delete(namespace, key)
+
+
+def recall_warm_start(store: Store, tenant: str, problem: CompiledProblem) -> WarmStart | None:
+    if HISTORY_TTL <= 0:
+        return None
+    namespace = _namespace(tenant)
+    candidates = []
+    for key in store.keys(namespace)[-HISTORY_LIMIT:]:
+        value = store.get(namespace, key)
+        if value is not None:
+            candidates.append(PastSchedule.model_validate_json(value))
+    return best_warm_start(candidates, problem, MIN_SIMILARITY)
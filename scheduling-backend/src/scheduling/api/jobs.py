@@ -0,0 +1,87 @@
+"""Result cache and job state for optimize requests, kept in the shared `Store`.
+
+A request's key hashes the endpoint, the X-Tenant-Id and the parsed request
+in canonical form, so one tenant's requests that differ only in body
+encoding, key order or whitespace share cached results whichever worker
+receives them. Within the same lane, they also share a solve while one is in
+flight (see scheduling/api/coalesce.py). The tenant is part of the key
+because a response depends on it: the solve starts from that tenant's past
+schedules and reports its `warm_start`.
+Only complete solves are cached: a response cut short by a deadline or a
+disconnect, or one rejected before solving, is not.
+"""
+
+import hashlib
+import os
+import uuid
+from datetime import datetime, timezone
+
+from pydantic import BaseModel
+
+from scheduling.api.dto import JobDto, OptimizeResponse
+from scheduling.api.store import Store
+
+RESULTS = "results"
+JOBS = "jobs"
+
+# Seconds a cached response is served; SCHEDULING_CACHE_TTL=0 disables the cache.
+CACHE_TTL = float(os.environ.get("SCHEDULING_CACHE_TTL", "3600"))
+# Seconds a job's state stays readable after its last update.
+JOB_TTL = 3600.0
+
+
+def request_key(path: str, request: BaseModel, tenant: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (path.encode(), tenant.encode(), request.model_dump_json().encode()):
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def cached_response(store: Store, key: str) -> OptimizeResponse | None:
+    if CACHE_TTL <= 0:
+        return None
+    value = store.get(RESULTS, key)
+    return None if value is None else OptimizeResponse.model_validate_json(value)
+
+
+def cache_response(store: Store, key: str, response: OptimizeResponse) -> None:
+    if CACHE_TTL > 0 and response.stats is not None and not response.truncated:
+        store.put(RESULTS, key, response.model_dump_json().encode(), CACHE_TTL)
+
+
+def start_job(store: Store, key: str) -> JobDto:
+    job = JobDto(
+        id=uuid.uuid4().hex,
+        status="running",
+        request_key=key,
+        worker=os.getpid(),
+        started_at=datetime.now(timezone.utc),
+    )
+    store.put(JOBS, job.id, job.model_dump_json().encode(), JOB_TTL)
+    return job
+
+
+def finish_job(
+    store: Store,
+    job: JobDto,
+    response: OptimizeResponse,
+    cached: bool,
+    coalesced_with: str | None = None,
+) -> JobDto:
+    job = job.model_copy(
+        update={
+            "status": "done",
+            "finished_at": datetime.now(timezone.utc),
+            "cached": cached,
+            "coalesced_with": coalesced_with,
+            "success": response.success,
+        }
+    )
+    store.put(JOBS, job.id, job.model_dump_json().encode(), JOB_TTL)
+    return job
+
+
+def get_job(store: Store, job_id: str) -> JobDto | None:
+    value = store.get(JOBS, job_id)
+    return None if value is None else JobDto.model_validate_json(value)
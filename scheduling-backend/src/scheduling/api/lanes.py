@@ -0,0 +1,240 @@
+"""Priority lanes and per-tenant fair queuing of solves.
+
+Every solve of an API worker takes one of `slots` solve slots. Solves wait
+in one of two lanes: "interactive" (a person waiting on the answer) and
+"batch" (bulk re-optimization). A free slot always goes to interactive work
+first, and batch solves never hold more than `slots - reserved` slots, so
+that much capacity is always left for interactive requests.
+
+Within a lane, tenants share the slots by weighted fair queuing: each solve
+is tagged with a virtual finish time of its tenant's previous finish tag
+(or the lane's virtual clock, if later) plus its estimated CPU seconds over
+the tenant's weight, and the smallest tag runs next. A tenant sending many
+expensive solves thus waits behind tenants that sent few. A tenant's tag is
+forgotten once the virtual clock passes it and none of its solves wait, as
+its next solve would start from the clock anyway.
+
+When an interactive solve finds no free slot while batch solves are
+running, the most recently started batch solve is preempted: it is stopped
+early and returns the best solutions it had found, with stop reason
+"preempted".
+"""
+
+import asyncio
+import itertools
+import os
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Literal
+
+from scheduling.api.dto import LaneStatsDto
+
+Lane = Literal["interactive", "batch"]
+LANES: tuple[Lane, ...] = ("interactive", "batch")
+
+DEFAULT_TENANT = "default"
+DEFAULT_RESERVED = 1
+
+
+def default_slots() -> int:
+    """Two solves, or one per core on larger machines."""
+    return max(2, os.cpu_count() or 1)
+
+
+@dataclass(eq=False)
+class _Job:
+    lane: Lane
+    tenant: str
+    start_tag: float
+    finish_tag: float
+    order: int
+    granted: asyncio.Future[None]
+    preempt: Callable[[], None]
+    preempted: bool = False
+
+
+@dataclass
+class _LaneState:
+    waiting: list[_Job] = field(default_factory=list)
+    running: list[_Job] = field(default_factory=list)
+    virtual_time: float = 0.0
+    finish_tags: dict[str, float] = field(default_factory=dict)
+    completed: int = 0
+    preempted: int = 0
+
+
+class SolveQueue:
+    """The solve slots of one API worker, shared out by lane and tenant."""
+
+    def __init__(
+        self,
+        slots: int | None = None,
+        reserved: int = DEFAULT_RESERVED,
+        weights: dict[str, float] | None = None,
+        preemption: bool = True,
+    ):
+        self.slots = slots or default_slots()
+        # Batch work always keeps at least one slot.
+        self.reserved = min(reserved, self.slots - 1)
+        self.weights = weights or {}
+        self.preemption = preemption
+        self._lanes = {lane: _LaneState() for lane in LANES}
+        self._order = itertools.count()
+
+    @property
+    def _running(self) -> int:
+        return sum(len(state.running) for state in self._lanes.values())
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        lane: Lane,
+        tenant: str,
+        cost: float,
+        preempt: Callable[[], None],
+        timeout: float | None = None,
+    ) -> AsyncIterator[bool]:
+        """Hold a solve slot in `lane` for `tenant`, yielding whether one was granted.
+
+        `cost` is the solve's estimated CPU seconds and `preempt` stops it
+        early. Yields False, without holding a slot, when none was granted
+        within `timeout` seconds.
+        """
+        state = self._lanes[lane]
+        start = max(state.virtual_time, state.finish_tags.get(tenant, 0.0))
+        finish = start + max(cost, 1e-6) / self.weights.get(tenant, 1.0)
+        state.finish_tags[tenant] = finish
+        job = _Job(
+            lane,
+            tenant,
+            start,
+            finish,
+            next(self._order),
+            asyncio.get_running_loop().create_future(),
+            preempt,
+        )
+        state.waiting.append(job)
+        self._dispatch()
+        if not job.granted.done() and lane == "interactive":
+            self._preempt_batch()
+
+        granted = True
+        try:
+            await asyncio.wait_for(asyncio.shield(job.granted), timeout)
+        except asyncio.TimeoutError:
+            granted = job.granted.done()
+        except asyncio.CancelledError:
+            if job.granted.done():
+                self._release(job)
+            else:
+                self._withdraw(job)
+            raise
+        if not granted:
+            self._withdraw(job)
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            self._release(job)
+
+    def _withdraw(self, job: _Job) -> None:
+        state = self._lanes[job.lane]
+        state.waiting.remove(job)
+        job.granted.cancel()
+        if state.finish_tags.get(job.tenant) == job.finish_tag:
+            state.finish_tags[job.tenant] = job.start_tag
+            self._forget_idle_tenants(state)
+
+    def _release(self, job: _Job) -> None:
+        state = self._lanes[job.lane]
+        state.running.remove(job)
+        state.completed += 1
+        if job.preempted:
+            state.preempted += 1
+        self._dispatch()
+
+    def _can_start(self, lane: Lane) -> bool:
+        if self._running >= self.slots:
+            return False
+        if lane == "batch":
+            return len(self._lanes["batch"].running) < self.slots - self.reserved
+        return True
+
+    def _dispatch(self) -> None:
+        """Start waiting jobs while slots are free, interactive first."""
+        for lane in LANES:
+            state = self._lanes[lane]
+            virtual_time = state.virtual_time
+            while state.waiting and self._can_start(lane):
+                job = min(state.waiting, key=lambda j: (j.finish_tag, j.order))
+                state.waiting.remove(job)
+                state.virtual_time = max(state.virtual_time, job.start_tag)
+                state.running.append(job)
+                job.granted.set_result(None)
+            if state.virtual_time > virtual_time:
+                self._forget_idle_tenants(state)
+            if lane == "interactive" and state.waiting:
+                return  # batch work waits until interactive work has started
+
+    @staticmethod
+    def _forget_idle_tenants(state: _LaneState) -> None:
+        """Drop the finish tags behind the virtual clock of tenants with nothing waiting."""
+        waiting = {job.tenant for job in state.waiting}
+        for tenant, tag in list(state.finish_tags.items()):
+            if tag <= state.virtual_time and tenant not in waiting:
+                del state.finish_tags[tenant]
+
+    def _preempt_batch(self) -> None:
+        """Stop the newest batch solves until one is stopping per waiting interactive solve."""
+        if not self.preemption:
+            return
+        batch = self._lanes["batch"].running
+        needed = len(self._lanes["interactive"].waiting) - sum(job.preempted for job in batch)
+        for job in reversed(batch):
+            if needed <= 0:
+                break
+            if not job.preempted:
+                job.preempted = True
+                job.preempt()
+                needed -= 1
+
+    def stats(self) -> dict[str, LaneStatsDto]:
+        """Depth, capacity and counts since start of each lane."""
+        stats = {}
+        for lane, state in self._lanes.items():
+            by_tenant: dict[str, int] = {}
+            for job in state.waiting:
+                by_tenant[job.tenant] = by_tenant.get(job.tenant, 0) + 1
+            stats[lane] = LaneStatsDto(
+                waiting=len(state.waiting),
+                running=len(state.running),
+                slots=self.slots if lane == "interactive" else self.slots - self.reserved,
+                completed=state.completed,
+                preempted=state.preempted,
+                waiting_by_tenant=by_tenant,
+            )
+        return stats
+
+    @classmethod
+    def from_env(cls) -> "SolveQueue":
+        """The queue the environment configures.
+
+        SCHEDULING_SOLVE_SLOTS (default: two, or one per core),
+        SCHEDULING_INTERACTIVE_RESERVED (1), SCHEDULING_PREEMPT_BATCH (1; 0
+        turns preemption off) and SCHEDULING_TENANT_WEIGHTS as
+        "venue-a=3,venue-b=0.5" (others weigh 1).
+        """
+        weights = {}
+        for item in os.environ.get("SCHEDULING_TENANT_WEIGHTS", "").split(","):
+            if item.strip():
+                tenant, _, weight = item.partition("=")
+                weights[tenant.strip()] = float(weight)
+        slots = os.environ.get("SCHEDULING_SOLVE_SLOTS")
+        return cls(
+            slots=int(slots) if slots else None,
+            reserved=int(os.environ.get("SCHEDULING_INTERACTIVE_RESERVED", DEFAULT_RESERVED)),
+            weights=weights,
+            preemption=os.environ.get("SCHEDULING_PREEMPT_BATCH", "1") != "0",
+        )
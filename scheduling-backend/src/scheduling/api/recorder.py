@@ -0,0 +1,128 @@
+"""Flight recorder for slow optimize requests.
+
+A request that takes at least `threshold` seconds is kept as a zip archive
+in a directory holding at most `capacity` of them; the oldest is deleted to
+make room. An archive holds the request body as received, a capture.json
+summary (latency, phase timings and the problem's shape), the solve
+statistics and, when the solver itself reached the threshold, its
+parameters, model statistics and search log. Archive names sort by time, so
+every worker pointed at the same directory shares one buffer.
+"""
+
+import os
+import re
+import tempfile
+import time
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from scheduling.api.dto import CaptureDto
+from scheduling.models.solution import SolveResult
+from scheduling.solver.problem import CompiledProblem
+
+CAPTURE_FILE = "capture.json"
+STATS_FILE = "stats.json"
+PARAMETERS_FILE = "parameters.pbtxt"
+MODEL_STATS_FILE = "model_stats.txt"
+SEARCH_LOG_FILE = "search.log"
+
+DEFAULT_THRESHOLD = 10.0
+DEFAULT_CAPACITY = 50
+
+_CAPTURE_ID = re.compile(r"\d{20}-[0-9a-f]{8}")
+
+
+class FlightRecorder:
+    """Keeps requests slower than `threshold` seconds as captures in `directory`."""
+
+    def __init__(self, directory: str | Path, threshold: float, capacity: int = DEFAULT_CAPACITY):
+        self.directory = Path(directory)
+        self.threshold = threshold
+        self.capacity = capacity
+
+    def record(
+        self,
+        endpoint: str,
+        content_type: str,
+        body: bytes,
+        latency: float,
+        phases: dict[str, float],
+        problem: CompiledProblem,
+        result: SolveResult,
+    ) -> CaptureDto:
+        """Write a capture, then drop the oldest ones beyond `capacity`."""
+        capture = CaptureDto(
+            id=f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}",
+            endpoint=endpoint,
+            recorded_at=datetime.now(timezone.utc),
+            latency_seconds=latency,
+            num_employees=problem.num_employees,
+            num_shifts=problem.num_shifts,
+            num_preferences=problem.num_preferences,
+            status=result.stats.status,
+            phase_times=phases,
+            has_search_log=result.trace is not None,
+        )
+        request_file = "request.msgpack" if "msgpack" in content_type else "request.json"
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{capture.id}.zip"
+        partial = path.with_suffix(".partial")
+        with zipfile.ZipFile(partial, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(CAPTURE_FILE, capture.model_dump_json(indent=2))
+            archive.writestr(request_file, body)
+            archive.writestr(STATS_FILE, result.stats.model_dump_json(indent=2))
+            if result.trace is not None:
+                archive.writestr(PARAMETERS_FILE, result.trace.parameters)
+                archive.writestr(MODEL_STATS_FILE, result.trace.model_stats)
+                log = "\n".join(result.trace.search_log)
+                if result.trace.search_log_dropped:
+                    log += f"\n[{result.trace.search_log_dropped} lines dropped before the last]"
+                archive.writestr(SEARCH_LOG_FILE, log + "\n")
+        os.replace(partial, path)
+
+        for old in self._archives()[: -self.capacity]:
+            old.unlink(missing_ok=True)
+        return capture
+
+    def _archives(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob("*.zip"))
+
+    def captures(self) -> list[CaptureDto]:
+        """Summaries of the kept captures, newest first."""
+        captures = []
+        for path in reversed(self._archives()):
+            try:
+                with zipfile.ZipFile(path) as archive:
+                    captures.append(CaptureDto.model_validate_json(archive.read(CAPTURE_FILE)))
+            except (OSError, KeyError, zipfile.BadZipFile):
+                continue  # dropped by another worker while listing
+        return captures
+
+    def path(self, capture_id: str) -> Path | None:
+        """The archive of a kept capture, or None."""
+        if not _CAPTURE_ID.fullmatch(capture_id):
+            return None
+        path = self.directory / f"{capture_id}.zip"
+        return path if path.is_file() else None
+
+
+def recorder_from_env() -> FlightRecorder | None:
+    """The recorder the environment configures, or None when it is disabled.
+
+    SCHEDULING_SLOW_SOLVE_SECONDS is the threshold (default 10; 0 disables
+    recording), SCHEDULING_CAPTURE_DIR the directory and
+    SCHEDULING_CAPTURE_LIMIT the capacity.
+    """
+    threshold = float(os.environ.get("SCHEDULING_SLOW_SOLVE_SECONDS", DEFAULT_THRESHOLD))
+    if threshold <= 0:
+        return None
+    directory = os.environ.get(
+        "SCHEDULING_CAPTURE_DIR", os.path.join(tempfile.gettempdir(), "scheduling-captures")
+    )
+    capacity = int(os.environ.get("SCHEDULING_CAPTURE_LIMIT", DEFAULT_CAPACITY))
+    return FlightRecorder(directory, threshold, capacity)
@@ -1,116 +1,498 @@
 """API routes for the optimization service."""
 
-from fastapi import APIRouter
+import asyncio
+import os
+import time
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager, nullcontext
+from datetime import datetime, timezone
+from functools import partial
+from typing import TYPE_CHECKING, Annotated
 
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse
+
+from scheduling.api.admission import AdmissionPolicy, AdmissionRejected
+from scheduling.api.coalesce import LEASE_MARGIN, flight_key
+from scheduling.api.codecs import MSGPACK_MEDIA_TYPE, CodecRoute, encode_response
+from scheduling.api.convert import compile_request, to_response
 from scheduling.api.dto import (
-    EmployeeDto,
+    AnalyzeResponse,
+    CaptureDto,
+    JobDto,
+    MetricsResponse,
     OptimizeRequest,
+    OptimizeRequestV2,
     OptimizeResponse,
-    PreferPeriodDto,
-    PreferShiftDto,
-    ShiftDto,
-    SolutionDto,
-    SolutionMetricsDto,
-    UnavailablePeriodDto,
+    ProblemEstimateDto,
+    WarmStartDto,
 )
-from scheduling.models.employee import Employee
-from scheduling.models.preferences.prefer_period import PreferPeriodPreference
-from scheduling.models.preferences.prefer_shift import PreferShiftPreference
-from scheduling.models.preferences.unavailable import UnavailablePeriodPreference
-from scheduling.models.shift import Shift
-from scheduling.solver.scheduler import Scheduler
-from scheduling.types import Ability, EmployeeId, ShiftId
-
-router = APIRouter(prefix="/api", tags=["optimization"])
-
-
-def _convert_employee(dto: EmployeeDto) -> Employee:
-    """Convert EmployeeDto to internal Employee model."""
-    preferences = []
-    for pref in dto.preferences:
-        if isinstance(pref, PreferShiftDto):
-            preferences.append(
-                PreferShiftPreference(
-                    shift_id=ShiftId(pref.shift_id),
-                    is_hard=pref.is_hard,
-                )
-            )
-        elif isinstance(pref, PreferPeriodDto):
-            preferences.append(
-                PreferPeriodPreference(
-                    start=pref.start,
-                    end=pref.end,
-                    is_hard=pref.is_hard,
-                )
-            )
-        elif isinstance(pref, UnavailablePeriodDto):
-            preferences.append(
-                UnavailablePeriodPreference(
-                    start=pref.start,
-                    end=pref.end,
-                    is_hard=pref.is_hard,
-                )
-            )
+from scheduling.api.history import recall_warm_start, remember_solution
+from scheduling.api.jobs import (
+    cache_response,
+    cached_response,
+    finish_job,
+    get_job,
+    request_key,
+    start_job,
+)
+from scheduling.api.lanes import DEFAULT_TENANT, Lane
+from scheduling.api.recorder import FlightRecorder
+from scheduling.models.estimate import ProblemEstimate
+from scheduling.models.solution import SolveResult
+from scheduling.solver.estimate import estimate_problem
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.problem import CompiledProblem, ProblemValidationError
+from scheduling.solver.warmstart import WarmStart
+
+if TYPE_CHECKING:
+    # Imported on first use (or by the warm-up) so that the app starts without OR-Tools.
+    from scheduling.solver.scheduler import Scheduler
+
+router = APIRouter(prefix="/api", tags=["optimization"], route_class=CodecRoute)
+
+DEADLINE_POLL_INTERVAL = 0.05
+# Below this much time before the deadline the solver is skipped and the
+# greedy heuristic answers on its own.
+GREEDY_ONLY_THRESHOLD = 0.5
+
+
+def _parse_deadline(header: str | None) -> float | None:
+    """Parse X-Request-Deadline into a Unix timestamp.
 
-    return Employee(
-        id=EmployeeId(dto.id),
-        name=dto.name,
-        abilities=[Ability(a) for a in dto.abilities],
-        preferences=preferences,
+    Accepts either Unix seconds ("1735113600.5") or an ISO 8601 datetime;
+    naive datetimes are taken as UTC.
+    """
+    if header is None:
+        return None
+    try:
+        return float(header)
+    except ValueError:
+        pass
+    try:
+        deadline = datetime.fromisoformat(header)
+    except ValueError:
+        raise ValueError(f"Invalid X-Request-Deadline header: '{header}'") from None
+    if deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=timezone.utc)
+    return deadline.timestamp()
+
+
+def _solver_options(request: OptimizeRequest | OptimizeRequestV2) -> SolverOptions:
+    if request.options is None:
+        return SolverOptions()
+    return SolverOptions(**request.options.model_dump(exclude={"warm_start"}))
+
+
+def _compile_and_estimate(
+    request: OptimizeRequest | OptimizeRequestV2, options: SolverOptions
+) -> tuple[CompiledProblem, ProblemEstimate]:
+    problem = compile_request(request)
+    return problem, estimate_problem(
+        problem, options.max_time_in_seconds, options.num_workers, options.bulk_build
     )
 
 
-def _convert_shift(dto: ShiftDto) -> Shift:
-    """Convert ShiftDto to internal Shift model."""
-    return Shift(
-        id=ShiftId(dto.id),
-        name=dto.name,
-        start_time=dto.start_time,
-        end_time=dto.end_time,
-        required_abilities=[Ability(a) for a in dto.required_abilities],
+def _build_scheduler(problem: CompiledProblem) -> "Scheduler":
+    from scheduling.solver.scheduler import Scheduler
+
+    return Scheduler.from_problem(problem)
+
+
+async def _solve_until_cancelled(
+    scheduler: "Scheduler",
+    max_solutions: int,
+    options: SolverOptions,
+    http_request: Request,
+    deadline: float | None,
+    warm_start: WarmStart | None = None,
+) -> SolveResult:
+    """Run the solve in a worker thread, cancelling it on disconnect or deadline.
+
+    Cancellation is re-issued on every poll until the solve returns, so a stop
+    that lands before the solver has started is not lost.
+    """
+    hint = warm_start.hint if warm_start is not None else None
+    task = asyncio.ensure_future(
+        run_in_threadpool(scheduler.solve_with_stats, max_solutions, options, hint)
     )
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DEADLINE_POLL_INTERVAL)
+        if done:
+            return task.result()
+        if deadline is not None and time.time() >= deadline:
+            scheduler.cancel("deadline")
+        elif await http_request.is_disconnected():
+            scheduler.cancel("cancelled")
 
 
-@router.post("/optimize", response_model=OptimizeResponse)
-def optimize(request: OptimizeRequest) -> OptimizeResponse:
+@router.post(
+    "/optimize",
+    response_model=OptimizeResponse,
+    responses={200: {"content": {MSGPACK_MEDIA_TYPE: {}}}},
+)
+async def optimize(
+    request: OptimizeRequest,
+    http_request: Request,
+    x_request_deadline: str | None = Header(default=None),
+    x_priority: Annotated[Lane, Header()] = "interactive",
+    x_tenant_id: str = Header(default=DEFAULT_TENANT),
+) -> Response:
     """Run the optimization solver on the provided schedule data.
 
-    This endpoint is stateless - all data must be provided in the request.
+    All data must be provided in the request. An identical request that
+    was solved to completion before is answered from the result cache, shared
+    by all workers (`X-Cache: hit`), and one that arrives while an identical
+    request is still solving waits for and shares its response
+    (`X-Coalesced-With` names the job that solved it). `X-Job-Id` names the
+    request's entry under /api/jobs. The solve runs off the event loop and is
+    stopped early when the client disconnects or the optional
+    X-Request-Deadline passes; whatever solutions exist at that point are
+    returned with `truncated` set. If the deadline leaves no time to solve, or
+    passes before the solver finds anything, the greedy heuristic's schedule
+    is returned instead, with `heuristic` set.
+
+    Before solving, the request's cost is estimated (see /api/analyze): a
+    problem too large to admit is refused with 413, and an expensive one
+    waits for a slot in the heavy lane, or gets 503 if none frees up in time.
+    Solves then queue for a solve slot by X-Priority ("interactive", the
+    default, or "batch") and, within that lane, fairly by X-Tenant-Id.
+    Interactive requests go first and may stop a running batch solve early,
+    which then returns its best solutions so far with `truncated` set.
+    Solved schedules are kept per tenant, and the solver starts from the
+    most similar one (`warm_start`) unless `options.warm_start` is false.
+
+    Bodies may be JSON or, with the msgpack extra installed, MessagePack
+    (Content-Type / Accept: application/msgpack).
     """
-    try:
-        # Convert DTOs to internal models
-        employees = [_convert_employee(e) for e in request.employees]
-        shifts = [_convert_shift(s) for s in request.shifts]
-
-        # Run the solver
-        scheduler = Scheduler(employees=employees, shifts=shifts)
-        solutions = scheduler.solve(max_solutions=request.max_solutions)
-
-        # Convert solutions to DTOs
-        solution_dtos = [
-            SolutionDto(
-                assignments={str(k): str(v) for k, v in sol.assignments.items()},
-                metrics=SolutionMetricsDto(
-                    soft_preference_score=sol.metrics.soft_preference_score,
-                    fairness_score=sol.metrics.fairness_score,
-                    preferences_satisfied={
-                        str(k): v for k, v in sol.metrics.preferences_satisfied.items()
-                    },
-                    total_shifts_assigned=sol.metrics.total_shifts_assigned,
-                ),
+    return await _respond(request, http_request, x_request_deadline, x_priority, x_tenant_id)
+
+
+@router.post(
+    "/v2/optimize",
+    response_model=OptimizeResponse,
+    responses={200: {"content": {MSGPACK_MEDIA_TYPE: {}}}},
+)
+async def optimize_v2(
+    request: OptimizeRequestV2,
+    http_request: Request,
+    x_request_deadline: str | None = Header(default=None),
+    x_priority: Annotated[Lane, Header()] = "interactive",
+    x_tenant_id: str = Header(default=DEFAULT_TENANT),
+) -> Response:
+    """Run the optimization solver on a columnar (v2) problem.
+
+    Behaves like /api/optimize and returns the same response; the request
+    carries parallel arrays instead of an object per row, which keeps parsing
+    cheap for very large rosters.
+    """
+    return await _respond(request, http_request, x_request_deadline, x_priority, x_tenant_id)
+
+
+async def _respond(
+    request: OptimizeRequest | OptimizeRequestV2,
+    http_request: Request,
+    x_request_deadline: str | None,
+    lane: Lane,
+    tenant: str,
+) -> Response:
+    """Answer from the result cache, an identical solve in flight, or a new solve.
+
+    The job is recorded in the shared store either way.
+    """
+    store = http_request.app.state.store
+    key = request_key(http_request.url.path, request, tenant)
+    job = await run_in_threadpool(start_job, store, key)
+    response = await run_in_threadpool(cached_response, store, key)
+    cached = response is not None
+    leader = None
+    status_code = 200
+    if response is None:
+        try:
+            deadline = _parse_deadline(x_request_deadline)
+        except ValueError:
+            deadline = None  # reported by _optimize
+        time_limit = request.options.max_time_in_seconds if request.options else 60.0
+        try:
+            response, leader = await http_request.app.state.coalescer.run(
+                store,
+                flight_key(key, lane),
+                job.id,
+                partial(_optimize, request, http_request, x_request_deadline, lane, tenant),
+                time_limit + LEASE_MARGIN,
+                deadline,
             )
-            for sol in solutions
-        ]
+        except AdmissionRejected as e:
+            response = OptimizeResponse(success=False, error=str(e))
+            status_code = e.status_code
+        if leader is None:
+            await run_in_threadpool(cache_response, store, key, response)
+    await run_in_threadpool(finish_job, store, job, response, cached, leader)
+
+    encoded = encode_response(response, http_request)
+    encoded.status_code = status_code
+    encoded.headers["X-Job-Id"] = job.id
+    encoded.headers["X-Cache"] = "hit" if cached else "miss"
+    if leader is not None:
+        encoded.headers["X-Coalesced-With"] = leader
+    return encoded
+
+
+async def _optimize(
+    request: OptimizeRequest | OptimizeRequestV2,
+    http_request: Request,
+    x_request_deadline: str | None,
+    lane: Lane,
+    tenant: str,
+) -> OptimizeResponse:
+    """Solve a request; raises AdmissionRejected when it is turned away."""
+    started = time.perf_counter()
+    recorder = http_request.app.state.recorder
+    admission = http_request.app.state.admission
+    try:
+        deadline = _parse_deadline(x_request_deadline)
+        options = _solver_options(request)
+
+        problem, estimate = await run_in_threadpool(_compile_and_estimate, request, options)
+        decision, reason = admission.policy.decide(estimate)
+        if decision == "reject":
+            raise AdmissionRejected(reason, 413)
+        options = options.model_copy(
+            update={"max_memory_mb": admission.policy.memory_limit_mb(estimate)}
+        )
+        if decision == "queue":
+            timeout = admission.policy.queue_timeout
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.time())
+            heavy_lane = admission.heavy_slot(timeout)
+        else:
+            heavy_lane = nullcontext()
 
-        return OptimizeResponse(success=True, solutions=solution_dtos)
+        store = http_request.app.state.store
+        warm_start = None
+        if request.options is None or request.options.warm_start:
+            warm_start = await run_in_threadpool(recall_warm_start, store, tenant, problem)
 
+        admitted = time.perf_counter()
+        async with heavy_lane:
+            queued = time.perf_counter() - admitted
+            solve_slot = partial(
+                http_request.app.state.solve_queue.slot, lane, tenant, estimate.cpu_seconds
+            )
+            response, result = await _solve(
+                request,
+                problem,
+                options,
+                http_request,
+                deadline,
+                started,
+                queued,
+                recorder,
+                solve_slot,
+                warm_start,
+            )
+        if result.solutions and not response.heuristic:
+            await run_in_threadpool(remember_solution, store, tenant, problem, result.solutions[0])
+        if warm_start is not None:
+            response = response.model_copy(
+                update={
+                    "warm_start": WarmStartDto(
+                        similarity=warm_start.similarity,
+                        hinted_shifts=warm_start.hinted_shifts,
+                    )
+                }
+            )
+        return response
+
+    except AdmissionRejected:
+        raise
+    except ProblemValidationError as e:
+        return OptimizeResponse(success=False, error=str(e), errors=e.errors)
     except ValueError as e:
         return OptimizeResponse(success=False, error=str(e))
     except Exception as e:
         return OptimizeResponse(success=False, error=f"Optimization failed: {e!s}")
 
 
+async def _solve(
+    request: OptimizeRequest | OptimizeRequestV2,
+    problem: CompiledProblem,
+    options: SolverOptions,
+    http_request: Request,
+    deadline: float | None,
+    started: float,
+    queued: float,
+    recorder: FlightRecorder | None,
+    solve_slot: Callable[..., AbstractAsyncContextManager[bool]],
+    warm_start: WarmStart | None,
+) -> tuple[OptimizeResponse, SolveResult]:
+    scheduler = await run_in_threadpool(_build_scheduler, problem)
+    compiled = time.perf_counter()
+    timeout = deadline - time.time() if deadline is not None else None
+    async with solve_slot(partial(scheduler.cancel, "preempted"), timeout) as granted:
+        slotted = time.perf_counter()
+        queued += slotted - compiled
+        if not granted:
+            scheduler.cancel("deadline")
+        if recorder is not None:
+            # Have the solver keep its search log in case the request turns out slow.
+            options = options.model_copy(
+                update={"trace_threshold": max(0.0, recorder.threshold - (slotted - started))}
+            )
+
+        deadline_capped = False
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining < GREEDY_ONLY_THRESHOLD:
+                scheduler.cancel("deadline")
+            elif remaining < options.max_time_in_seconds:
+                options = options.model_copy(update={"max_time_in_seconds": remaining})
+                deadline_capped = True
+
+        result = await _solve_until_cancelled(
+            scheduler, request.max_solutions, options, http_request, deadline, warm_start
+        )
+
+    truncated = result.stats.stop_reason in ("cancelled", "deadline", "preempted") or (
+        deadline_capped and result.stats.hit_time_limit
+    )
+    heuristic = False
+    if truncated and not result.solutions and result.stats.stop_reason != "cancelled":
+        fallback = await run_in_threadpool(scheduler.greedy_solution)
+        if fallback is not None:
+            result = result.model_copy(update={"solutions": [fallback]})
+            heuristic = True
+    response = to_response(result, truncated, heuristic, scheduler.problem, request.response_format)
+    latency = time.perf_counter() - started
+    if recorder is not None and latency >= recorder.threshold:
+        phases = {"compile": slotted - started - queued}
+        if queued:
+            phases["queue"] = queued
+        await run_in_threadpool(
+            recorder.record,
+            http_request.url.path,
+            http_request.headers.get("content-type", ""),
+            await http_request.body(),
+            latency,
+            {**phases, **result.stats.phase_times},
+            scheduler.problem,
+            result,
+        )
+    return response, result
+
+
+def _analyze(
+    request: OptimizeRequest | OptimizeRequestV2, policy: AdmissionPolicy
+) -> AnalyzeResponse:
+    try:
+        _, estimate = _compile_and_estimate(request, _solver_options(request))
+    except ProblemValidationError as e:
+        return AnalyzeResponse(success=False, error=str(e), errors=e.errors)
+    except ValueError as e:
+        return AnalyzeResponse(success=False, error=str(e))
+    decision, reason = policy.decide(estimate)
+    return AnalyzeResponse(
+        success=True,
+        estimate=ProblemEstimateDto(**estimate.model_dump()),
+        admission=decision,
+        reason=reason,
+        memory_limit_mb=policy.memory_limit_mb(estimate) if decision != "reject" else None,
+    )
+
+
+@router.post("/analyze")
+async def analyze(request: OptimizeRequest, http_request: Request) -> AnalyzeResponse:
+    """Estimate a problem's model size and solve cost without solving it.
+
+    Takes the same body as /api/optimize and reports the predicted variables,
+    constraints, time, CPU and memory, and whether /api/optimize would
+    accept, queue or reject it. Nothing is built or solved, so this answers
+    in about the time it takes to parse and validate the request.
+    """
+    return await run_in_threadpool(_analyze, request, http_request.app.state.admission.policy)
+
+
+@router.post("/v2/analyze")
+async def analyze_v2(request: OptimizeRequestV2, http_request: Request) -> AnalyzeResponse:
+    """Estimate a columnar (v2) problem's cost; see /api/analyze."""
+    return await run_in_threadpool(_analyze, request, http_request.app.state.admission.policy)
+
+
+@router.get("/jobs/{job_id}", responses={404: {"description": "Unknown or expired job"}})
+def job(job_id: str, http_request: Request) -> JobDto:
+    """State of an optimize request, by the X-Job-Id of its response."""
+    found = get_job(http_request.app.state.store, job_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return found
+
+
+@router.get("/captures")
+def captures(http_request: Request) -> list[CaptureDto]:
+    """Slow optimize requests kept by the flight recorder, newest first."""
+    recorder = http_request.app.state.recorder
+    return recorder.captures() if recorder is not None else []
+
+
+@router.get(
+    "/captures/{capture_id}",
+    response_class=FileResponse,
+    responses={
+        200: {"content": {"application/zip": {}}},
+        404: {"description": "Unknown or dropped capture"},
+    },
+)
+def capture(capture_id: str, http_request: Request) -> FileResponse:
+    """Download a capture as a zip archive.
+
+    It holds the request body, timings, solve statistics and, when the solver
+    was slow, its parameters, model statistics and search log.
+    """
+    recorder = http_request.app.state.recorder
+    path = recorder.path(capture_id) if recorder is not None else None
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Capture '{capture_id}' not found")
+    return FileResponse(path, media_type="application/zip", filename=path.name)
+
+
 @router.get("/health")
-def health() -> dict[str, str]:
-    """Health check endpoint."""
-    return {"status": "healthy"}
+def health(http_request: Request) -> dict[str, object]:
+    """Health check endpoint; also reports how many solves wait in each lane."""
+    lanes = http_request.app.state.solve_queue.stats()
+    return {
+        "status": "healthy",
+        "lane_depth": {lane: stats.waiting for lane, stats in lanes.items()},
+    }
+
+
+@router.get("/metrics")
+def metrics(http_request: Request) -> MetricsResponse:
+    """Solve lanes, heavy-lane load and request coalescing of the worker that answers."""
+    admission = http_request.app.state.admission
+    return MetricsResponse(
+        worker=os.getpid(),
+        lanes=http_request.app.state.solve_queue.stats(),
+        heavy_waiting=admission.heavy_waiting,
+        heavy_running=admission.heavy_running,
+        coalescing=http_request.app.state.coalescer.stats(),
+    )
+
+
+@router.get("/ready", responses={503: {"description": "Warm-up not finished or failed"}})
+def ready(http_request: Request) -> JSONResponse:
+    """Readiness check: 200 once the startup warm-up has finished, 503 before.
+
+    Also reports how long the app and solver imports and the warm-up solve took.
+    """
+    state = http_request.app.state.warmup
+    return JSONResponse(
+        {
+            "status": state.status,
+            "app_import_seconds": state.app_import_seconds,
+            "solver_import_seconds": state.solver_import_seconds,
+            "warmup_seconds": state.warmup_seconds,
+            "error": state.error,
+        },
+        status_code=200 if state.ready else 503,
+    )
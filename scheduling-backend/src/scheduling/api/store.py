@@ -0,0 +1,213 @@
+"""Key-value storage shared by the API workers.
+
+Each uvicorn worker is a separate process, so the result cache and job state
+live behind a `Store` rather than in module globals. `SqliteStore` keeps them
+in one SQLite file in WAL mode, which every worker on the host opens; readers
+never block the writer and no external service is needed. `MemoryStore` is
+the single-process default. Other backends implement `Store` and are set on
+`app.state.store`.
+
+Values are bytes, grouped by namespace, and may expire.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+# Expired rows are deleted every this many writes.
+PURGE_INTERVAL = 256
+
+
+class Store(ABC):
+    """Bytes by (namespace, key), each entry with an optional time to live in seconds."""
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> bytes | None:
+        """The value, or None if it is missing or expired."""
+
+    @abstractmethod
+    def put(self, namespace: str, key: str, value: bytes, ttl: float | None = None) -> None:
+        """Store `value`, replacing any previous value."""
+
+    @abstractmethod
+    def add(self, namespace: str, key: str, value: bytes, ttl: float | None = None) -> bool:
+        """Store `value` only if the key is missing or expired; returns whether it was stored."""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove the key if present."""
+
+    @abstractmethod
+    def keys(self, namespace: str) -> list[str]:
+        """Live keys in `namespace`, oldest write first."""
+
+    def close(self) -> None:  # noqa: B027 - optional for backends without resources
+        """Release any resources held by the store."""
+
+
+def _expiry(ttl: float | None) -> float | None:
+    return None if ttl is None else time.time() + ttl
+
+
+class MemoryStore(Store):
+    """A store private to this process, holding at most `max_entries` per namespace."""
+
+    def __init__(self, max_entries: int = 1024):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: dict[str, OrderedDict[str, tuple[bytes, float | None]]] = {}
+
+    def _live(self, namespace: str, key: str) -> bytes | None:
+        entry = self._entries.get(namespace, {}).get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= time.time():
+            del self._entries[namespace][key]
+            return None
+        return value
+
+    def _set(self, namespace: str, key: str, value: bytes, ttl: float | None) -> None:
+        entries = self._entries.setdefault(namespace, OrderedDict())
+        entries.pop(key, None)
+        entries[key] = (value, _expiry(ttl))
+        while len(entries) > self._max_entries:
+            entries.popitem(last=False)
+
+    def get(self, namespace: str, key: str) -> bytes | None:
+        with self._lock:
+            return self._live(namespace, key)
+
+    def put(self, namespace: str, key: str, value: bytes, ttl: float | None = None) -> None:
+        with self._lock:
+            self._set(namespace, key, value, ttl)
+
+    def add(self, namespace: str, key: str, value: bytes, ttl: float | None = None) -> bool:
+        with self._lock:
+            if self._live(namespace, key) is not None:
+                return False
+            self._set(namespace, key, value, ttl)
+            return True
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._entries.get(namespace, {}).pop(key, None)
+
+    def keys(self, namespace: str) -> list[str]:
+        with self._lock:
+            return [k for k in list(self._entries.get(namespace, {})) if self._live(namespace, k)]
+
+
+class SqliteStore(Store):
+    """A store in a SQLite file that any number of processes can share.
+
+    Each process opens its own connection on first use (so a store created
+    before a fork is safe to use in the children) and serializes its threads
+    on it. Writes wait up to `timeout` seconds for another process's lock.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], timeout: float = 5.0):
+        self.path = os.fspath(path)
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._pid: int | None = None
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=self._timeout, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+                " expires REAL, written REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+            )
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def _write(self, sql: str, params: tuple) -> int:
+        """Run a write statement, deleting expired rows now and then; returns the row count."""
+        connection = self._connect()
+        rows = connection.execute(sql, params).rowcount
+        self._writes += 1
+        if self._writes % PURGE_INTERVAL == 0:
+            connection.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+        return rows
+
+    def get(self, namespace: str, key: str) -> bytes | None:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT value FROM entries WHERE namespace = ? AND key = ?"
+                    " AND (expires IS NULL OR expires > ?)",
+                    (namespace, key, time.time()),
+                )
+                .fetchone()
+            )
+        return None if row is None else bytes(row[0])
+
+    def put(self, namespace: str, key: str, value: bytes, ttl: float | None = None) -> None:
+        with self._lock:
+            self._write(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, value, _expiry(ttl), time.time()),
+            )
+
+    def add(self, namespace: str, key: str, value: bytes, ttl: float | None = None) -> bool:
+        now = time.time()
+        with self._lock:
+            # A single statement, so two processes cannot both claim the key.
+            return (
+                self._write(
+                    "INSERT INTO entries VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (namespace, key) DO UPDATE SET"
+                    " value = excluded.value, expires = excluded.expires,"
+                    " written = excluded.written"
+                    " WHERE entries.expires IS NOT NULL AND entries.expires <= ?",
+                    (namespace, key, value, _expiry(ttl), now, now),
+                )
+                == 1
+            )
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._write("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def keys(self, namespace: str) -> list[str]:
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT key FROM entries WHERE namespace = ?"
+                    " AND (expires IS NULL OR expires > ?) ORDER BY written",
+                    (namespace, time.time()),
+                )
+                .fetchall()
+            )
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+
+def open_store(spec: str | None) -> Store:
+    """The store named by SCHEDULING_STORE: unset or "memory", or a SQLite file path.
+
+    A "sqlite:" prefix on the path is accepted and ignored.
+    """
+    if not spec or spec == "memory":
+        return MemoryStore()
+    return SqliteStore(spec.removeprefix("sqlite:"))
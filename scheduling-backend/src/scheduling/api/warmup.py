@@ -0,0 +1,117 @@
+"""Startup warm-up and readiness for the API.
+
+The solver (OR-Tools, which also pulls in pandas) is not imported when the app
+starts, so a new replica answers health checks right away. A background
+thread then imports it and solves a small synthetic request through the same
+path as /api/optimize, paying the one-time native and pydantic initialization
+before real traffic arrives. Readiness is reported once that is done.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Literal
+
+from scheduling.api.convert import compile_request, to_response
+from scheduling.api.dto import (
+    EmployeeDto,
+    OptimizeRequest,
+    PreferPeriodDto,
+    PreferShiftDto,
+    ShiftDto,
+    UnavailablePeriodDto,
+)
+from scheduling.solver.options import SolverOptions
+
+logger = logging.getLogger("uvicorn.error")
+
+WARMUP_TIME_LIMIT = 10.0
+
+WarmupStatus = Literal["pending", "warming_up", "ready", "failed"]
+
+
+@dataclass
+class WarmupState:
+    """Progress of the warm-up, with timings in seconds."""
+
+    status: WarmupStatus = "pending"
+    app_import_seconds: float | None = None
+    solver_import_seconds: float | None = None
+    warmup_seconds: float | None = None
+    error: str | None = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+
+def warmup_request() -> OptimizeRequest:
+    """A small request with overlapping shifts, short rests and every preference type."""
+    day = datetime(2024, 12, 2)
+    shifts = [
+        ShiftDto(
+            id=f"shift{i}",
+            name=f"Shift {i}",
+            start_time=day + timedelta(hours=hours),
+            end_time=day + timedelta(hours=hours + 8),
+            required_abilities=["bartender"] if i % 2 else ["waiter"],
+        )
+        for i, hours in enumerate((8, 12, 18, 32, 36, 42))
+    ]
+    employees = [
+        EmployeeDto(
+            id=f"employee{i}",
+            name=f"Employee {i}",
+            abilities=["waiter", "bartender"] if i % 2 else ["waiter"],
+            preferences=[
+                PreferShiftDto(shift_id=f"shift{i}"),
+                PreferPeriodDto(start=day, end=day + timedelta(days=1)),
+                UnavailablePeriodDto(
+                    start=day + timedelta(days=1), end=day + timedelta(days=1, hours=6)
+                ),
+            ],
+        )
+        for i in range(4)
+    ]
+    return OptimizeRequest(employees=employees, shifts=shifts, max_solutions=2)
+
+
+def warm_up(state: WarmupState) -> None:
+    """Import the solver and run the warm-up request, recording timings in `state`."""
+    state.status = "warming_up"
+    try:
+        started = time.perf_counter()
+        scheduler_module = importlib.import_module("scheduling.solver.scheduler")
+        state.solver_import_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        request = warmup_request()
+        scheduler = scheduler_module.Scheduler.from_problem(compile_request(request))
+        result = scheduler.solve_with_stats(
+            request.max_solutions, SolverOptions(max_time_in_seconds=WARMUP_TIME_LIMIT)
+        )
+        to_response(result, truncated=False, problem=scheduler.problem).model_dump_json()
+        state.warmup_seconds = time.perf_counter() - started
+        state.status = "ready"
+        logger.info(
+            "Warm-up done: app import %.2fs, solver import %.2fs, warm-up solve %.2fs",
+            state.app_import_seconds or 0.0,
+            state.solver_import_seconds,
+            state.warmup_seconds,
+        )
+    except Exception as e:
+        state.status = "failed"
+        state.error = str(e)
+        logger.exception("Warm-up failed")
+    finally:
+        state.done.set()
+
+
+def start_warm_up(state: WarmupState) -> threading.Thread:
+    thread = threading.Thread(target=warm_up, args=(state,), name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,302 @@
+"""The `scheduling` command line.
+
+    scheduling solve problems.jsonl more/ -o results.jsonl --jobs 4 --time-limit 30
+    scheduling replay dump.zip --workers 8
+    scheduling loadtest http://localhost:8000 --generate 40x300 --concurrency 8
+
+`solve` reads optimize requests (v1 or columnar v2, as sent to the API) from
+JSONL files, one per line, or from directories of .json files, and solves them
+in a process pool. Each result is appended to the output as one JSON line
+{"id", "response"[, "profile"]} as soon as it completes, so the output order is
+completion order. Problems whose id is already in the output are skipped, which
+makes an interrupted run resumable by running the same command again. The
+exit status is 2 when any problem failed. `replay` and `loadtest` are
+documented in scheduling.replay and scheduling.loadtest.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from multiprocessing import get_context
+from pathlib import Path
+
+import orjson
+
+from scheduling.api.convert import compile_request, parse_request, to_response
+from scheduling.api.dto import OptimizeResponse
+from scheduling.loadtest import main as loadtest_main
+from scheduling.replay import main as replay_main
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.problem import ProblemValidationError
+from scheduling.solver.scheduler import Scheduler
+
+# Phases reported with --profile, in order. "read" to "compile" and "respond"
+# are timed here, the rest by Scheduler.solve_with_stats.
+PROFILE_PHASES = (
+    "read",
+    "parse",
+    "compile",
+    "precheck",
+    "build",
+    "hint",
+    "dump",
+    "solve",
+    "explain",
+    "respond",
+)
+
+
+@dataclass(frozen=True)
+class ProblemResult:
+    line: bytes
+    success: bool
+    phases: dict[str, float]
+
+
+@dataclass(frozen=True)
+class SolveSettings:
+    time_limit: float | None = None
+    max_solutions: int | None = None
+    num_workers: int | None = None
+    profile: bool = False
+
+
+def iter_problems(paths: list[Path]) -> Iterator[tuple[str, str | Path]]:
+    """Yield (problem id, source) for every problem under `paths`, in order.
+
+    A source is a JSONL line, identified by its "id" field or "<file>:<line>",
+    or a .json file in a directory, identified by its path relative to the
+    directory without the suffix. A line that is not a JSON object is keyed by
+    "<file>:<line>" and fails when it is solved.
+    """
+    for path in paths:
+        if path.is_dir():
+            for file in sorted(path.rglob("*.json")):
+                yield file.relative_to(path).with_suffix("").as_posix(), file
+            continue
+        with path.open() as lines:
+            for number, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    data = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    data = None
+                problem_id = data.get("id") if isinstance(data, dict) else None
+                yield str(problem_id) if problem_id is not None else f"{path.name}:{number}", line
+
+
+def solve_problem(problem_id: str, source: str | Path, settings: SolveSettings) -> ProblemResult:
+    """Solve one problem and return its output line.
+
+    Runs in the worker processes. Invalid problems produce an unsuccessful
+    response, as the API would return; the line is never missing.
+    """
+    phases: dict[str, float] = {}
+    started = time.perf_counter()
+
+    def end_phase(name: str) -> None:
+        nonlocal started
+        now = time.perf_counter()
+        phases[name] = now - started
+        started = now
+
+    try:
+        text = source.read_bytes() if isinstance(source, Path) else source
+        end_phase("read")
+        request = parse_request(orjson.loads(text))
+        end_phase("parse")
+        scheduler = Scheduler.from_problem(compile_request(request))
+        end_phase("compile")
+
+        options = (
+            SolverOptions(**request.options.model_dump())
+            if request.options is not None
+            else SolverOptions()
+        )
+        update: dict[str, object] = {}
+        if settings.time_limit is not None:
+            update["max_time_in_seconds"] = settings.time_limit
+        if settings.num_workers is not None:
+            update["num_workers"] = settings.num_workers
+        max_solutions = settings.max_solutions or request.max_solutions
+        result = scheduler.solve_with_stats(max_solutions, options.model_copy(update=update))
+        phases.update(result.stats.phase_times)
+        started = time.perf_counter()
+        response = to_response(
+            result,
+            truncated=False,
+            problem=scheduler.problem,
+            response_format=request.response_format,
+        )
+    except ProblemValidationError as e:
+        response = OptimizeResponse(success=False, error=str(e), errors=e.errors)
+    except ValueError as e:
+        response = OptimizeResponse(success=False, error=str(e))
+    except Exception as e:
+        response = OptimizeResponse(success=False, error=f"Optimization failed: {e!s}")
+
+    record: dict[str, object] = {"id": problem_id, "response": response.model_dump(mode="json")}
+    if settings.profile:
+        end_phase("respond")
+        record["profile"] = phases
+    return ProblemResult(orjson.dumps(record), response.success, phases)
+
+
+def completed_ids(output: Path) -> set[str]:
+    """Ids already in `output`, after dropping a partly written last line."""
+    if not output.exists():
+        return set()
+    data = output.read_bytes()
+    complete = data[: data.rfind(b"\n") + 1]
+    if len(complete) != len(data):
+        with output.open("r+b") as f:
+            f.truncate(len(complete))
+    return {str(orjson.loads(line)["id"]) for line in complete.splitlines() if line.strip()}
+
+
+def run_solve(
+    paths: list[Path],
+    output: Path,
+    settings: SolveSettings,
+    jobs: int = 1,
+    restart: bool = False,
+) -> dict[str, float]:
+    """Solve every problem under `paths` not yet in `output`; returns run totals.
+
+    With one job the problems are solved in this process. Otherwise up to
+    twice `jobs` problems are queued at a time, so inputs of any size are
+    streamed rather than loaded up front.
+    """
+    if restart:
+        output.unlink(missing_ok=True)
+    done = completed_ids(output)
+    totals: dict[str, float] = {"solved": 0, "failed": 0, "skipped": 0}
+    phase_totals = dict.fromkeys(PROFILE_PHASES, 0.0)
+    started = time.perf_counter()
+
+    def write(result: ProblemResult, out) -> None:
+        out.write(result.line + b"\n")
+        out.flush()
+        totals["solved" if result.success else "failed"] += 1
+        for phase, seconds in result.phases.items():
+            phase_totals[phase] = phase_totals.get(phase, 0.0) + seconds
+
+    def pending_problems() -> Iterator[tuple[str, str | Path]]:
+        for problem_id, source in iter_problems(paths):
+            if problem_id in done:
+                totals["skipped"] += 1
+                continue
+            done.add(problem_id)
+            yield problem_id, source
+
+    with output.open("ab") as out:
+        if jobs == 1:
+            for problem_id, source in pending_problems():
+                write(solve_problem(problem_id, source, settings), out)
+        else:
+            # spawn: CP-SAT's threads do not survive fork reliably.
+            with ProcessPoolExecutor(jobs, mp_context=get_context("spawn")) as pool:
+                problems = pending_problems()
+                running: set[Future[ProblemResult]] = set()
+
+                def submit_next() -> bool:
+                    problem = next(problems, None)
+                    if problem is not None:
+                        running.add(pool.submit(solve_problem, *problem, settings))
+                    return problem is not None
+
+                while len(running) < 2 * jobs and submit_next():
+                    pass
+                while running:
+                    finished, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        write(future.result(), out)
+                        submit_next()
+
+    totals["elapsed"] = time.perf_counter() - started
+    if settings.profile:
+        totals.update({f"phase_{phase}": seconds for phase, seconds in phase_totals.items()})
+    return totals
+
+
+def _print_summary(totals: dict[str, float], profile: bool) -> None:
+    count = int(totals["solved"] + totals["failed"])
+    elapsed = totals["elapsed"]
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(
+        f"{count} problems in {elapsed:.2f}s ({rate:.2f}/s): {int(totals['solved'])} solved, "
+        f"{int(totals['failed'])} failed, {int(totals['skipped'])} already done",
+        file=sys.stderr,
+    )
+    if profile and count:
+        print("phase       total s   mean ms", file=sys.stderr)
+        for phase in PROFILE_PHASES:
+            seconds = totals[f"phase_{phase}"]
+            if seconds:
+                print(f"{phase:<10}{seconds:>9.3f}{1000 * seconds / count:>10.1f}", file=sys.stderr)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="scheduling", description="Shift scheduling tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve = commands.add_parser("solve", help="solve a batch of problems")
+    solve.add_argument("inputs", nargs="+", type=Path, help="JSONL files or directories of .json")
+    solve.add_argument("-o", "--output", type=Path, required=True, help="JSONL file of results")
+    solve.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes"
+    )
+    solve.add_argument(
+        "--workers",
+        type=int,
+        help="CP-SAT threads per solve (default: cores divided by jobs)",
+    )
+    solve.add_argument("--time-limit", type=float, help="seconds per problem")
+    solve.add_argument("--max-solutions", type=int, help="override each request's max_solutions")
+    solve.add_argument("--restart", action="store_true", help="discard existing results")
+    solve.add_argument("--profile", action="store_true", help="record per-phase timings")
+
+    commands.add_parser(
+        "replay", help="re-solve a model dump (see python -m scheduling.replay -h)", add_help=False
+    )
+
+    commands.add_parser(
+        "loadtest",
+        help="send load to a running service (see scheduling loadtest -h)",
+        add_help=False,
+    )
+
+    args, rest = parser.parse_known_args(argv)
+    if args.command == "replay":
+        return replay_main(rest)
+    if args.command == "loadtest":
+        return loadtest_main(rest)
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+
+    jobs = max(1, args.jobs)
+    workers = args.workers
+    if workers is None and jobs > 1:
+        workers = max(1, (os.cpu_count() or 1) // jobs)
+    settings = SolveSettings(
+        time_limit=args.time_limit,
+        max_solutions=args.max_solutions,
+        num_workers=workers,
+        profile=args.profile,
+    )
+    try:
+        totals = run_solve(args.inputs, args.output, settings, jobs, args.restart)
+    except (OSError, orjson.JSONDecodeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    _print_summary(totals, args.profile)
+    return 0 if totals["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,438 @@
+"""Load generator and traffic replay for the optimize endpoints.
+
+    scheduling loadtest http://localhost:8000 --generate 20x100 --generate 60x600 \\
+        --requests 200 --concurrency 8 --rate 4
+    scheduling loadtest http://localhost:8000 --captures /tmp/scheduling-captures \\
+        --replay --speedup 10
+
+Requests are generated (`--generate EMPLOYEESxSHIFTS`, repeatable), read from
+JSONL files of optimize requests (`--input`), or taken from flight-recorder
+captures (`--captures`, a directory or zip archives). They are sent closed
+loop at `--concurrency`, or open loop at `--rate` requests per second with
+Poisson or uniform arrivals; `--replay` instead sends recorded requests at
+their recorded times divided by `--speedup`. Latency runs from the time a
+request was due to be sent, so queueing behind the concurrency limit counts.
+
+The report gives p50/p95/p99 latency, throughput and error rates, overall
+and by request body size, split by X-Cache when the server reports it. With
+`--server-pid` (Linux), the CPU seconds the server process and its children
+used during the run are reported as well.
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import zipfile
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import orjson
+
+ABILITIES = ("waiter", "bartender", "kitchen")
+
+
+@dataclass(frozen=True)
+class LoadRequest:
+    body: bytes
+    content_type: str = "application/json"
+    endpoint: str = "/api/optimize"
+    # Seconds after the first recorded request, for --replay.
+    offset: float | None = None
+
+
+@dataclass(frozen=True)
+class Sample:
+    size: int
+    latency: float
+    status: int  # HTTP status, 0 when the request did not complete
+    success: bool
+    cache: str | None
+
+
+def generate_request(
+    num_employees: int, num_shifts: int, seed: int = 0, time_limit: float = 5.0
+) -> dict:
+    """A random optimize request with several shifts a day and a few preferences each."""
+    rng = random.Random(seed)
+    day = datetime(2025, 1, 6)
+    per_day = max(1, num_employees // 3)
+    shifts = []
+    for i in range(num_shifts):
+        start = day + timedelta(days=i // per_day, hours=rng.choice((6, 10, 14, 18)))
+        shifts.append(
+            {
+                "id": f"shift{i}",
+                "name": f"Shift {i}",
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=rng.choice((4, 6, 8)))).isoformat(),
+                "required_abilities": [rng.choice(ABILITIES)],
+            }
+        )
+    days = max(1, math.ceil(num_shifts / per_day))
+    employees = []
+    for e in range(num_employees):
+        preferences = []
+        for _ in range(3):
+            kind = rng.random()
+            if kind < 0.4 and shifts:
+                preferences.append({"type": "prefer_shift", "shift_id": rng.choice(shifts)["id"]})
+                continue
+            start = day + timedelta(days=rng.randrange(days))
+            preferences.append(
+                {
+                    "type": "prefer_period" if kind < 0.8 else "unavailable_period",
+                    "start": start.isoformat(),
+                    "end": (start + timedelta(days=1)).isoformat(),
+                }
+            )
+        employees.append(
+            {
+                "id": f"employee{e}",
+                "name": f"Employee {e}",
+                "abilities": rng.sample(ABILITIES, rng.randint(1, 3)),
+                "preferences": preferences,
+            }
+        )
+    return {
+        "employees": employees,
+        "shifts": shifts,
+        "max_solutions": 10,
+        "options": {"max_time_in_seconds": time_limit},
+    }
+
+
+def _parse_shape(text: str) -> tuple[int, int]:
+    employees, _, shifts = text.lower().partition("x")
+    try:
+        return int(employees), int(shifts)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected EMPLOYEESxSHIFTS, got '{text}'") from None
+
+
+def read_jsonl(path: Path) -> Iterator[LoadRequest]:
+    """Requests from a JSONL file; a "sent_at" Unix time on a line is kept for replay."""
+    first = None
+    with path.open("rb") as lines:
+        for line in lines:
+            if not line.strip():
+                continue
+            data = orjson.loads(line)
+            sent_at = data.pop("sent_at", None)
+            data.pop("id", None)
+            offset = None
+            if sent_at is not None:
+                first = sent_at if first is None else first
+                offset = sent_at - first
+            endpoint = "/api/v2/optimize" if isinstance(data.get("employees"), dict) else None
+            yield LoadRequest(
+                orjson.dumps(data), endpoint=endpoint or "/api/optimize", offset=offset
+            )
+
+
+def read_captures(path: Path) -> list[LoadRequest]:
+    """Requests from flight-recorder captures, in arrival order."""
+    archives = sorted(path.glob("*.zip")) if path.is_dir() else [path]
+    captured: list[tuple[float, LoadRequest]] = []
+    for archive_path in archives:
+        with zipfile.ZipFile(archive_path) as archive:
+            capture = json.loads(archive.read("capture.json"))
+            names = archive.namelist()
+            is_msgpack = "request.msgpack" in names
+            body = archive.read("request.msgpack" if is_msgpack else "request.json")
+        arrived = (
+            datetime.fromisoformat(capture["recorded_at"]).timestamp() - capture["latency_seconds"]
+        )
+        content_type = "application/msgpack" if is_msgpack else "application/json"
+        captured.append((arrived, LoadRequest(body, content_type, capture["endpoint"])))
+    captured.sort(key=lambda item: item[0])
+    if not captured:
+        return []
+    first = captured[0][0]
+    return [
+        LoadRequest(r.body, r.content_type, r.endpoint, offset=arrived - first)
+        for arrived, r in captured
+    ]
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted `values`; NaN when empty."""
+    if not values:
+        return math.nan
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+
+def size_bucket(size: int) -> str:
+    """The power-of-two KiB size class of a body, e.g. "<=16KiB"."""
+    kib = max(1, math.ceil(size / 1024))
+    return f"<={1 << (kib - 1).bit_length()}KiB"
+
+
+def server_cpu_seconds(pid: int) -> float:
+    """User and system CPU of `pid` and its live descendants, from /proc."""
+    ticks = os.sysconf("SC_CLK_TCK")
+    total = 0.0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            stat = Path(f"/proc/{current}/stat").read_text()
+        except OSError:
+            continue
+        fields = stat.rsplit(")", 1)[1].split()
+        total += (int(fields[11]) + int(fields[12])) / ticks
+        for task in Path(f"/proc/{current}/task").glob("*"):
+            try:
+                pending.extend(int(c) for c in (task / "children").read_text().split())
+            except OSError:
+                continue
+    return total
+
+
+class _Sender:
+    """Sends requests over one keep-alive connection per thread."""
+
+    def __init__(self, url: str, timeout: float):
+        parts = urlsplit(url)
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname or "localhost"
+        self._port = parts.port
+        self._prefix = parts.path.rstrip("/")
+        self._timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            factory = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            connection = factory(self._host, self._port, timeout=self._timeout)
+            self._local.connection = connection
+        return connection
+
+    def send(self, request: LoadRequest, due: float) -> Sample:
+        connection = self._connection()
+        try:
+            connection.request(
+                "POST",
+                self._prefix + request.endpoint,
+                body=request.body,
+                headers={"Content-Type": request.content_type, "Accept": "application/json"},
+            )
+            response = connection.getresponse()
+            body = response.read()
+            latency = time.perf_counter() - due
+            success = response.status == 200 and orjson.loads(body).get("success") is True
+            return Sample(
+                len(request.body), latency, response.status, success, response.getheader("X-Cache")
+            )
+        except (OSError, http.client.HTTPException, orjson.JSONDecodeError):
+            connection.close()
+            self._local.connection = None
+            return Sample(len(request.body), time.perf_counter() - due, 0, False, None)
+
+
+def run_load(
+    url: str,
+    requests: list[LoadRequest],
+    count: int,
+    concurrency: int,
+    rate: float | None = None,
+    arrivals: str = "poisson",
+    replay: bool = False,
+    speedup: float = 1.0,
+    timeout: float = 300.0,
+    seed: int = 0,
+) -> tuple[list[Sample], float]:
+    """Send `count` requests, cycling through `requests`; returns the samples and seconds taken.
+
+    Closed loop without `rate`: each of `concurrency` senders starts its next
+    request when the previous one returns. Open loop with `rate` (or
+    `replay`): requests fall due on schedule and wait for a free sender.
+    """
+    sender = _Sender(url, timeout)
+    rng = random.Random(seed)
+    samples: list[Sample] = []
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        if rate is None and not replay:
+            chosen = iter(range(count))
+            lock = threading.Lock()
+
+            def closed_loop() -> list[Sample]:
+                mine = []
+                while True:
+                    with lock:
+                        index = next(chosen, None)
+                    if index is None:
+                        return mine
+                    mine.append(sender.send(requests[index % len(requests)], time.perf_counter()))
+
+            for result in [pool.submit(closed_loop) for _ in range(concurrency)]:
+                samples.extend(result.result())
+        else:
+            futures = []
+            due = started
+            for index in range(count):
+                request = requests[index % len(requests)]
+                if replay:
+                    # Later passes over the recording repeat it, a second apart.
+                    cycle = index // len(requests)
+                    span = (requests[-1].offset or 0.0) + 1.0
+                    due = started + ((request.offset or 0.0) + cycle * span) / speedup
+                elif index > 0:
+                    due += rng.expovariate(rate) if arrivals == "poisson" else 1.0 / rate
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(pool.submit(sender.send, request, due))
+            samples = [future.result() for future in futures]
+
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict:
+    """Latency percentiles, throughput and error rates, overall and per size and cache."""
+
+    def stats(group: list[Sample]) -> dict:
+        latencies = sorted(s.latency for s in group)
+        return {
+            "requests": len(group),
+            "throughput": len(group) / elapsed if elapsed > 0 else 0.0,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else math.nan,
+            "http_errors": sum(1 for s in group if s.status != 200) / max(1, len(group)),
+            "failures": sum(1 for s in group if s.status == 200 and not s.success)
+            / max(1, len(group)),
+        }
+
+    by_size: dict[str, list[Sample]] = {}
+    for sample in sorted(samples, key=lambda s: s.size):
+        by_size.setdefault(size_bucket(sample.size), []).append(sample)
+    by_cache: dict[str, list[Sample]] = {}
+    for sample in samples:
+        if sample.cache is not None:
+            by_cache.setdefault(sample.cache, []).append(sample)
+    return {
+        "elapsed": elapsed,
+        "overall": stats(samples),
+        "by_size": {bucket: stats(group) for bucket, group in by_size.items()},
+        "by_cache": {cache: stats(group) for cache, group in sorted(by_cache.items())},
+    }
+
+
+def _print_report(report: dict) -> None:
+    header = (
+        f"{'':<14}{'requests':>9}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'max ms':>10}{'http err':>10}{'failed':>8}"
+    )
+    print(header)
+
+    def row(label: str, s: dict) -> None:
+        print(
+            f"{label:<14}{s['requests']:>9}{s['throughput']:>9.2f}"
+            f"{1000 * s['p50']:>10.1f}{1000 * s['p95']:>10.1f}{1000 * s['p99']:>10.1f}"
+            f"{1000 * s['max']:>10.1f}{s['http_errors']:>10.1%}{s['failures']:>8.1%}"
+        )
+
+    row("all", report["overall"])
+    for bucket, s in report["by_size"].items():
+        row(bucket, s)
+    for cache, s in report["by_cache"].items():
+        row(f"cache {cache}", s)
+    if "server_cpu_seconds" in report:
+        cpu = report["server_cpu_seconds"]
+        requests = max(1, report["overall"]["requests"])
+        print(
+            f"server CPU {cpu:.2f}s ({cpu / report['elapsed']:.2f} cores, "
+            f"{1000 * cpu / requests:.1f} ms per request)"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="scheduling loadtest", description="Load-test the optimize endpoints."
+    )
+    parser.add_argument("url", help="service base URL, e.g. http://localhost:8000")
+    parser.add_argument(
+        "--generate",
+        type=_parse_shape,
+        action="append",
+        default=[],
+        metavar="EMPLOYEESxSHIFTS",
+        help="send generated requests of this size (repeatable)",
+    )
+    parser.add_argument(
+        "--time-limit", type=float, default=5.0, help="solver seconds for generated requests"
+    )
+    parser.add_argument("--input", type=Path, action="append", default=[], help="JSONL requests")
+    parser.add_argument("--captures", type=Path, help="flight-recorder directory or capture zip")
+    parser.add_argument("--requests", type=int, help="requests to send (default: one each)")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight at most")
+    parser.add_argument("--rate", type=float, help="open-loop arrival rate, requests per second")
+    parser.add_argument("--arrivals", choices=("poisson", "uniform"), default="poisson")
+    parser.add_argument("--replay", action="store_true", help="send at the recorded times")
+    parser.add_argument("--speedup", type=float, default=1.0, help="replay this much faster")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds per request")
+    parser.add_argument("--server-pid", type=int, help="report this process tree's CPU time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    requests = [
+        LoadRequest(
+            orjson.dumps(generate_request(employees, shifts, args.seed + i, args.time_limit))
+        )
+        for i, (employees, shifts) in enumerate(args.generate)
+    ]
+    try:
+        for path in args.input:
+            requests.extend(read_jsonl(path))
+        if args.captures is not None:
+            requests.extend(read_captures(args.captures))
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    if not requests:
+        parser.error("no requests: use --generate, --input or --captures")
+    if args.replay and any(r.offset is None for r in requests):
+        parser.error("--replay needs recorded requests (--captures, or --input with sent_at)")
+
+    cpu_before = server_cpu_seconds(args.server_pid) if args.server_pid else None
+    samples, elapsed = run_load(
+        args.url,
+        requests,
+        args.requests or len(requests),
+        max(1, args.concurrency),
+        rate=args.rate,
+        arrivals=args.arrivals,
+        replay=args.replay,
+        speedup=args.speedup,
+        timeout=args.timeout,
+        seed=args.seed,
+    )
+    report = summarize(samples, elapsed)
+    if cpu_before is not None:
+        report["server_cpu_seconds"] = server_cpu_seconds(args.server_pid) - cpu_before
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    return 0 if report["overall"]["http_errors"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
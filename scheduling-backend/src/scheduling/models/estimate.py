@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+
+
+class ProblemEstimate(BaseModel):
+    """Predicted size and cost of solving a problem, before its model is built.
+
+    `variables`, `constraints` and `terms` (non-zero coefficients) describe
+    the CP-SAT model. `build_seconds` is the time to build it, `solve_seconds`
+    the expected search time (capped by the time limit), `cpu_seconds` both
+    over all search workers, and `memory_bytes` the solve's expected peak.
+    """
+
+    variables: int
+    constraints: int
+    terms: int
+    assignment_variables: int
+    overlap_pairs: int
+    rest_pairs: int
+    preferences: int
+    build_seconds: float
+    solve_seconds: float
+    cpu_seconds: float
+    memory_bytes: int
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from scheduling.types import EmployeeId, PreferenceType, ShiftId
+
+UncoverableReason = Literal[
+    "no_qualified_employee",
+    "no_available_employee",
+    "conflicting_hard_preferences",
+]
+
+
+class UncoverableShift(BaseModel):
+    shift_id: ShiftId
+    reason: UncoverableReason
+
+
+class BottleneckWindow(BaseModel):
+    """A set of mutually overlapping shifts that cannot all be staffed at once.
+
+    `available` is the largest number of these shifts that can be covered by
+    distinct employees; `unmatched_shift_ids` are the ones left over in one
+    such best cover.
+    """
+
+    start: datetime
+    end: datetime
+    shift_ids: list[ShiftId]
+    required: int
+    available: int
+    unmatched_shift_ids: list[ShiftId] = Field(default_factory=list)
+
+
+class FeasibilityReport(BaseModel):
+    feasible: bool = True
+    uncoverable_shifts: list[UncoverableShift] = Field(default_factory=list)
+    bottlenecks: list[BottleneckWindow] = Field(default_factory=list)
+
+
+class Conflict(BaseModel):
+    """One hard constraint taking part in an infeasibility explanation.
+
+    `kind` is "coverage" for the rule that `shift_id` needs exactly one
+    employee, or "preference" for the hard preference at `preference_index`
+    in the employee's preference list.
+    """
+
+    kind: Literal["coverage", "preference"]
+    shift_id: ShiftId | None = None
+    employee_id: EmployeeId | None = None
+    preference_index: int | None = None
+    preference_type: PreferenceType | None = None
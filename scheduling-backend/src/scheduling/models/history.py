@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+from scheduling.types import EmployeeId
+
+
+class PastSchedule(BaseModel):
+    """A solved schedule reduced to what carries over to next week's problem.
+
+    `slots` has one entry per shift, "weekday start duration abilities" with
+    the weekday 0-6 from Monday, start and duration in seconds of local time
+    and the required abilities comma-joined in sorted order. Shift ids are
+    not kept: they change from week to week, slots do not. `assignments`
+    names the employee who worked each slot.
+    """
+
+    employees: list[EmployeeId]
+    slots: list[str]
+    assignments: list[EmployeeId]
@@ -1,7 +1,22 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+from scheduling.models.feasibility import Conflict, FeasibilityReport
 from scheduling.types import EmployeeId, PreferenceType, ShiftId
 
+SolveStatus = Literal["optimal", "feasible", "infeasible", "model_invalid", "unknown"]
+StopReason = Literal[
+    "max_solutions",
+    "first_feasible",
+    "objective_target",
+    "gap_limit",
+    "stall_timeout",
+    "cancelled",
+    "deadline",
+    "preempted",
+]
+
 
 class SolutionMetrics(BaseModel):
     soft_preference_score: int = 0
@@ -13,3 +28,50 @@ class SolutionMetrics(BaseModel):
 class Solution(BaseModel):
     assignments: dict[ShiftId, EmployeeId]
     metrics: SolutionMetrics = Field(default_factory=SolutionMetrics)
+
+
+class SolveStats(BaseModel):
+    """Summary of a single CP-SAT run.
+
+    `gap` is the relative distance between the best objective found and the
+    proven bound; it is 0.0 for proven optimal runs and None when there is no
+    objective or no solution was found.
+    """
+
+    status: SolveStatus = "unknown"
+    objective_value: float | None = None
+    best_objective_bound: float | None = None
+    gap: float | None = None
+    wall_time: float = 0.0
+    user_time: float = 0.0
+    num_conflicts: int = 0
+    num_branches: int = 0
+    num_solutions: int = 0
+    stop_reason: StopReason | None = None
+    hit_time_limit: bool = False
+    # Seconds per phase of Scheduler.solve_with_stats, in order: "precheck",
+    # "build", "hint", "dump", "solve" and "explain", for the phases that ran;
+    # ColumnGenerationScheduler.solve reports "precheck", "columns" and "integer".
+    phase_times: dict[str, float] = Field(default_factory=dict)
+
+
+class SolveTrace(BaseModel):
+    """The solver's view of a solve, for diagnosing slow ones.
+
+    `parameters` is SatParameters in text format, `model_stats` CP-SAT's
+    summary of the model, and `search_log` its search log, line by line.
+    """
+
+    parameters: str
+    model_stats: str
+    search_log: list[str] = Field(default_factory=list)
+    search_log_dropped: int = 0
+
+
+class SolveResult(BaseModel):
+    solutions: list[Solution] = Field(default_factory=list)
+    stats: SolveStats = Field(default_factory=SolveStats)
+    feasibility: FeasibilityReport | None = None
+    conflicts: list[Conflict] = Field(default_factory=list)
+    # Set when SolverOptions.trace_threshold was reached.
+    trace: SolveTrace | None = None
@@ -1,51 +1,204 @@
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
+"""Terminal output for schedules.
+
+The "rich" mode draws tables and needs the `demo` extra. "plain" and "tsv"
+write one line per assignment as they go, without rich, so printing a large
+run takes time linear in its size and memory for one line at a time. Any mode
+can be limited to the `top` solutions, show later solutions only where they
+differ from the best (`diff`), and show one `page` of `page_size` shifts.
+"""
+
+import sys
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Literal, TextIO
 
 from scheduling.models.employee import Employee
 from scheduling.models.shift import Shift
-from scheduling.models.solution import Solution
+from scheduling.models.solution import Solution, SolutionMetrics
+from scheduling.types import EmployeeId, ShiftId
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+RenderMode = Literal["rich", "plain", "tsv"]
+
+# print_input_summary summarizes by day and ability above this many employees or shifts.
+SUMMARY_THRESHOLD = 50
+
+TSV_HEADER = "solution\tshift_id\tshift\tstart\tend\temployee_id\temployee\tabilities"
+
+
+@dataclass(frozen=True)
+class _Row:
+    shift_id: ShiftId
+    employee_id: EmployeeId
+    shift_name: str
+    time_range: str
+    start: str
+    end: str
+    employee_name: str
+    abilities: str
+
+
+class _Rows:
+    """Display strings for every shift and employee, formatted once per run."""
+
+    def __init__(self, employees: list[Employee], shifts: list[Shift]):
+        self.employees = {e.id: (e.name, ", ".join(e.abilities)) for e in employees}
+        self.shifts = {
+            s.id: (
+                s.name,
+                f"{s.start_time.strftime('%H:%M')} - {s.end_time.strftime('%H:%M')}",
+                s.start_time.isoformat(),
+                s.end_time.isoformat(),
+            )
+            for s in shifts
+        }
+        self.order = sorted(self.shifts)
+
+    def shift_order(self, solution: Solution) -> list[ShiftId]:
+        """Shift ids in display order, including any the shift list does not name."""
+        unknown = [shift_id for shift_id in solution.assignments if shift_id not in self.shifts]
+        return self.order + sorted(unknown) if unknown else self.order
+
+    def rows(
+        self,
+        solution: Solution,
+        order: list[ShiftId],
+        best: Solution | None = None,
+    ) -> Iterator[_Row]:
+        """Rows of the assigned shifts in `order`; with `best`, only those that differ."""
+        assignments = solution.assignments
+        for shift_id in order:
+            employee_id = assignments.get(shift_id)
+            if employee_id is None:
+                continue
+            if best is not None and best.assignments.get(shift_id) == employee_id:
+                continue
+            name, time_range, start, end = self.shifts.get(shift_id, (shift_id, "?", "", ""))
+            employee_name, abilities = self.employees.get(employee_id, (employee_id, ""))
+            yield _Row(
+                shift_id, employee_id, name, time_range, start, end, employee_name, abilities
+            )
+
+
+def _page(order: list[ShiftId], page_size: int | None, page: int) -> list[ShiftId]:
+    if page_size is None:
+        return order
+    start = (page - 1) * page_size
+    return order[start : start + page_size]
+
+
+def _metrics_line(metrics: SolutionMetrics) -> str:
+    line = (
+        f"score {metrics.soft_preference_score}  fairness {metrics.fairness_score:.2f}"
+        f"  assigned {metrics.total_shifts_assigned}"
+    )
+    if metrics.preferences_satisfied:
+        line += "  satisfied " + ", ".join(
+            f"{k}: {v}" for k, v in metrics.preferences_satisfied.items()
+        )
+    return line
 
 
 def print_solutions(
     solutions: list[Solution],
     employees: list[Employee],
     shifts: list[Shift],
-    console: Console | None = None,
+    console: "Console | None" = None,
+    *,
+    mode: RenderMode = "rich",
+    top: int | None = None,
+    diff: bool = False,
+    page_size: int | None = None,
+    page: int = 1,
+    file: TextIO | None = None,
+) -> None:
+    """Print `solutions`, best first.
+
+    `top` prints only the first solutions. With `diff`, solutions after the
+    first list only the shifts assigned differently from it. `page_size` and
+    `page` (from 1) select a window of the shifts, ordered by id. The plain and
+    TSV modes write to `file` (stdout by default); TSV has a header line and
+    no metrics.
+    """
+    table = _Rows(employees, shifts)
+    shown = solutions if top is None else solutions[:top]
+    best = solutions[0] if diff and solutions else None
+
+    if mode == "rich":
+        _print_rich_solutions(table, shown, len(solutions), best, page_size, page, console)
+        return
+
+    out = file or sys.stdout
+    write = out.write
+    if mode == "tsv":
+        write(TSV_HEADER + "\n")
+    elif not solutions:
+        write("No solutions found\n")
+        return
+    else:
+        write(f"Found {len(solutions)} solution(s)\n")
+
+    for number, solution in enumerate(shown, 1):
+        order = _page(table.shift_order(solution), page_size, page)
+        compare = best if number > 1 else None
+        rows = table.rows(solution, order, compare)
+        if mode == "tsv":
+            for row in rows:
+                write(
+                    f"{number}\t{row.shift_id}\t{row.shift_name}\t{row.start}\t{row.end}"
+                    f"\t{row.employee_id}\t{row.employee_name}\t{row.abilities}\n"
+                )
+            continue
+        title = f"\nSolution {number}"
+        write(title + (" (changes from solution 1)\n" if compare is not None else "\n"))
+        for row in rows:
+            write(
+                f"  {row.shift_name}  {row.start[:10]} {row.time_range}"
+                f"  {row.employee_name}  ({row.abilities})\n"
+            )
+        write(f"  {_metrics_line(solution.metrics)}\n")
+    out.flush()
+
+
+def _print_rich_solutions(
+    table: _Rows,
+    solutions: list[Solution],
+    total: int,
+    best: Solution | None,
+    page_size: int | None,
+    page: int,
+    console: "Console | None",
 ) -> None:
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.table import Table
+
     console = console or Console()
-    employee_map = {e.id: e for e in employees}
-    shift_map = {s.id: s for s in shifts}
 
-    if not solutions:
+    if not total:
         console.print(Panel("[red bold]No solutions found![/]", title="Result"))
         return
 
-    console.print(f"\n[bold green]Found {len(solutions)} solution(s)[/]\n")
+    console.print(f"\n[bold green]Found {total} solution(s)[/]\n")
 
     for i, solution in enumerate(solutions, 1):
-        table = Table(title=f"Solution {i}", show_header=True, header_style="bold cyan")
-        table.add_column("Shift", style="white")
-        table.add_column("Time", style="dim")
-        table.add_column("Assigned To", style="green")
-        table.add_column("Abilities", style="yellow")
-
-        for shift_id, employee_id in sorted(solution.assignments.items()):
-            shift = shift_map.get(shift_id)
-            employee = employee_map.get(employee_id)
-
-            shift_name = shift.name if shift else shift_id
-            time_range = (
-                f"{shift.start_time.strftime('%H:%M')} - {shift.end_time.strftime('%H:%M')}"
-                if shift
-                else "?"
-            )
-            employee_name = employee.name if employee else employee_id
-            abilities = ", ".join(employee.abilities) if employee else ""
+        compare = best if i > 1 else None
+        title = f"Solution {i}" + (" (changes from solution 1)" if compare is not None else "")
+        rich_table = Table(title=title, show_header=True, header_style="bold cyan")
+        rich_table.add_column("Shift", style="white")
+        rich_table.add_column("Time", style="dim")
+        rich_table.add_column("Assigned To", style="green")
+        rich_table.add_column("Abilities", style="yellow")
 
-            table.add_row(shift_name, time_range, employee_name, abilities)
+        order = _page(table.shift_order(solution), page_size, page)
+        for row in table.rows(solution, order, compare):
+            rich_table.add_row(row.shift_name, row.time_range, row.employee_name, row.abilities)
 
-        console.print(table)
+        console.print(rich_table)
 
         metrics = solution.metrics
         metrics_table = Table(show_header=False, box=None, padding=(0, 2))
@@ -72,11 +225,150 @@ def print_solutions(
         console.print()
 
 
+@dataclass(frozen=True)
+class _DaySummary:
+    day: date
+    shifts: int
+    hours: float
+    abilities: str
+
+
+def _summarize_days(shifts: list[Shift]) -> list[_DaySummary]:
+    counts: Counter[date] = Counter()
+    hours: Counter[date] = Counter()
+    abilities: defaultdict[date, Counter[str]] = defaultdict(Counter)
+    for shift in shifts:
+        day = shift.start_time.date()
+        counts[day] += 1
+        hours[day] += (shift.end_time - shift.start_time).total_seconds() / 3600
+        abilities[day].update(shift.required_abilities)
+    return [
+        _DaySummary(
+            day,
+            counts[day],
+            hours[day],
+            ", ".join(f"{a}: {n}" for a, n in sorted(abilities[day].items())) or "-",
+        )
+        for day in sorted(counts)
+    ]
+
+
+def _summarize_abilities(
+    employees: list[Employee], shifts: list[Shift]
+) -> list[tuple[str, int, int]]:
+    """(ability, employees with it, shifts requiring it), by ability name."""
+    staff = Counter(a for e in employees for a in set(e.abilities))
+    needed = Counter(a for s in shifts for a in set(s.required_abilities))
+    return [(a, staff[a], needed[a]) for a in sorted(staff.keys() | needed.keys())]
+
+
 def print_input_summary(
     employees: list[Employee],
     shifts: list[Shift],
-    console: Console | None = None,
+    console: "Console | None" = None,
+    *,
+    mode: RenderMode = "rich",
+    summarize: bool | None = None,
+    file: TextIO | None = None,
+) -> None:
+    """Print the employees and shifts of a problem.
+
+    With `summarize`, print shift counts and hours per day and staffing per
+    ability instead of a row per employee and shift; by default that happens
+    above SUMMARY_THRESHOLD rows.
+    """
+    if summarize is None:
+        summarize = max(len(employees), len(shifts)) > SUMMARY_THRESHOLD
+    if mode == "rich":
+        if summarize:
+            _print_rich_summary(employees, shifts, console)
+        else:
+            _print_rich_input(employees, shifts, console)
+        return
+
+    out = file or sys.stdout
+    write = out.write
+    sep = "\t" if mode == "tsv" else "  "
+    if summarize:
+        write(f"{len(employees)} employees, {len(shifts)} shifts\n")
+        write(sep.join(("day", "shifts", "hours", "required")) + "\n")
+        for summary in _summarize_days(shifts):
+            write(
+                sep.join(
+                    (
+                        summary.day.isoformat(),
+                        str(summary.shifts),
+                        f"{summary.hours:g}",
+                        summary.abilities,
+                    )
+                )
+                + "\n"
+            )
+        write(sep.join(("ability", "employees", "shifts")) + "\n")
+        for ability, staff, needed in _summarize_abilities(employees, shifts):
+            write(sep.join((ability, str(staff), str(needed))) + "\n")
+    else:
+        write(sep.join(("employee", "name", "abilities", "preferences")) + "\n")
+        for emp in employees:
+            prefs = ", ".join(p.type + (" (hard)" if p.is_hard else "") for p in emp.preferences)
+            write(
+                sep.join((str(emp.id), emp.name, ", ".join(emp.abilities) or "-", prefs or "-"))
+                + "\n"
+            )
+        write(sep.join(("shift", "name", "start", "end", "required")) + "\n")
+        for shift in shifts:
+            write(
+                sep.join(
+                    (
+                        str(shift.id),
+                        shift.name,
+                        shift.start_time.isoformat(),
+                        shift.end_time.isoformat(),
+                        ", ".join(shift.required_abilities) or "-",
+                    )
+                )
+                + "\n"
+            )
+    out.flush()
+
+
+def _print_rich_summary(
+    employees: list[Employee], shifts: list[Shift], console: "Console | None"
 ) -> None:
+    from rich.console import Console
+    from rich.table import Table
+
+    console = console or Console()
+    console.print(f"[bold]{len(employees)} employees, {len(shifts)} shifts[/]\n")
+
+    day_table = Table(title="Shifts by Day", show_header=True, header_style="bold magenta")
+    day_table.add_column("Date", style="cyan")
+    day_table.add_column("Shifts", justify="right")
+    day_table.add_column("Hours", justify="right")
+    day_table.add_column("Required Abilities", style="yellow")
+    for summary in _summarize_days(shifts):
+        day_table.add_row(
+            summary.day.isoformat(), str(summary.shifts), f"{summary.hours:g}", summary.abilities
+        )
+    console.print(day_table)
+    console.print()
+
+    ability_table = Table(title="Abilities", show_header=True, header_style="bold magenta")
+    ability_table.add_column("Ability", style="yellow")
+    ability_table.add_column("Employees", justify="right")
+    ability_table.add_column("Shifts Requiring", justify="right")
+    for ability, staff, needed in _summarize_abilities(employees, shifts):
+        ability_table.add_row(ability, str(staff), str(needed))
+    console.print(ability_table)
+    console.print()
+
+
+def _print_rich_input(
+    employees: list[Employee], shifts: list[Shift], console: "Console | None"
+) -> None:
+    from rich.console import Console
+    from rich.table import Table
+
     console = console or Console()
 
     emp_table = Table(title="Employees", show_header=True, header_style="bold magenta")
@@ -0,0 +1,148 @@
+"""Re-solve a model dump written with SolverOptions.dump_path.
+
+    python -m scheduling.replay dump.zip --workers 8 --time-limit 30 \\
+        --param "linearization_level: 2" --output result.json
+
+The dumped solver parameters are used unless overridden. The run's statistics
+and best assignments, mapped back to shift and employee ids, are written as
+JSON to stdout or `--output`.
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+
+from ortools.sat.python import cp_model
+
+from scheduling.models.solution import SolveStats
+from scheduling.solver.export import ModelDump, load_model
+from scheduling.types import EmployeeId, ShiftId
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    stats: SolveStats
+    assignments: dict[ShiftId, EmployeeId]
+    parameters: str
+
+
+class _BestSolution(cp_model.CpSolverSolutionCallback):
+    """Keeps the assignment values of the best solution (the models maximize)."""
+
+    def __init__(self, dump: ModelDump, max_solutions: int):
+        super().__init__()
+        self._vars = [dump.model.GetBoolVarFromProtoIndex(i) for i in dump.assign_variables]
+        self._has_objective = dump.model.Proto().has_objective()
+        self._max_solutions = max_solutions
+        self.num_solutions = 0
+        self.best_objective: float | None = None
+        self.values: list[bool] = []
+
+    def on_solution_callback(self):
+        self.num_solutions += 1
+        objective = self.ObjectiveValue() if self._has_objective else 0.0
+        if self.best_objective is None or objective > self.best_objective:
+            self.best_objective = objective
+            self.values = [self.BooleanValue(var) for var in self._vars]
+        if self._max_solutions > 0 and self.num_solutions >= self._max_solutions:
+            self.StopSearch()
+
+
+def replay(
+    dump: ModelDump, overrides: list[str] | None = None, max_solutions: int | None = None
+) -> ReplayResult:
+    """Solve the dumped model with its parameters, merged with `overrides`.
+
+    Each override is SatParameters text such as "num_workers: 8".
+    `max_solutions` defaults to the limit of the original solve; 0 means none.
+    """
+    solver = cp_model.CpSolver()
+    solver.parameters.parse_text_format(dump.parameters)
+    for override in overrides or []:
+        if not solver.parameters.merge_text_format(override):
+            raise ValueError(f"Invalid solver parameter: '{override}'")
+
+    collector = _BestSolution(dump, dump.max_solutions if max_solutions is None else max_solutions)
+    status = solver.Solve(dump.model, collector)
+
+    found = collector.num_solutions > 0
+    has_objective = dump.model.Proto().has_objective()
+    return ReplayResult(
+        stats=SolveStats(
+            status=solver.StatusName(status).lower(),
+            objective_value=collector.best_objective if found and has_objective else None,
+            best_objective_bound=solver.BestObjectiveBound() if found and has_objective else None,
+            wall_time=solver.WallTime(),
+            user_time=solver.UserTime(),
+            num_conflicts=solver.NumConflicts(),
+            num_branches=solver.NumBranches(),
+            num_solutions=collector.num_solutions,
+            hit_time_limit=status in (cp_model.FEASIBLE, cp_model.UNKNOWN),
+        ),
+        assignments=dump.decode(collector.values) if found else {},
+        parameters=str(solver.parameters),
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m scheduling.replay", description="Re-solve a dumped scheduling model."
+    )
+    parser.add_argument("dump", help="model dump written with SolverOptions.dump_path")
+    parser.add_argument("--workers", type=int, help="number of search workers")
+    parser.add_argument("--time-limit", type=float, help="time limit in seconds")
+    parser.add_argument(
+        "--max-solutions",
+        type=int,
+        help="stop after this many solutions (default: as dumped, 0 for no limit)",
+    )
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        metavar="TEXT",
+        help='extra SatParameters in text format, e.g. "linearization_level: 2"',
+    )
+    parser.add_argument("--log", action="store_true", help="print the CP-SAT search log")
+    parser.add_argument("--output", help="write the JSON result here instead of stdout")
+    args = parser.parse_args(argv)
+
+    overrides = list(args.param)
+    if args.workers is not None:
+        overrides.append(f"num_workers: {args.workers}")
+    if args.time_limit is not None:
+        overrides.append(f"max_time_in_seconds: {args.time_limit}")
+    if args.log:
+        overrides.append("log_search_progress: true")
+
+    try:
+        result = replay(load_model(args.dump), overrides, args.max_solutions)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    output = json.dumps(
+        {
+            "stats": result.stats.model_dump(),
+            "parameters": result.parameters,
+            "assignments": result.assignments,
+        },
+        indent=2,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    stats = result.stats
+    print(
+        f"{stats.status}: {stats.num_solutions} solutions, objective {stats.objective_value}, "
+        f"{stats.wall_time:.2f}s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""Build the CP-SAT model by filling its proto in bulk from index arrays.
+
+Scheduler.build_model goes through the cp_model API: one Python call, an
+expression object and a name string per variable and constraint. For models
+with hundreds of thousands of assignment variables, that is most of the build
+time. This builder computes the (employee, shift) variables, overlap cliques,
+preference rows and short-rest pairs with numpy and writes them straight into
+the model's repeated proto fields:
+
+- assignment variables are copied from one Boolean template, unnamed
+  unless `names` is set;
+- each shift gets an exactly-one over its qualified employees;
+- overlapping shifts become one at-most-one per employee and maximal clique
+  of mutually overlapping shifts, instead of one constraint per employee and
+  overlapping pair (every overlapping pair lies in a maximal clique);
+- preference indicators, rest products and the objective are written as
+  the preference handlers and Scheduler._build_objective write them; the
+  many small product constraints go through one text-format parse.
+
+The model has the same feasible assignments and objective values as the
+standard one, and is solved the same way.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+from ortools.sat.python import cp_model, cp_model_helper
+
+from scheduling.solver.problem import (
+    PREFER_PERIOD,
+    PREFER_SHIFT,
+    UNAVAILABLE_PERIOD,
+    CompiledProblem,
+)
+from scheduling.solver.scoring import (
+    PREFERENCE_WEIGHT,
+    REST_THRESHOLD_SECONDS,
+    rest_penalty_seconds,
+)
+
+MISSING = -1
+
+
+@dataclass(frozen=True)
+class AssignmentVariables:
+    """Parallel arrays: model variable `index[k]` decides that `employee[k]` works `shift[k]`."""
+
+    index: np.ndarray
+    employee: np.ndarray
+    shift: np.ndarray
+
+    @classmethod
+    def from_vars(
+        cls, assign_vars: dict[tuple[int, int], cp_model.IntVar]
+    ) -> "AssignmentVariables":
+        """The arrays of an `assign_vars` dict built through the cp_model API."""
+        keys = np.array(list(assign_vars), dtype=np.int64).reshape(-1, 2)
+        index = np.array([var.Index() for var in assign_vars.values()], dtype=np.int64)
+        return cls(index=index, employee=keys[:, 0], shift=keys[:, 1])
+
+
+class _Lookup:
+    """Model variable of (employee, shift) pairs, MISSING for unqualified employees."""
+
+    def __init__(self, variables: AssignmentVariables, num_employees: int):
+        self._num_employees = num_employees
+        keys = variables.shift * num_employees + variables.employee
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+        self._index = variables.index
+
+    def __call__(self, employees: np.ndarray, shifts: np.ndarray) -> np.ndarray:
+        keys = np.asarray(shifts, dtype=np.int64) * self._num_employees + employees
+        if len(self._keys) == 0:
+            return np.full(len(keys), MISSING, dtype=np.int64)
+        at = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        found = self._keys[at] == keys
+        return np.where(found, self._index[self._order[at]], MISSING)
+
+
+def _add_booleans(model: cp_model.CpModel, names: list[str] | None, count: int) -> np.ndarray:
+    """Append `count` Boolean variables to the proto; returns their indices."""
+    variables = model.proto.variables
+    first = len(variables)
+    template = cp_model_helper.IntegerVariableProto()
+    template.domain.extend((0, 1))
+    variables.extend([template] * count)
+    if names is not None:
+        for offset, name in enumerate(names):
+            variables[first + offset].name = name
+    return np.arange(first, first + count, dtype=np.int64)
+
+
+def _add_linear(
+    model: cp_model.CpModel,
+    variables: list[int],
+    lower: int,
+    upper: int,
+    enforce: int | None = None,
+) -> None:
+    """lower <= sum(variables) <= upper, only while literal `enforce` holds if given."""
+    constraint = model.proto.constraints.add()
+    if enforce is not None:
+        constraint.enforcement_literal.append(enforce)
+    constraint.linear.vars.extend(variables)
+    constraint.linear.coeffs.extend([1] * len(variables))
+    constraint.linear.domain.extend((lower, upper))
+
+
+def _groups(keys: np.ndarray, values: np.ndarray, min_size: int) -> list[list[int]]:
+    """`values` grouped by equal `keys`, keeping groups of at least `min_size`."""
+    if len(keys) == 0:
+        return []
+    order = np.argsort(keys, kind="stable")
+    keys, values = keys[order], values[order].tolist()
+    bounds = np.flatnonzero(np.diff(keys)) + 1
+    starts = [0, *bounds.tolist()]
+    ends = [*bounds.tolist(), len(keys)]
+    return [values[a:b] for a, b in zip(starts, ends, strict=True) if b - a >= min_size]
+
+
+def _expand(offsets: np.ndarray, shifts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """For each entry of `shifts`, the positions of its variables; and the entry of each."""
+    counts = offsets[shifts + 1] - offsets[shifts]
+    entry = np.repeat(np.arange(len(shifts)), counts)
+    position = (
+        np.repeat(offsets[shifts], counts)
+        + np.arange(len(entry))
+        - np.repeat(np.cumsum(counts) - counts, counts)
+    )
+    return position, entry
+
+
+def _add_preferences(
+    problem: CompiledProblem, model: cp_model.CpModel, lookup: _Lookup, names: bool
+) -> list[int]:
+    """Add the constraints of every preference row; returns the soft indicators."""
+    indicators: list[int] = []
+    for row in range(problem.num_preferences):
+        kind = int(problem.pref_kind[row])
+        employee = int(problem.pref_employee[row])
+        hard = bool(problem.pref_hard[row])
+        if kind == PREFER_SHIFT:
+            shift = int(problem.pref_shift[row])
+            var = int(lookup(np.array([employee]), np.array([shift]))[0]) if shift >= 0 else MISSING
+            if var == MISSING:
+                continue
+            if hard:
+                _add_linear(model, [var], 1, 1)
+            else:
+                indicators.append(var)
+            continue
+        if kind not in (PREFER_PERIOD, UNAVAILABLE_PERIOD):
+            continue
+
+        shifts = problem.shifts_overlapping(
+            int(problem.pref_start[row]), int(problem.pref_end[row])
+        )
+        found = lookup(np.full(len(shifts), employee), shifts)
+        period_vars = found[found != MISSING].tolist()
+        if not period_vars:
+            continue
+        worked = (1, len(period_vars))
+        if hard:
+            _add_linear(model, period_vars, *(0, 0) if kind == UNAVAILABLE_PERIOD else worked)
+            continue
+        name = "unavail_soft" if kind == UNAVAILABLE_PERIOD else "prefer_period_soft"
+        indicator = int(_add_booleans(model, [f"{name}_{row}"] if names else None, 1)[0])
+        satisfied, unsatisfied = (
+            ((0, 0), worked) if kind == UNAVAILABLE_PERIOD else (worked, (0, 0))
+        )
+        _add_linear(model, period_vars, *satisfied, enforce=indicator)
+        _add_linear(model, period_vars, *unsatisfied, enforce=-indicator - 1)
+        indicators.append(indicator)
+    return indicators
+
+
+def _add_rest_products(
+    problem: CompiledProblem,
+    model: cp_model.CpModel,
+    variables: AssignmentVariables,
+    offsets: np.ndarray,
+    lookup: _Lookup,
+    names: bool,
+) -> tuple[np.ndarray, np.ndarray]:
+    """An indicator per employee working both shifts of a short-rest pair, and its penalty."""
+    _, _, first, second = problem.shift_pairs(REST_THRESHOLD_SECONDS)
+    rests = problem.shift_start[second] - problem.shift_end[first]
+    penalty = np.fromiter(map(rest_penalty_seconds, rests.tolist()), np.int64, len(rests))
+    position, pair = _expand(offsets, first)
+    employee = variables.employee[position]
+    later = lookup(employee, second[pair])
+    keep = later != MISSING
+    earlier, later, employee, pair = (
+        variables.index[position][keep],
+        later[keep],
+        employee[keep],
+        pair[keep],
+    )
+
+    both = _add_booleans(
+        model,
+        [
+            f"both_{e}_{s1}_{s2}"
+            for e, s1, s2 in zip(
+                employee.tolist(), first[pair].tolist(), second[pair].tolist(), strict=True
+            )
+        ]
+        if names
+        else None,
+        len(pair),
+    )
+    # Written as text and parsed in one call: cheaper than building three
+    # nested messages per product through the proto wrappers.
+    products = "".join(
+        f"constraints {{ int_prod {{ target {{ vars: {target} coeffs: 1 }} "
+        f"exprs {{ vars: {x} coeffs: 1 }} exprs {{ vars: {y} coeffs: 1 }} }} }}\n"
+        for target, x, y in zip(both.tolist(), earlier.tolist(), later.tolist(), strict=True)
+    )
+    if not model.proto.merge_text_format(products):
+        raise ValueError("Could not add the rest products to the model")
+    return both, penalty[pair]
+
+
+def _add_objective(
+    model: cp_model.CpModel, terms: np.ndarray, weights: np.ndarray, names: bool
+) -> int | None:
+    """Maximize an objective variable equal to the weighted sum of `terms`."""
+    if len(terms) == 0:
+        return None
+    objective = model.NewIntVar(
+        int(weights[weights < 0].sum()),
+        int(weights[weights > 0].sum()),
+        "objective" if names else "",
+    )
+    # Repeated terms are merged, as cp_model merges them.
+    merged, inverse = np.unique(terms, return_inverse=True)
+    coeffs = np.zeros(len(merged), dtype=np.int64)
+    np.add.at(coeffs, inverse, weights)
+    linear = model.proto.constraints.add().linear
+    linear.vars.extend([*merged.tolist(), objective.Index()])
+    linear.coeffs.extend([*(-coeffs).tolist(), 1])
+    linear.domain.extend((0, 0))
+    model.Maximize(objective)
+    return objective.Index()
+
+
+def build_bulk_model(
+    problem: CompiledProblem, model: cp_model.CpModel, names: bool = False
+) -> tuple[AssignmentVariables, int | None]:
+    """Write the scheduling model of `problem` into `model`.
+
+    Returns the assignment variables and the index of the objective variable
+    (None when there is nothing to optimize). With `names`, variables get the
+    names the standard builder gives them.
+    """
+    num_employees = problem.num_employees
+    counts = np.array([len(employees) for employees in problem.qualified], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    employee = np.fromiter(
+        (e for employees in problem.qualified for e in employees), np.int64, int(offsets[-1])
+    )
+    shift = np.repeat(np.arange(problem.num_shifts, dtype=np.int64), counts)
+    index = _add_booleans(
+        model,
+        [f"assign_{e}_{s}" for e, s in zip(employee.tolist(), shift.tolist(), strict=True)]
+        if names
+        else None,
+        len(employee),
+    )
+    variables = AssignmentVariables(index=index, employee=employee, shift=shift)
+    lookup = _Lookup(variables, num_employees)
+    constraints = model.proto.constraints
+
+    # Coverage: exactly one qualified employee per shift (none qualified: infeasible).
+    literals = index.tolist()
+    for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist(), strict=True):
+        constraints.add().exactly_one.literals.extend(literals[a:b])
+
+    # No overlap: at most one shift of each maximal overlapping clique per employee.
+    clique, member = problem.overlap_cliques()
+    position, entry = _expand(offsets, member)
+    for group in _groups(clique[entry] * num_employees + employee[position], index[position], 2):
+        constraints.add().at_most_one.literals.extend(group)
+
+    indicators = np.array(_add_preferences(problem, model, lookup, names), dtype=np.int64)
+    both, penalties = _add_rest_products(problem, model, variables, offsets, lookup, names)
+    terms = np.concatenate([indicators, both])
+    weights = np.concatenate(
+        [np.full(len(indicators), PREFERENCE_WEIGHT, dtype=np.int64), -penalties]
+    )
+    return variables, _add_objective(model, terms, weights, names)
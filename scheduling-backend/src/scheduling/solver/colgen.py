@@ -0,0 +1,738 @@
+"""Column generation over per-employee roster patterns.
+
+The assignment model has one variable per (employee, shift) pair, and its LP
+relaxation says little about preferences and rest, so on big rosters CP-SAT
+proves weak bounds within the time budget. Here the problem is a set
+partitioning instead: a pattern is the complete sequence of shifts one
+employee works, with its exact objective value, and every employee takes one
+pattern while every shift is covered by exactly one.
+
+Patterns are generated as needed. The LP master over the patterns found so far
+is solved by GLOP, and its duals price new ones: for each employee, a labeling
+pass over their shifts in start order (the shift DAG, where every path is a
+pattern) finds the patterns with the best reduced value. A label carries the
+shifts still within the rest threshold, so every short-rest pair is charged,
+and the period preferences it has already met, so labels in the same state
+merge and pricing stays exact. The shift duals plus each employee's best
+reduced value bound the optimum for any duals (the Lagrangian bound), and at
+the LP optimum that bound is the LP value.
+
+Integer schedules are recovered at the end: a dive fixes patterns the LP
+favors one at a time, and CP-SAT then looks for the best combination of all
+generated patterns, starting from the dive's schedule.
+"""
+
+import math
+import time
+from collections.abc import Callable
+from collections.abc import Set as AbstractSet
+from dataclasses import dataclass
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+from ortools.sat.python import cp_model
+from pydantic import BaseModel
+
+from scheduling.models.employee import Employee
+from scheduling.models.shift import Shift
+from scheduling.models.solution import Solution, SolveResult, SolveStats
+from scheduling.solver.eligibility import eligible_employees
+from scheduling.solver.feasibility import check_problem_feasibility
+from scheduling.solver.greedy import greedy_assign
+from scheduling.solver.metrics import compute_metrics
+from scheduling.solver.problem import (
+    PREFER_PERIOD,
+    PREFER_SHIFT,
+    UNASSIGNED,
+    UNAVAILABLE_PERIOD,
+    CompiledProblem,
+    compile_problem,
+)
+from scheduling.solver.scoring import (
+    PREFERENCE_WEIGHT,
+    REST_THRESHOLD_SECONDS,
+    rest_penalty_seconds,
+)
+
+# Share of the time budget kept for recovering an integer schedule.
+INTEGER_SHARE = 0.25
+# A pattern joins the master only if its reduced value exceeds this.
+REDUCED_VALUE_TOLERANCE = 1e-3
+# Initial half-width of the box around the duals with the best bound so far.
+BOX_WIDTH = 100.0
+# Share of the integer recovery time spent diving before CP-SAT takes over.
+DIVE_SHARE = 0.5
+# Pricing rounds between two fixing steps of the dive.
+DIVE_ROUNDS = 3
+
+
+class ColumnGenerationProgress(BaseModel):
+    """Reported after every pricing round."""
+
+    iteration: int
+    elapsed: float
+    columns: int
+    added: int
+    lp_objective: float
+    bound: float | None
+
+
+@dataclass(frozen=True)
+class Pattern:
+    """The shifts (by index, in start order) one employee works, and their objective value."""
+
+    employee: int
+    shifts: tuple[int, ...]
+    value: int
+
+
+@dataclass
+class _Box:
+    """Center and half-width of the box on the shift duals, and the best bound found in it."""
+
+    center: list[float]
+    width: float
+    bound: float = math.inf
+
+
+class _Employee:
+    """One employee's shifts and preference rows, prepared for pricing.
+
+    `shifts` are the shifts the employee may take at all (see
+    eligible_employees). Period rows that no such shift overlaps are settled
+    up front: a soft unavailability then always counts, as it does in the
+    solver when the employee is qualified for an overlapping shift.
+    """
+
+    def __init__(self, problem: CompiledProblem, employee: int, shifts: list[int]):
+        self.employee = employee
+        self.shifts = shifts
+        self.position = {shift: p for p, shift in enumerate(shifts)}
+        # Times by position, which ascends with start like the shift index.
+        starts = problem.shift_start[shifts]
+        self.starts = starts.tolist()
+        self.ends = problem.shift_end[shifts].tolist()
+        self.feasible = True
+        self.base = 0
+        self.forced: set[int] = set()
+        self.bonus = dict.fromkeys(shifts, 0)
+
+        position = self.position
+        # Period rows as (kind, is_hard, positions of the overlapping allowed shifts).
+        self.rows: list[tuple[int, bool, list[int]]] = []
+        for row in range(problem.pref_offsets[employee], problem.pref_offsets[employee + 1]):
+            kind = int(problem.pref_kind[row])
+            hard = bool(problem.pref_hard[row])
+            if kind == PREFER_SHIFT:
+                shift = int(problem.pref_shift[row])
+                if shift == UNASSIGNED or not problem.is_qualified(employee, shift):
+                    continue
+                if not hard:
+                    if shift in self.bonus:
+                        self.bonus[shift] += PREFERENCE_WEIGHT
+                elif shift in position:
+                    self.forced.add(shift)
+                else:
+                    self.feasible = False
+                continue
+
+            overlapping = problem.shifts_overlapping(
+                int(problem.pref_start[row]), int(problem.pref_end[row])
+            ).tolist()
+            if not any(problem.is_qualified(employee, s) for s in overlapping):
+                continue
+            if kind == UNAVAILABLE_PERIOD and not hard:
+                self.base += PREFERENCE_WEIGHT
+            positions = sorted(position[s] for s in overlapping if s in position)
+            if kind == PREFER_PERIOD and hard and not positions:
+                self.feasible = False
+            elif positions and (kind == PREFER_PERIOD or not hard):
+                self.rows.append((kind, hard, positions))
+
+        # Per position: (bit, value) of the rows the shift meets, and the rows settled after it.
+        self.opening: list[list[tuple[int, int]]] = [[] for _ in shifts]
+        self.closing = [0] * len(shifts)
+        self.hard_closing = [0] * len(shifts)
+        for index, (_, hard, positions) in enumerate(self.rows):
+            for p in positions:
+                self.opening[p].append((1 << index, self._row_value(index)))
+            self.closing[positions[-1]] |= 1 << index
+            if hard:
+                self.hard_closing[positions[-1]] |= 1 << index
+
+        # Per position: the rest penalty after each earlier position it may follow.
+        # Only shifts starting within the threshold plus the longest shift can qualify.
+        first = np.searchsorted(
+            starts, starts - REST_THRESHOLD_SECONDS - problem.max_shift_duration, "right"
+        ).tolist()
+        self.penalties: list[dict[int, int]] = []
+        for p, start in enumerate(self.starts):
+            self.penalties.append(
+                {
+                    earlier: rest_penalty_seconds(start - self.ends[earlier])
+                    for earlier in range(first[p], p)
+                    if 0 <= start - self.ends[earlier] < REST_THRESHOLD_SECONDS
+                }
+            )
+
+    def _row_value(self, index: int) -> int:
+        kind, hard, _ = self.rows[index]
+        if hard:
+            return 0
+        return PREFERENCE_WEIGHT if kind == PREFER_PERIOD else -PREFERENCE_WEIGHT
+
+    def value(self, shifts: tuple[int, ...]) -> int | None:
+        """Objective value of working exactly `shifts`, or None if that breaks a hard constraint."""
+        if not self.feasible or not self.forced.issubset(shifts):
+            return None
+        if any(s not in self.position for s in shifts):
+            return None
+        value = self.base + sum(self.bonus[s] for s in shifts)
+        worked = [self.position[s] for s in shifts]
+        for i, earlier in enumerate(worked):
+            for later in worked[i + 1 :]:
+                rest = self.starts[later] - self.ends[earlier]
+                if rest < 0:
+                    return None
+                if rest >= REST_THRESHOLD_SECONDS:
+                    continue
+                value -= rest_penalty_seconds(rest)
+
+        for index, (_, hard, positions) in enumerate(self.rows):
+            if not any(p in positions for p in worked):
+                if hard:
+                    return None
+                continue
+            value += self._row_value(index)
+        return value
+
+    def price(
+        self, duals: list[float], limit: int, blocked: AbstractSet[int] = frozenset()
+    ) -> tuple[float, list[tuple[float, tuple[int, ...]]]]:
+        """The best reduced value and up to `limit` best patterns, before the employee's dual.
+
+        `duals` holds each shift's dual; a pattern's reduced value is its
+        objective value minus the duals of its shifts. Patterns never include
+        `blocked` shifts. The best value is -inf when the employee has no
+        feasible pattern.
+        """
+        if not self.feasible:
+            return -math.inf, []
+
+        # (positions within the rest threshold, met period rows) -> (value, path). The
+        # shifts of a pattern never overlap, so their ends ascend like their starts.
+        ends = self.ends
+        labels: dict[tuple[tuple[int, ...], int], tuple[float, tuple | None]] = {
+            ((), 0): (float(self.base), None)
+        }
+        for p, shift in enumerate(self.shifts):
+            start = self.starts[p]
+            cutoff = start - REST_THRESHOLD_SECONDS
+            gain = self.bonus[shift] - duals[shift]
+            skip = shift not in self.forced
+            take = shift not in blocked
+            opening, penalties = self.opening[p], self.penalties[p]
+            reached: dict[tuple[tuple[int, ...], int], tuple[float, tuple | None]] = {}
+            for (recent, met), (value, path) in labels.items():
+                while recent and ends[recent[0]] <= cutoff:
+                    recent = recent[1:]
+                if skip:
+                    key = (recent, met)
+                    current = reached.get(key)
+                    if current is None or value > current[0]:
+                        reached[key] = (value, path)
+                if not take or (recent and ends[recent[-1]] > start):
+                    continue
+                for r in recent:
+                    value -= penalties[r]
+                for bit, row_value in opening:
+                    if not met & bit:
+                        value += row_value
+                        met |= bit
+                key = ((*recent, p), met)
+                value += gain
+                current = reached.get(key)
+                if current is None or value > current[0]:
+                    reached[key] = (value, (shift, path))
+
+            closing, hard_closing = self.closing[p], self.hard_closing[p]
+            if closing:
+                labels = {}
+                for (recent, met), (value, path) in reached.items():
+                    if met & hard_closing == hard_closing:
+                        _merge(labels, (recent, met & ~closing), value, path)
+            else:
+                labels = reached
+
+        ranked = sorted(labels.values(), key=lambda label: label[0], reverse=True)
+        if not ranked:
+            return -math.inf, []
+        return ranked[0][0], [(value, _unwind(path)) for value, path in ranked[:limit]]
+
+
+def _merge(
+    labels: dict[tuple[tuple[int, ...], int], tuple[float, tuple | None]],
+    key: tuple[tuple[int, ...], int],
+    value: float,
+    path: tuple | None,
+) -> None:
+    current = labels.get(key)
+    if current is None or value > current[0]:
+        labels[key] = (value, path)
+
+
+def _unwind(path: tuple | None) -> tuple[int, ...]:
+    shifts = []
+    while path is not None:
+        shift, path = path
+        shifts.append(shift)
+    return tuple(reversed(shifts))
+
+
+class _Master:
+    """The LP relaxation over the patterns found so far, stabilized by a box on the duals.
+
+    A roster LP is highly degenerate, and the raw duals of its simplex basis
+    swing between extremes that price useless patterns. Each shift row
+    therefore has a surplus and a slack column whose prices keep its dual
+    within `width` of a center (the boxstep method); outside the box, the row
+    is covered or overcovered at that price instead. The columns also keep
+    the LP feasible before patterns covering every shift exist, as an
+    artificial column does for each employee row.
+    """
+
+    def __init__(self, problem: CompiledProblem):
+        self.solver = pywraplp.Solver.CreateSolver("GLOP")
+        self.objective = self.solver.Objective()
+        self.objective.SetMaximization()
+        self.cover = [self.solver.Constraint(1, 1) for _ in range(problem.num_shifts)]
+        self.convexity = [self.solver.Constraint(1, 1) for _ in range(problem.num_employees)]
+        infinity = self.solver.infinity()
+        self._below = [self.solver.NumVar(0, infinity, "") for _ in self.cover]
+        self._above = [self.solver.NumVar(0, infinity, "") for _ in self.cover]
+        for row, below, above in zip(self.cover, self._below, self._above, strict=True):
+            row.SetCoefficient(below, 1)
+            row.SetCoefficient(above, -1)
+        penalty = PREFERENCE_WEIGHT * (problem.num_preferences + problem.num_shifts + 1)
+        for row in self.convexity:
+            artificial = self.solver.NumVar(0, infinity, "")
+            self.objective.SetCoefficient(artificial, -penalty)
+            row.SetCoefficient(artificial, 1)
+        self.patterns: list[Pattern] = []
+        self._columns: list[pywraplp.Variable] = []
+        self._known: set[tuple[int, tuple[int, ...]]] = set()
+        # The patterns' values in the last LP solution.
+        self.solution: list[float] = []
+
+    def set_box(self, center: list[float], width: float) -> None:
+        """Keep each shift's dual within `width` of its `center`."""
+        for below, above, middle in zip(self._below, self._above, center, strict=True):
+            self.objective.SetCoefficient(below, middle - width)
+            self.objective.SetCoefficient(above, -(middle + width))
+
+    def add(self, pattern: Pattern) -> bool:
+        key = (pattern.employee, pattern.shifts)
+        if key in self._known:
+            return False
+        self._known.add(key)
+        self.patterns.append(pattern)
+        column = self.solver.NumVar(0, self.solver.infinity(), "")
+        self._columns.append(column)
+        self.objective.SetCoefficient(column, pattern.value)
+        self.convexity[pattern.employee].SetCoefficient(column, 1)
+        for shift in pattern.shifts:
+            self.cover[shift].SetCoefficient(column, 1)
+        return True
+
+    def fix(self, index: int) -> None:
+        self._columns[index].SetLb(1)
+
+    def forbid(self, index: int) -> None:
+        self._columns[index].SetUb(0)
+
+    def solve(self) -> tuple[float, list[float], list[float], bool] | None:
+        """The LP value, the shift and employee duals, and whether the box binds.
+
+        None if GLOP gave up.
+        """
+        if self.solver.Solve() != pywraplp.Solver.OPTIMAL:
+            return None
+        binds = any(var.solution_value() > 1e-9 for var in (*self._below, *self._above))
+        self.solution = [column.solution_value() for column in self._columns]
+        return (
+            self.objective.Value(),
+            [row.dual_value() for row in self.cover],
+            [row.dual_value() for row in self.convexity],
+            binds,
+        )
+
+
+class ColumnGenerationScheduler:
+    def __init__(
+        self,
+        employees: list[Employee],
+        shifts: list[Shift],
+        columns_per_employee: int = 3,
+    ):
+        self.problem = compile_problem(employees, shifts)
+        self.columns_per_employee = columns_per_employee
+
+    def _employees(self) -> list[_Employee]:
+        allowed: list[list[int]] = [[] for _ in range(self.problem.num_employees)]
+        for shift, employees in enumerate(eligible_employees(self.problem)):
+            for employee in employees:
+                allowed[employee].append(shift)
+        return [
+            _Employee(self.problem, employee, shifts) for employee, shifts in enumerate(allowed)
+        ]
+
+    def _initial_patterns(self, employees: list[_Employee]) -> tuple[list[Pattern], list[Pattern]]:
+        """Each employee's greedy shifts and an empty pattern, where they are feasible.
+
+        Also returns the greedy schedule as one pattern per employee, or an
+        empty list when it leaves a shift unfilled or breaks a hard preference.
+        """
+        assigned = greedy_assign(self.problem)
+        patterns: list[Pattern] = []
+        schedule: list[Pattern] = []
+        for data in employees:
+            greedy = tuple(np.flatnonzero(assigned == data.employee).tolist())
+            for shifts in dict.fromkeys([greedy, ()]):
+                value = data.value(shifts)
+                if value is None:
+                    continue
+                patterns.append(Pattern(data.employee, shifts, value))
+                if shifts == greedy:
+                    schedule.append(patterns[-1])
+        if (assigned == UNASSIGNED).any() or len(schedule) < len(employees):
+            schedule = []
+        return patterns, schedule
+
+    def _price(
+        self,
+        employees: list[_Employee],
+        master: _Master,
+        shift_duals: list[float],
+        employee_duals: list[float],
+        blocked: AbstractSet[int] = frozenset(),
+    ) -> tuple[float, int]:
+        """Price `employees` at the master's duals.
+
+        Returns the Lagrangian bound at `shift_duals` (their sum plus each
+        employee's best reduced value, an upper bound for any duals) and how
+        many patterns joined the master.
+        """
+        bound = sum(dual for shift, dual in enumerate(shift_duals) if shift not in blocked)
+        added = 0
+        for data in employees:
+            best, found = data.price(shift_duals, self.columns_per_employee, blocked)
+            bound += best
+            for reduced, shifts in found:
+                if reduced - employee_duals[data.employee] <= REDUCED_VALUE_TOLERANCE:
+                    break
+                value = data.value(shifts)
+                if value is not None and master.add(Pattern(data.employee, shifts, value)):
+                    added += 1
+        return bound, added
+
+    def _generate(
+        self,
+        master: _Master,
+        employees: list[_Employee],
+        box: _Box,
+        deadline: float,
+        blocked: AbstractSet[int] = frozenset(),
+        max_rounds: int | None = None,
+        on_round: Callable[[float, int], None] | None = None,
+    ) -> bool:
+        """Price `employees` into the master until its LP is optimal.
+
+        The box moves to the duals of every better bound, and widens when it
+        keeps out the duals that would prove more. Returns whether the LP was
+        proven optimal; `box.bound` is -inf when some employee has no pattern
+        left that meets their hard preferences.
+        """
+        master.set_box(box.center, box.width)
+        rounds = 0
+        while time.monotonic() < deadline:
+            if max_rounds is not None and rounds >= max_rounds:
+                return False
+            rounds += 1
+            lp = master.solve()
+            if lp is None:
+                return False
+            lp_objective, shift_duals, employee_duals, binds = lp
+
+            bound, added = self._price(employees, master, shift_duals, employee_duals, blocked)
+            if bound < box.bound:
+                box.bound, box.center = bound, shift_duals
+                master.set_box(box.center, box.width)
+            elif not added:
+                box.width *= 2
+                master.set_box(box.center, box.width)
+
+            if on_round is not None:
+                on_round(lp_objective, added)
+            if box.bound == -math.inf:
+                return False
+            if not added and not binds:
+                return True
+        return False
+
+    def _dive(
+        self, master: _Master, employees: list[_Employee], box: _Box, deadline: float
+    ) -> list[Pattern] | None:
+        """Round the LP one pattern at a time, generating patterns for the rest in between.
+
+        Each step fixes the pattern with the largest LP value, along with any
+        already at 1, drops the patterns that conflict with them and briefly
+        re-optimizes over the other employees and the uncovered shifts.
+        Returns the schedule once every employee has a pattern covering the
+        shifts left, or None at a dead end or the deadline.
+        """
+        box = _Box(list(box.center), box.width)
+        picked: list[Pattern] = []
+        fixed: set[int] = set()
+        covered: set[int] = set()
+        active = list(employees)
+        while active:
+            if time.monotonic() >= deadline:
+                return None
+            self._generate(master, active, box, deadline, covered, DIVE_ROUNDS)
+            if box.bound == -math.inf:
+                return None
+            box.bound = math.inf  # the next step solves a smaller problem
+
+            done = {pattern.employee for pattern in picked}
+            candidates = [
+                (x, index)
+                for index, x in enumerate(master.solution)
+                if x > 1e-6 and master.patterns[index].employee not in done
+            ]
+            if not candidates:
+                return None
+            chosen = {max(candidates)[1], *(i for x, i in candidates if x >= 1 - 1e-6)}
+            for index in sorted(chosen):
+                pattern = master.patterns[index]
+                if pattern.employee in done or not covered.isdisjoint(pattern.shifts):
+                    continue
+                master.fix(index)
+                fixed.add(index)
+                picked.append(pattern)
+                done.add(pattern.employee)
+                covered.update(pattern.shifts)
+            for index, pattern in enumerate(master.patterns):
+                if index not in fixed and (
+                    pattern.employee in done or not covered.isdisjoint(pattern.shifts)
+                ):
+                    master.forbid(index)
+            active = [data for data in active if data.employee not in done]
+
+        if len(covered) < self.problem.num_shifts:
+            return None
+        return picked
+
+    def _recover(
+        self,
+        master: _Master,
+        employees: list[_Employee],
+        box: _Box,
+        greedy: list[Pattern],
+        bound: float | None,
+        time_limit: float,
+    ) -> tuple[list[Pattern] | None, bool]:
+        """The best schedule made of generated patterns, and whether CP-SAT ran out of time.
+
+        A dive rounds the LP first; CP-SAT then searches every generated
+        pattern, starting from the better of its schedule and the greedy one,
+        unless that already reaches the bound.
+        """
+        started = time.monotonic()
+        dive = self._dive(master, employees, box, started + time_limit * DIVE_SHARE)
+        found = [schedule for schedule in (dive, greedy) if schedule]
+        best = max(found, key=_value) if found else None
+        if best is not None and bound is not None and _value(best) >= bound:
+            return best, False
+
+        remaining = max(time_limit - (time.monotonic() - started), 0.1)
+        picked, status = self._combine(master.patterns, best or [], bound, remaining)
+        timed_out = status in (cp_model.FEASIBLE, cp_model.UNKNOWN)
+        if picked is None or (best is not None and _value(picked) <= _value(best)):
+            return best, timed_out
+        return picked, timed_out
+
+    def _combine(
+        self,
+        patterns: list[Pattern],
+        hint: list[Pattern],
+        bound: float | None,
+        time_limit: float,
+    ) -> tuple[list[Pattern] | None, int]:
+        """The best integer combination of `patterns`, and CP-SAT's status.
+
+        The proven `bound` caps the objective, so CP-SAT stops as soon as a
+        combination reaches it.
+        """
+        model = cp_model.CpModel()
+        chosen = [model.NewBoolVar("") for _ in patterns]
+        by_shift: list[list[cp_model.IntVar]] = [[] for _ in range(self.problem.num_shifts)]
+        by_employee: list[list[cp_model.IntVar]] = [[] for _ in range(self.problem.num_employees)]
+        for pattern, var in zip(patterns, chosen, strict=True):
+            by_employee[pattern.employee].append(var)
+            for shift in pattern.shifts:
+                by_shift[shift].append(var)
+        for group in [*by_shift, *by_employee]:
+            model.AddExactlyOne(group)
+        objective = sum(p.value * var for p, var in zip(patterns, chosen, strict=True))
+        if bound is not None:
+            model.Add(objective <= int(bound))
+        model.Maximize(objective)
+        hinted = set(hint)
+        for pattern, var in zip(patterns, chosen, strict=True):
+            model.AddHint(var, pattern in hinted)
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = time_limit
+        status = solver.Solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None, status
+        picked = [p for p, var in zip(patterns, chosen, strict=True) if solver.BooleanValue(var)]
+        return picked, status
+
+    def solve(
+        self,
+        time_budget: float = 60.0,
+        max_iterations: int | None = None,
+        on_progress: Callable[[ColumnGenerationProgress], None] | None = None,
+    ) -> SolveResult:
+        """Generate patterns until the LP is optimal or the budget runs low, then pick a schedule.
+
+        Returns at most one solution. The status is "optimal" when the
+        schedule's value reaches the proven bound and "feasible" otherwise;
+        `best_objective_bound` is the best bound over the pricing rounds.
+        """
+        started = time.monotonic()
+        deadline = started + time_budget
+        phases: dict[str, float] = {}
+        phase_started = time.perf_counter()
+
+        def end_phase(name: str) -> None:
+            nonlocal phase_started
+            now = time.perf_counter()
+            phases[name] = now - phase_started
+            phase_started = now
+
+        report = check_problem_feasibility(self.problem)
+        end_phase("precheck")
+        if not report.feasible:
+            return SolveResult(
+                stats=SolveStats(
+                    status="infeasible", wall_time=phases["precheck"], phase_times=phases
+                ),
+                feasibility=report,
+            )
+
+        employees = self._employees()
+        master = _Master(self.problem)
+        initial, greedy = self._initial_patterns(employees)
+        for pattern in initial:
+            master.add(pattern)
+
+        # At zero duals every employee prices their favorite rosters, which seeds the
+        # master and gives the first bound: everyone gets what they want.
+        center = [0.0] * self.problem.num_shifts
+        bound, _ = self._price(employees, master, center, [-math.inf] * len(employees))
+        box = _Box(center, BOX_WIDTH, bound)
+        iteration = 0
+
+        def report_round(lp_objective: float, added: int) -> None:
+            nonlocal iteration
+            iteration += 1
+            if on_progress is not None:
+                on_progress(
+                    ColumnGenerationProgress(
+                        iteration=iteration,
+                        elapsed=time.monotonic() - started,
+                        columns=len(master.patterns),
+                        added=added,
+                        lp_objective=lp_objective,
+                        bound=box.bound if math.isfinite(box.bound) else None,
+                    )
+                )
+
+        generation_deadline = started + time_budget * (1 - INTEGER_SHARE)
+        converged = self._generate(
+            master,
+            employees,
+            box,
+            generation_deadline,
+            max_rounds=max_iterations,
+            on_round=report_round,
+        )
+        out_of_time = not converged and time.monotonic() >= generation_deadline
+        bound = box.bound
+        end_phase("columns")
+
+        if bound == -math.inf:
+            return SolveResult(
+                stats=SolveStats(
+                    status="infeasible",
+                    wall_time=time.monotonic() - started,
+                    phase_times=phases,
+                ),
+                feasibility=report,
+            )
+
+        best_bound = _floor(bound)
+        remaining = max(deadline - time.monotonic(), 1.0)
+        picked, timed_out = self._recover(master, employees, box, greedy, best_bound, remaining)
+        end_phase("integer")
+        elapsed = time.monotonic() - started
+        if picked is None:
+            return SolveResult(
+                stats=SolveStats(
+                    status="unknown",
+                    best_objective_bound=best_bound,
+                    wall_time=elapsed,
+                    hit_time_limit=out_of_time or timed_out,
+                    phase_times=phases,
+                )
+            )
+
+        assigned = np.full(self.problem.num_shifts, UNASSIGNED, dtype=np.int32)
+        for pattern in picked:
+            assigned[list(pattern.shifts)] = pattern.employee
+        objective = _value(picked)
+        proven = best_bound is not None and objective >= best_bound
+        solution = Solution(
+            assignments=self.problem.decode_assignments(assigned),
+            metrics=compute_metrics(self.problem, assigned),
+        )
+        return SolveResult(
+            solutions=[solution],
+            stats=SolveStats(
+                status="optimal" if proven else "feasible",
+                objective_value=objective,
+                best_objective_bound=best_bound,
+                gap=(
+                    None
+                    if best_bound is None
+                    else abs(best_bound - objective) / max(1.0, abs(objective))
+                ),
+                wall_time=elapsed,
+                num_solutions=1,
+                hit_time_limit=not proven and (out_of_time or timed_out),
+                phase_times=phases,
+            ),
+        )
+
+
+def _value(patterns: list[Pattern]) -> int:
+    return sum(pattern.value for pattern in patterns)
+
+
+def _floor(bound: float) -> float | None:
+    """The bound rounded down to the integer objective; None when there is none yet."""
+    if not math.isfinite(bound):
+        return None
+    return float(math.floor(bound + REDUCED_VALUE_TOLERANCE))
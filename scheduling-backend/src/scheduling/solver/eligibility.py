@@ -0,0 +1,55 @@
+"""Which employees may take which shift, judged on the pair alone.
+
+Shared by the heuristics and checks that reason about the problem without a
+CP model. An employee is eligible for a shift when they have the required
+abilities, are not hard-unavailable during it, and the shift is not claimed by
+a hard shift preference of someone else.
+"""
+
+import numpy as np
+
+from scheduling.solver.problem import PREFER_SHIFT, UNAVAILABLE_PERIOD, CompiledProblem
+
+
+def hard_shift_owners(problem: CompiledProblem) -> list[list[int]]:
+    """Employees with a hard preference for each shift, by shift index.
+
+    Like the solver, a hard shift preference only counts when the employee is
+    qualified for the shift.
+    """
+    owners: list[list[int]] = [[] for _ in range(problem.num_shifts)]
+    rows = np.flatnonzero(
+        problem.pref_hard & (problem.pref_kind == PREFER_SHIFT) & (problem.pref_shift >= 0)
+    )
+    for employee, shift in zip(
+        problem.pref_employee[rows].tolist(), problem.pref_shift[rows].tolist(), strict=True
+    ):
+        if problem.is_qualified(employee, shift):
+            owners[shift].append(employee)
+    return owners
+
+
+def eligible_employees(problem: CompiledProblem) -> list[list[int]]:
+    """Employees that may take each shift under the hard constraints on the pair.
+
+    Indexed by shift; qualification comes precompiled, and hard
+    unavailability is applied by looking up the shifts overlapping each period.
+    """
+    owners = hard_shift_owners(problem)
+    blocked: set[tuple[int, int]] = set()
+    for row in np.flatnonzero(problem.pref_hard & (problem.pref_kind == UNAVAILABLE_PERIOD)):
+        employee = int(problem.pref_employee[row])
+        overlapping = problem.shifts_overlapping(
+            int(problem.pref_start[row]), int(problem.pref_end[row])
+        )
+        blocked.update((employee, shift) for shift in overlapping.tolist())
+
+    eligible: list[list[int]] = []
+    for shift, qualified in enumerate(problem.qualified):
+        candidates = qualified
+        if blocked:
+            candidates = [e for e in candidates if (e, shift) not in blocked]
+        if owners[shift]:
+            candidates = [e for e in candidates if e in owners[shift]]
+        eligible.append(candidates)
+    return eligible
@@ -0,0 +1,112 @@
+"""Export a built CP-SAT model for offline replay and profiling.
+
+A dump is a zip archive holding the binary CpModelProto (written by CP-SAT
+itself, so dumping stays cheap next to a solve), the solver parameters in
+protobuf text format, and a JSON mapping from the assignment variables back
+to shift and employee ids. It is everything needed to re-run a solve without
+the service or the original request; see scheduling.replay.
+"""
+
+import json
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from ortools.sat import cp_model_pb2
+from ortools.sat.python import cp_model
+
+from scheduling.solver.bulk import AssignmentVariables
+from scheduling.solver.problem import CompiledProblem
+from scheduling.types import EmployeeId, ShiftId
+
+FORMAT_VERSION = 1
+MODEL_FILE = "model.pb"
+PARAMETERS_FILE = "parameters.pbtxt"
+MAPPING_FILE = "mapping.json"
+
+
+@dataclass(frozen=True)
+class ModelDump:
+    model: cp_model.CpModel
+    # Solver parameters in protobuf text format.
+    parameters: str
+    employee_ids: list[EmployeeId]
+    shift_ids: list[ShiftId]
+    # Parallel lists: the model variable deciding that employee e works shift s.
+    assign_variables: list[int]
+    assign_employees: list[int]
+    assign_shifts: list[int]
+    max_solutions: int
+
+    def decode(self, values: list[bool]) -> dict[ShiftId, EmployeeId]:
+        """Assignments from the values of `assign_variables`, in the same order."""
+        return {
+            self.shift_ids[shift]: self.employee_ids[employee]
+            for employee, shift, value in zip(
+                self.assign_employees, self.assign_shifts, values, strict=True
+            )
+            if value
+        }
+
+
+def export_model(
+    path: str | Path,
+    model: cp_model.CpModel,
+    parameters: str,
+    problem: CompiledProblem,
+    variables: AssignmentVariables,
+    max_solutions: int,
+) -> None:
+    """Write `model`, the solver `parameters` and the id mappings to a dump at `path`.
+
+    `parameters` is SatParameters in text format (`str(solver.parameters)`);
+    `variables` index employees and shifts of `problem`.
+    """
+    mapping = {
+        "version": FORMAT_VERSION,
+        "employee_ids": problem.employee_ids,
+        "shift_ids": problem.shift_ids,
+        "assign_variables": variables.index.tolist(),
+        "assign_employees": variables.employee.tolist(),
+        "assign_shifts": variables.shift.tolist(),
+        "max_solutions": max_solutions,
+    }
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive,
+    ):
+        model_path = str(Path(tmp) / MODEL_FILE)
+        if not model.ExportToFile(model_path):
+            raise OSError(f"Could not write the model to {model_path}")
+        archive.write(model_path, MODEL_FILE)
+        archive.writestr(PARAMETERS_FILE, parameters)
+        archive.writestr(MAPPING_FILE, json.dumps(mapping))
+
+
+def load_model(path: str | Path) -> ModelDump:
+    """Read a dump written by export_model."""
+    with zipfile.ZipFile(path) as archive:
+        model_bytes = archive.read(MODEL_FILE)
+        parameters = archive.read(PARAMETERS_FILE).decode()
+        mapping = json.loads(archive.read(MAPPING_FILE))
+    if mapping.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model dump version: {mapping.get('version')!r}")
+
+    # The solver's own proto type only parses text, so the binary model goes
+    # through the protobuf message, whose str() is the text format.
+    message = cp_model_pb2.CpModelProto()
+    message.ParseFromString(model_bytes)
+    model = cp_model.CpModel()
+    if not model.Proto().parse_text_format(str(message)):
+        raise ValueError(f"Invalid model in {path}")
+    return ModelDump(
+        model=model,
+        parameters=parameters,
+        employee_ids=[EmployeeId(e) for e in mapping["employee_ids"]],
+        shift_ids=[ShiftId(s) for s in mapping["shift_ids"]],
+        assign_variables=mapping["assign_variables"],
+        assign_employees=mapping["assign_employees"],
+        assign_shifts=mapping["assign_shifts"],
+        max_solutions=mapping["max_solutions"],
+    )
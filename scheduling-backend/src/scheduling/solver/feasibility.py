@@ -0,0 +1,170 @@
+"""Combinatorial feasibility pre-check, run before any CP model is built.
+
+Detects problems that can never be staffed:
+
+- shifts nobody may take, because no one is qualified, everyone qualified is
+  hard-unavailable, or several employees hard-prefer the same shift;
+- overlap windows with more shifts than distinct employees can cover. Every
+  maximal set of mutually overlapping shifts (a clique of the interval graph)
+  needs one different employee per shift. Windows where each shift has enough
+  candidates are skipped outright; the rest get a Hopcroft-Karp matching
+  between the shifts and their eligible employees, which is exact for that
+  window.
+
+Passing the check does not guarantee feasibility (e.g. hard period preferences
+are not considered), but failing it proves infeasibility.
+"""
+
+from collections import deque
+
+from scheduling.models.feasibility import BottleneckWindow, FeasibilityReport, UncoverableShift
+from scheduling.solver.eligibility import eligible_employees, hard_shift_owners
+from scheduling.solver.problem import CompiledProblem
+
+
+def _maximal_overlap_cliques(problem: CompiledProblem) -> list[list[int]]:
+    """Maximal sets of mutually overlapping shifts, found with a sweep line.
+
+    Shifts are half-open, so a shift ending exactly when another starts does
+    not overlap it: at equal times, ends are processed before starts. The active
+    set is maximal right after a batch of starts that is followed by an end.
+    """
+    events = sorted(
+        [(start, 1, i) for i, start in enumerate(problem.shift_start.tolist())]
+        + [(end, 0, i) for i, end in enumerate(problem.shift_end.tolist())]
+    )
+    cliques: list[list[int]] = []
+    active: dict[int, None] = {}
+    grew = False
+    for _, is_start, index in events:
+        if is_start:
+            active[index] = None
+            grew = True
+            continue
+        if grew and len(active) > 1:
+            cliques.append(list(active))
+        grew = False
+        del active[index]
+    return cliques
+
+
+def _hopcroft_karp(adjacency: list[list[int]]) -> list[int | None]:
+    """Maximum matching of left vertices (shifts) to employees.
+
+    Returns, for each left vertex, its matched employee or None.
+    """
+    match_left: list[int | None] = [None] * len(adjacency)
+    match_right: dict[int, int] = {}
+    infinity = len(adjacency) + 1
+
+    def bfs() -> tuple[bool, list[int]]:
+        dist = [infinity] * len(adjacency)
+        queue: deque[int] = deque()
+        for u, matched in enumerate(match_left):
+            if matched is None:
+                dist[u] = 0
+                queue.append(u)
+        found = False
+        while queue:
+            u = queue.popleft()
+            for employee in adjacency[u]:
+                v = match_right.get(employee)
+                if v is None:
+                    found = True
+                elif dist[v] == infinity:
+                    dist[v] = dist[u] + 1
+                    queue.append(v)
+        return found, dist
+
+    def dfs(root: int, dist: list[int]) -> bool:
+        # Iterative, since an augmenting path can be as long as the window.
+        # path[k] is a left vertex, edges[k] its next employee to try, and
+        # via[k] the employee leading from path[k] to path[k + 1].
+        path, edges, via = [root], [0], []
+        while path:
+            u = path[-1]
+            if edges[-1] == len(adjacency[u]):
+                dist[u] = infinity
+                path.pop()
+                edges.pop()
+                if via:
+                    via.pop()
+                continue
+            employee = adjacency[u][edges[-1]]
+            edges[-1] += 1
+            v = match_right.get(employee)
+            if v is None:
+                for left, right in zip(path, [*via, employee], strict=True):
+                    match_left[left] = right
+                    match_right[right] = left
+                return True
+            if dist[v] == dist[u] + 1:
+                path.append(v)
+                edges.append(0)
+                via.append(employee)
+        return False
+
+    while True:
+        found, dist = bfs()
+        if not found:
+            break
+        for u in range(len(adjacency)):
+            if match_left[u] is None:
+                dfs(u, dist)
+    return match_left
+
+
+def check_problem_feasibility(problem: CompiledProblem) -> FeasibilityReport:
+    """Look for shifts and time windows that can never be staffed."""
+    eligible = eligible_employees(problem)
+    owners = hard_shift_owners(problem)
+    shift_ids = problem.shift_ids
+
+    uncoverable: list[UncoverableShift] = []
+    for shift in range(problem.num_shifts):
+        if len(owners[shift]) > 1:
+            uncoverable.append(
+                UncoverableShift(shift_id=shift_ids[shift], reason="conflicting_hard_preferences")
+            )
+        elif not eligible[shift]:
+            uncoverable.append(
+                UncoverableShift(
+                    shift_id=shift_ids[shift],
+                    reason=(
+                        "no_available_employee"
+                        if problem.qualified[shift]
+                        else "no_qualified_employee"
+                    ),
+                )
+            )
+
+    bottlenecks: list[BottleneckWindow] = []
+    for clique in _maximal_overlap_cliques(problem):
+        # Shifts nobody may take are already reported above.
+        clique = [s for s in clique if eligible[s]]
+        if len(clique) < 2:
+            continue
+        # If every shift has at least as many candidates as the window has
+        # shifts, a cover with distinct employees always exists.
+        if min(len(eligible[s]) for s in clique) >= len(clique):
+            continue
+        matching = _hopcroft_karp([eligible[s] for s in clique])
+        unmatched = [shift_ids[s] for s, m in zip(clique, matching, strict=True) if m is None]
+        available = len(clique) - len(unmatched)
+        if unmatched:
+            bottlenecks.append(
+                BottleneckWindow(
+                    start=problem.to_datetime(int(problem.shift_start[clique].max())),
+                    end=problem.to_datetime(int(problem.shift_end[clique].min())),
+                    shift_ids=[shift_ids[s] for s in clique],
+                    required=len(clique),
+                    available=available,
+                    unmatched_shift_ids=unmatched,
+                )
+            )
+
+    return FeasibilityReport(
+        feasible=not uncoverable and not bottlenecks,
+        uncoverable_shifts=uncoverable,
+        bottlenecks=bottlenecks,
+    )
@@ -0,0 +1,187 @@
+"""Greedy construction heuristic.
+
+Builds a schedule in a single pass, without the CP-SAT solver: the most
+constrained shift is filled first, by the eligible employee that gains the most
+preference score (minus short-rest penalty), breaking ties by the lowest load.
+The result is used as a hint for the solver and as an instant fallback when
+there is no time left to solve.
+"""
+
+import bisect
+
+import numpy as np
+
+from scheduling.models.solution import Solution
+from scheduling.solver.eligibility import eligible_employees
+from scheduling.solver.metrics import compute_metrics
+from scheduling.solver.problem import (
+    PREFER_PERIOD,
+    PREFER_SHIFT,
+    UNASSIGNED,
+    UNAVAILABLE_PERIOD,
+    CompiledProblem,
+)
+from scheduling.solver.scoring import (
+    PREFERENCE_WEIGHT,
+    REST_THRESHOLD_SECONDS,
+    rest_penalty_seconds,
+)
+
+
+class _Timeline:
+    """Non-overlapping shifts of one employee, kept sorted by start time."""
+
+    def __init__(self) -> None:
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+
+    def overlaps(self, start: int, end: int) -> bool:
+        i = bisect.bisect_left(self._starts, start)
+        if i > 0 and self._ends[i - 1] > start:
+            return True
+        return i < len(self._starts) and self._starts[i] < end
+
+    def rest_penalty(self, start: int, end: int) -> int:
+        """Total short-rest penalty of adding the shift [start, end) to this timeline."""
+        i = bisect.bisect_left(self._starts, start)
+        penalty = 0
+        j = i - 1
+        while j >= 0 and start - self._ends[j] < REST_THRESHOLD_SECONDS:
+            penalty += rest_penalty_seconds(start - self._ends[j])
+            j -= 1
+        j = i
+        while j < len(self._starts) and self._starts[j] - end < REST_THRESHOLD_SECONDS:
+            penalty += rest_penalty_seconds(self._starts[j] - end)
+            j += 1
+        return penalty
+
+    def add(self, start: int, end: int) -> None:
+        i = bisect.bisect_left(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+
+
+class _Preferences:
+    """The preference table as plain lists, for the per-candidate scoring loop."""
+
+    def __init__(self, problem: CompiledProblem) -> None:
+        self.offsets = problem.pref_offsets.tolist()
+        self.kind = problem.pref_kind.tolist()
+        self.hard = problem.pref_hard.tolist()
+        self.shift = problem.pref_shift.tolist()
+        self.start = problem.pref_start.tolist()
+        self.end = problem.pref_end.tolist()
+
+    def rows(self, employee: int) -> range:
+        return range(self.offsets[employee], self.offsets[employee + 1])
+
+    def overlaps(self, row: int, start: int, end: int) -> bool:
+        return self.start[row] < end and self.end[row] > start
+
+
+def _preference_gain(
+    prefs: _Preferences, employee: int, shift: int, start: int, end: int, settled: set[int]
+) -> int:
+    """Change in satisfied soft preferences if `employee` takes `shift`.
+
+    Hard period preferences count as well, so the heuristic tries to meet them.
+    `settled` holds the period preference rows that are already satisfied or violated.
+    """
+    gain = 0
+    for row in prefs.rows(employee):
+        if row in settled:
+            continue
+        kind = prefs.kind[row]
+        if kind == PREFER_SHIFT:
+            if not prefs.hard[row] and prefs.shift[row] == shift:
+                gain += 1
+        elif kind == PREFER_PERIOD:
+            if prefs.overlaps(row, start, end):
+                gain += 1
+        elif kind == UNAVAILABLE_PERIOD and not prefs.hard[row] and prefs.overlaps(row, start, end):
+            gain -= 1
+    return gain
+
+
+def _settle_preferences(
+    prefs: _Preferences, employee: int, start: int, end: int, settled: set[int]
+) -> None:
+    for row in prefs.rows(employee):
+        if prefs.kind[row] != PREFER_SHIFT and prefs.overlaps(row, start, end):
+            settled.add(row)
+
+
+def greedy_assign(problem: CompiledProblem) -> np.ndarray:
+    """Assign as many shifts as possible in one greedy pass.
+
+    Returns the employee index per shift index. Shifts that cannot be filled
+    without breaking a hard constraint are left UNASSIGNED, so the result may
+    be partial.
+    """
+    eligible = eligible_employees(problem)
+    # Shift indices are in start-time order, so the index breaks ties by start.
+    order = sorted(range(problem.num_shifts), key=lambda s: (len(eligible[s]), s))
+    starts = problem.shift_start.tolist()
+    ends = problem.shift_end.tolist()
+    prefs = _Preferences(problem)
+
+    timelines = [_Timeline() for _ in range(problem.num_employees)]
+    load = [0] * problem.num_employees
+    settled: set[int] = set()
+    assigned = np.full(problem.num_shifts, UNASSIGNED, dtype=np.int32)
+
+    for shift in order:
+        start, end = starts[shift], ends[shift]
+        best: int | None = None
+        best_key: tuple[int, int] | None = None
+        for employee in eligible[shift]:
+            timeline = timelines[employee]
+            if timeline.overlaps(start, end):
+                continue
+            score = _preference_gain(
+                prefs, employee, shift, start, end, settled
+            ) * PREFERENCE_WEIGHT - timeline.rest_penalty(start, end)
+            key = (-score, load[employee])
+            if best_key is None or key < best_key:
+                best, best_key = employee, key
+
+        if best is None:
+            continue
+        assigned[shift] = best
+        timelines[best].add(start, end)
+        load[best] += 1
+        _settle_preferences(prefs, best, start, end, settled)
+
+    return assigned
+
+
+def _meets_hard_period_preferences(problem: CompiledProblem, assigned: np.ndarray) -> bool:
+    """Check hard period preferences the same way the solver enforces them.
+
+    The solver only requires a shift in the period when the employee is
+    qualified for at least one shift overlapping it.
+    """
+    rows = np.flatnonzero(problem.pref_hard & (problem.pref_kind == PREFER_PERIOD))
+    for row in rows.tolist():
+        employee = int(problem.pref_employee[row])
+        in_period = problem.shifts_overlapping(
+            int(problem.pref_start[row]), int(problem.pref_end[row])
+        ).tolist()
+        if not any(problem.is_qualified(employee, s) for s in in_period):
+            continue
+        if not (assigned[in_period] == employee).any():
+            return False
+    return True
+
+
+def greedy_solve(problem: CompiledProblem) -> Solution | None:
+    """Return the greedy schedule if it covers every shift and meets all hard constraints."""
+    assigned = greedy_assign(problem)
+    if (assigned == UNASSIGNED).any():
+        return None
+    if not _meets_hard_period_preferences(problem, assigned):
+        return None
+    return Solution(
+        assignments=problem.decode_assignments(assigned),
+        metrics=compute_metrics(problem, assigned),
+    )
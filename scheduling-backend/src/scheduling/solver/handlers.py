@@ -1,59 +1,79 @@
 from ortools.sat.python import cp_model
 
-from scheduling.models.employee import Employee
-from scheduling.models.preferences.base import BasePreference
-from scheduling.models.preferences.prefer_period import PreferPeriodPreference
-from scheduling.models.preferences.prefer_shift import PreferShiftPreference
-from scheduling.models.preferences.unavailable import UnavailablePeriodPreference
-from scheduling.models.shift import Shift
-from scheduling.types import EmployeeId, ShiftId
+from scheduling.solver.problem import (
+    PREFER_PERIOD,
+    PREFER_SHIFT,
+    UNAVAILABLE_PERIOD,
+    CompiledProblem,
+)
 
 
 def apply_preference(
-    pref: BasePreference,
-    employee: Employee,
-    shifts: list[Shift],
-    assign_vars: dict[tuple[EmployeeId, ShiftId], cp_model.IntVar],
+    problem: CompiledProblem,
+    index: int,
+    assign_vars: dict[tuple[int, int], cp_model.IntVar],
     model: cp_model.CpModel,
+    enforce: cp_model.IntVar | None = None,
 ) -> list[cp_model.IntVar]:
-    if isinstance(pref, UnavailablePeriodPreference):
-        return _handle_unavailable_period(pref, employee, shifts, assign_vars, model)
-    if isinstance(pref, PreferShiftPreference):
-        return _handle_prefer_shift(pref, employee, assign_vars, model)
-    if isinstance(pref, PreferPeriodPreference):
-        return _handle_prefer_period(pref, employee, shifts, assign_vars, model)
+    """Add the constraints for preference row `index` and return its soft indicators.
+
+    `assign_vars` is keyed by (employee index, shift index). When `enforce` is
+    given, a hard preference's constraints only apply while that literal is
+    true, so it can be used as an assumption to explain infeasibility.
+    """
+    kind = problem.pref_kind[index]
+    if kind == UNAVAILABLE_PERIOD:
+        return _handle_unavailable_period(problem, index, assign_vars, model, enforce)
+    if kind == PREFER_SHIFT:
+        return _handle_prefer_shift(problem, index, assign_vars, model, enforce)
+    if kind == PREFER_PERIOD:
+        return _handle_prefer_period(problem, index, assign_vars, model, enforce)
     return []
 
 
-def _handle_unavailable_period(
-    pref: UnavailablePeriodPreference,
-    employee: Employee,
-    shifts: list[Shift],
-    assign_vars: dict[tuple[EmployeeId, ShiftId], cp_model.IntVar],
+def _add_hard(
     model: cp_model.CpModel,
+    constraint: cp_model.BoundedLinearExpression,
+    enforce: cp_model.IntVar | None,
+) -> None:
+    ct = model.Add(constraint)
+    if enforce is not None:
+        ct.OnlyEnforceIf(enforce)
+
+
+def _period_vars(
+    problem: CompiledProblem,
+    index: int,
+    assign_vars: dict[tuple[int, int], cp_model.IntVar],
 ) -> list[cp_model.IntVar]:
-    overlapping_shifts = [s for s in shifts if pref.overlaps_with(s.start_time, s.end_time)]
+    """The employee's assignment variables for shifts overlapping the row's period."""
+    employee = int(problem.pref_employee[index])
+    overlapping = problem.shifts_overlapping(
+        int(problem.pref_start[index]), int(problem.pref_end[index])
+    )
+    return [
+        assign_vars[(employee, s)] for s in overlapping.tolist() if (employee, s) in assign_vars
+    ]
 
-    if pref.is_hard:
-        for shift in overlapping_shifts:
-            key = (employee.id, shift.id)
-            if key in assign_vars:
-                model.Add(assign_vars[key] == 0)
-        return []
 
-    if not overlapping_shifts:
-        return []
+def _handle_unavailable_period(
+    problem: CompiledProblem,
+    index: int,
+    assign_vars: dict[tuple[int, int], cp_model.IntVar],
+    model: cp_model.CpModel,
+    enforce: cp_model.IntVar | None = None,
+) -> list[cp_model.IntVar]:
+    overlap_vars = _period_vars(problem, index, assign_vars)
 
-    overlap_vars = [
-        assign_vars[(employee.id, s.id)]
-        for s in overlapping_shifts
-        if (employee.id, s.id) in assign_vars
-    ]
+    if problem.pref_hard[index]:
+        for var in overlap_vars:
+            _add_hard(model, var == 0, enforce)
+        return []
 
     if not overlap_vars:
         return []
 
-    indicator = model.NewBoolVar(f"unavail_soft_{employee.id}_{pref.start.isoformat()}")
+    indicator = model.NewBoolVar(f"unavail_soft_{index}")
     model.Add(sum(overlap_vars) == 0).OnlyEnforceIf(indicator)
     model.Add(sum(overlap_vars) > 0).OnlyEnforceIf(indicator.Not())
 
@@ -61,52 +81,44 @@ def _handle_unavailable_period(
 
 
 def _handle_prefer_shift(
-    pref: PreferShiftPreference,
-    employee: Employee,
-    assign_vars: dict[tuple[EmployeeId, ShiftId], cp_model.IntVar],
+    problem: CompiledProblem,
+    index: int,
+    assign_vars: dict[tuple[int, int], cp_model.IntVar],
     model: cp_model.CpModel,
+    enforce: cp_model.IntVar | None = None,
 ) -> list[cp_model.IntVar]:
-    key = (employee.id, pref.shift_id)
+    key = (int(problem.pref_employee[index]), int(problem.pref_shift[index]))
 
     if key not in assign_vars:
         return []
 
-    if pref.is_hard:
-        model.Add(assign_vars[key] == 1)
+    if problem.pref_hard[index]:
+        _add_hard(model, assign_vars[key] == 1, enforce)
         return []
 
     return [assign_vars[key]]
 
 
 def _handle_prefer_period(
-    pref: PreferPeriodPreference,
-    employee: Employee,
-    shifts: list[Shift],
-    assign_vars: dict[tuple[EmployeeId, ShiftId], cp_model.IntVar],
+    problem: CompiledProblem,
+    index: int,
+    assign_vars: dict[tuple[int, int], cp_model.IntVar],
     model: cp_model.CpModel,
+    enforce: cp_model.IntVar | None = None,
 ) -> list[cp_model.IntVar]:
     """Handle preference for working during a specific time period."""
-    period_shifts = [s for s in shifts if pref.overlaps_with(s.start_time, s.end_time)]
-
-    if not period_shifts:
-        return []
-
-    period_vars = [
-        assign_vars[(employee.id, s.id)]
-        for s in period_shifts
-        if (employee.id, s.id) in assign_vars
-    ]
+    period_vars = _period_vars(problem, index, assign_vars)
 
     if not period_vars:
         return []
 
-    if pref.is_hard:
+    if problem.pref_hard[index]:
         # Hard preference: must work at least one shift in this period
-        model.Add(sum(period_vars) >= 1)
+        _add_hard(model, sum(period_vars) >= 1, enforce)
         return []
 
     # Soft preference: indicator is 1 if assigned to at least one shift in period
-    indicator = model.NewBoolVar(f"prefer_period_soft_{employee.id}_{pref.start.isoformat()}")
+    indicator = model.NewBoolVar(f"prefer_period_soft_{index}")
     model.Add(sum(period_vars) >= 1).OnlyEnforceIf(indicator)
     model.Add(sum(period_vars) == 0).OnlyEnforceIf(indicator.Not())
 
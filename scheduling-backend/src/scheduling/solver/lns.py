@@ -0,0 +1,246 @@
+"""Large Neighborhood Search for instances too big for one monolithic CP model.
+
+Starting from a complete assignment, each iteration frees a neighborhood of
+shifts (one day, the shifts of a group of employees, or a random sample),
+re-solves only those shifts with CP-SAT while everything else stays fixed, and
+keeps the result when the full objective improves. Neighborhoods are picked,
+and scored, on the one CompiledProblem: the freed shifts and the fixed shifts
+they interact with are masks over its shift indices, and Scheduler.build_model
+restricts the model to them, so preference handlers and rest scoring are shared.
+"""
+
+import random
+import time
+from collections.abc import Callable
+from typing import Literal
+
+import numpy as np
+from ortools.sat.python import cp_model
+from pydantic import BaseModel
+
+from scheduling.models.employee import Employee
+from scheduling.models.shift import Shift
+from scheduling.models.solution import Solution, SolveResult, SolveStats, SolveStatus
+from scheduling.solver.greedy import greedy_solve
+from scheduling.solver.metrics import compute_metrics
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.problem import PREFER_SHIFT, UNASSIGNED, compile_problem
+from scheduling.solver.scheduler import Scheduler
+from scheduling.solver.scoring import REST_THRESHOLD_SECONDS, objective_value
+from scheduling.types import EmployeeId, ShiftId
+
+NeighborhoodKind = Literal["day", "employees", "random"]
+
+
+class LnsProgress(BaseModel):
+    """Reported after every LNS iteration."""
+
+    iteration: int
+    elapsed: float
+    neighborhood: NeighborhoodKind
+    neighborhood_size: int
+    improved: bool
+    objective: int
+
+
+class LnsScheduler:
+    def __init__(
+        self,
+        employees: list[Employee],
+        shifts: list[Shift],
+        neighborhood_size: int = 60,
+        iteration_time_limit: float = 2.0,
+        seed: int = 0,
+    ):
+        self.problem = compile_problem(employees, shifts)
+        self.neighborhood_size = neighborhood_size
+        self.iteration_time_limit = iteration_time_limit
+        self._rng = random.Random(seed)
+        self._scheduler = Scheduler.from_problem(self.problem)
+        # Local start date of each shift, as the "day" neighborhood groups them.
+        self._day = np.array(
+            [
+                self.problem.to_datetime(start).toordinal()
+                for start in self.problem.shift_start.tolist()
+            ],
+            dtype=np.int64,
+        )
+        overlap_i, overlap_j, rest_i, rest_j = self.problem.shift_pairs(REST_THRESHOLD_SECONDS)
+        # Shifts within the rest threshold of each other, in both directions.
+        self._near_i = np.concatenate([overlap_i, rest_i, overlap_j, rest_j])
+        self._near_j = np.concatenate([overlap_j, rest_j, overlap_i, rest_i])
+        self._period_rows = np.flatnonzero(self.problem.pref_kind != PREFER_SHIFT)
+
+    def _initial_assignment(
+        self, initial: dict[ShiftId, EmployeeId] | None, time_limit: float
+    ) -> tuple[np.ndarray | None, SolveStatus]:
+        """Use the given or greedy assignment, falling back to a first-feasible full solve.
+
+        A given `initial` assignment is trusted to satisfy the hard constraints.
+        When no assignment is found, the status of the fallback solve is returned
+        so a proven-infeasible problem is reported as such.
+        """
+        if initial is not None and len(initial) == self.problem.num_shifts:
+            return self.problem.encode_assignments(initial), "feasible"
+        greedy = greedy_solve(self.problem)
+        if greedy is not None:
+            return self.problem.encode_assignments(greedy.assignments), "feasible"
+
+        result = self._scheduler.solve_with_stats(
+            max_solutions=1,
+            options=SolverOptions(max_time_in_seconds=time_limit, stop_at_first_feasible=True),
+        )
+        if not result.solutions:
+            return None, result.stats.status
+        return self.problem.encode_assignments(result.solutions[0].assignments), "feasible"
+
+    def _pick_neighborhood(self, assigned: np.ndarray) -> tuple[NeighborhoodKind, np.ndarray]:
+        """A neighborhood kind and the indices of the shifts it frees."""
+        problem = self.problem
+        kind: NeighborhoodKind = self._rng.choice(["day", "employees", "random"])
+        if kind == "day":
+            day = self._day[self._rng.randrange(problem.num_shifts)]
+            freed = np.flatnonzero(self._day == day)
+        elif kind == "employees":
+            group_size = min(max(2, problem.num_employees // 10), problem.num_employees)
+            group = self._rng.sample(range(problem.num_employees), group_size)
+            freed = np.flatnonzero(np.isin(assigned, group))
+        else:
+            freed = np.arange(problem.num_shifts)
+
+        if len(freed) > self.neighborhood_size:
+            freed = np.array(sorted(self._rng.sample(freed.tolist(), self.neighborhood_size)))
+        return kind, freed
+
+    def _context(self, freed: np.ndarray, assigned: np.ndarray) -> np.ndarray:
+        """Mask of the fixed shifts whose objective terms the freed shifts touch.
+
+        A shift is included when its employee could take a freed shift and it
+        is either within the rest threshold of a freed shift or inside one of
+        that employee's period preferences overlapping a freed shift.
+        """
+        problem = self.problem
+        is_freed = np.zeros(problem.num_shifts, dtype=bool)
+        is_freed[freed] = True
+        candidates = np.zeros(problem.num_employees, dtype=bool)
+        for shift in freed.tolist():
+            candidates[problem.qualified[shift]] = True
+        owned = candidates[assigned] & ~is_freed
+
+        context = np.zeros(problem.num_shifts, dtype=bool)
+        context[self._near_j[is_freed[self._near_i]]] = True
+        context &= owned
+
+        rows = self._period_rows[candidates[problem.pref_employee[self._period_rows]]]
+        for row in rows.tolist():
+            overlapping = problem.shifts_overlapping(
+                int(problem.pref_start[row]), int(problem.pref_end[row])
+            )
+            if is_freed[overlapping].any():
+                theirs = owned[overlapping] & (assigned[overlapping] == problem.pref_employee[row])
+                context[overlapping[theirs]] = True
+        return context
+
+    def _solve_neighborhood(
+        self, freed: np.ndarray, assigned: np.ndarray, time_limit: float
+    ) -> np.ndarray | None:
+        """Re-solve the freed shifts with the context shifts fixed to their employees."""
+        context = self._context(freed, assigned)
+        active = context.copy()
+        active[freed] = True
+        model = cp_model.CpModel()
+        assign_vars, _ = self._scheduler.build_model(
+            model, active, np.where(context, assigned, UNASSIGNED)
+        )
+        is_freed = active & ~context
+        for (employee, shift), var in assign_vars.items():
+            if is_freed[shift]:
+                model.AddHint(var, int(assigned[shift] == employee))
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = time_limit
+        status = solver.Solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+
+        updated = assigned.copy()
+        for (employee, shift), var in assign_vars.items():
+            if is_freed[shift] and solver.BooleanValue(var):
+                updated[shift] = employee
+        return updated
+
+    def solve(
+        self,
+        time_budget: float = 60.0,
+        initial: dict[ShiftId, EmployeeId] | None = None,
+        max_iterations: int | None = None,
+        on_progress: Callable[[LnsProgress], None] | None = None,
+    ) -> SolveResult:
+        """Improve a complete assignment until the time budget runs out.
+
+        Returns at most one solution (the best found). The status is "feasible"
+        since LNS never proves optimality; when no starting assignment exists it
+        is the status of the fallback full solve.
+        """
+        started = time.monotonic()
+        deadline = started + time_budget
+
+        current, status = self._initial_assignment(initial, time_budget)
+        if current is None:
+            return SolveResult(
+                stats=SolveStats(
+                    status=status,
+                    wall_time=time.monotonic() - started,
+                    hit_time_limit=status == "unknown",
+                )
+            )
+
+        best_objective = objective_value(self.problem, current)
+        improvements = 1
+        iteration = 0
+        while time.monotonic() < deadline and self.problem.num_shifts:
+            if max_iterations is not None and iteration >= max_iterations:
+                break
+            iteration += 1
+            kind, freed = self._pick_neighborhood(current)
+            remaining = deadline - time.monotonic()
+            candidate = None
+            if len(freed) and remaining > 0:
+                candidate = self._solve_neighborhood(
+                    freed, current, min(self.iteration_time_limit, remaining)
+                )
+
+            improved = False
+            if candidate is not None:
+                candidate_objective = objective_value(self.problem, candidate)
+                if candidate_objective > best_objective:
+                    current, best_objective = candidate, candidate_objective
+                    improvements += 1
+                    improved = True
+
+            if on_progress is not None:
+                on_progress(
+                    LnsProgress(
+                        iteration=iteration,
+                        elapsed=time.monotonic() - started,
+                        neighborhood=kind,
+                        neighborhood_size=len(freed),
+                        improved=improved,
+                        objective=best_objective,
+                    )
+                )
+
+        solution = Solution(
+            assignments=self.problem.decode_assignments(current),
+            metrics=compute_metrics(self.problem, current),
+        )
+        return SolveResult(
+            solutions=[solution],
+            stats=SolveStats(
+                status="feasible",
+                objective_value=best_objective,
+                wall_time=time.monotonic() - started,
+                num_solutions=improvements,
+                hit_time_limit=time.monotonic() >= deadline,
+            ),
+        )
@@ -1,73 +1,57 @@
 import statistics
 from collections import defaultdict
 
-from scheduling.models.employee import Employee
-from scheduling.models.preferences.prefer_period import PreferPeriodPreference
-from scheduling.models.preferences.prefer_shift import PreferShiftPreference
-from scheduling.models.preferences.unavailable import UnavailablePeriodPreference
-from scheduling.models.shift import Shift
-from scheduling.models.solution import SolutionMetrics
-from scheduling.types import EmployeeId, ShiftId
-
+import numpy as np
 
-def compute_metrics(
-    assignments: dict[ShiftId, EmployeeId],
-    employees: list[Employee],
-    shifts: list[Shift],
-) -> SolutionMetrics:
-    shift_map = {s.id: s for s in shifts}
+from scheduling.models.solution import SolutionMetrics
+from scheduling.solver.problem import (
+    PREFER_PERIOD,
+    PREFER_SHIFT,
+    PREFERENCE_TYPES,
+    UNASSIGNED,
+    UNAVAILABLE_PERIOD,
+    CompiledProblem,
+)
 
-    shifts_per_employee: dict[EmployeeId, int] = defaultdict(int)
-    for employee_id in assignments.values():
-        shifts_per_employee[employee_id] += 1
 
-    all_shift_counts = [shifts_per_employee.get(e.id, 0) for e in employees]
+def compute_metrics(problem: CompiledProblem, assigned: np.ndarray) -> SolutionMetrics:
+    """Metrics for `assigned`, the employee index per shift index (see encode_assignments)."""
+    filled = assigned[assigned != UNASSIGNED]
+    all_shift_counts = np.bincount(filled, minlength=problem.num_employees).tolist()
 
     fairness_score = statistics.stdev(all_shift_counts) if len(all_shift_counts) > 1 else 0.0
 
     preferences_satisfied: dict[str, int] = defaultdict(int)
     soft_preference_score = 0
 
-    for employee in employees:
-        for pref in employee.preferences:
-            if pref.is_hard:
-                continue
-
-            if _is_preference_satisfied(pref, employee.id, assignments, shift_map):
-                preferences_satisfied[pref.type] += 1
-                soft_preference_score += 1
+    for index in np.flatnonzero(~problem.pref_hard).tolist():
+        if _is_preference_satisfied(problem, index, assigned):
+            preferences_satisfied[PREFERENCE_TYPES[problem.pref_kind[index]]] += 1
+            soft_preference_score += 1
 
     return SolutionMetrics(
         soft_preference_score=soft_preference_score,
         fairness_score=fairness_score,
         preferences_satisfied=dict(preferences_satisfied),
-        total_shifts_assigned=len(assignments),
+        total_shifts_assigned=len(filled),
     )
 
 
-def _is_preference_satisfied(
-    pref,
-    employee_id: EmployeeId,
-    assignments: dict[ShiftId, EmployeeId],
-    shift_map: dict[ShiftId, Shift],
-) -> bool:
-    if isinstance(pref, PreferShiftPreference):
-        return assignments.get(pref.shift_id) == employee_id
+def _is_preference_satisfied(problem: CompiledProblem, index: int, assigned: np.ndarray) -> bool:
+    kind = problem.pref_kind[index]
+    employee = problem.pref_employee[index]
 
-    if isinstance(pref, PreferPeriodPreference):
-        for shift_id, assigned_employee in assignments.items():
-            if assigned_employee == employee_id:
-                shift = shift_map.get(shift_id)
-                if shift and pref.overlaps_with(shift.start_time, shift.end_time):
-                    return True
-        return False
+    if kind == PREFER_SHIFT:
+        shift = problem.pref_shift[index]
+        return bool(shift != UNASSIGNED and assigned[shift] == employee)
 
-    if isinstance(pref, UnavailablePeriodPreference):
-        for shift_id, assigned_employee in assignments.items():
-            if assigned_employee == employee_id:
-                shift = shift_map.get(shift_id)
-                if shift and pref.overlaps_with(shift.start_time, shift.end_time):
-                    return False
-        return True
+    overlapping = problem.shifts_overlapping(
+        int(problem.pref_start[index]), int(problem.pref_end[index])
+    )
+    works_in_period = bool((assigned[overlapping] == employee).any())
+    if kind == PREFER_PERIOD:
+        return works_in_period
+    if kind == UNAVAILABLE_PERIOD:
+        return not works_in_period
 
     return False
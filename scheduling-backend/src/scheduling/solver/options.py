@@ -0,0 +1,51 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+# Models with at least this many assignment variables are built with
+# build_bulk_model unless SolverOptions.bulk_build says otherwise.
+BULK_BUILD_MIN_VARIABLES = 20_000
+
+
+class SolverOptions(BaseModel):
+    """Tuning knobs for a single solve.
+
+    The stopping rules are optional and independent; the search ends as soon as
+    any enabled rule fires. Rules that look at the objective are ignored when
+    the model has no objective. `greedy_hint` seeds the search with the greedy
+    construction heuristic, and `precheck` runs the combinatorial feasibility
+    check first so provably infeasible problems skip the solver.
+    `explain_infeasibility` runs one extra diagnostic solve on infeasible
+    problems to name the conflicting constraints. `num_workers` sets CP-SAT's
+    search threads (its default uses every core). `dump_path` writes the built
+    model, solver parameters and id mappings there before solving, for
+    offline replay with `python -m scheduling.replay`. With
+    `trace_threshold`, CP-SAT's search log is collected during the solve and,
+    if precheck to solve took at least that many seconds, returned with the
+    parameters and model statistics in `SolveResult.trace`.
+    `max_memory_mb` caps the memory CP-SAT may use; a search that reaches it
+    stops early with the solutions found so far. `bulk_build` picks the
+    model builder: the bulk one that fills the model proto from arrays (see
+    scheduling/solver/bulk.py) or the cp_model API; by default, large models
+    are built in bulk.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    max_time_in_seconds: float = Field(default=60.0, gt=0)
+    relative_gap_limit: float | None = Field(default=None, ge=0)
+    stall_timeout: float | None = Field(default=None, gt=0)
+    stop_at_first_feasible: bool = False
+    objective_target: int | None = None
+    greedy_hint: bool = True
+    precheck: bool = True
+    explain_infeasibility: bool = False
+    num_workers: int | None = Field(default=None, ge=1)
+    dump_path: str | None = None
+    trace_threshold: float | None = Field(default=None, ge=0)
+    max_memory_mb: int | None = Field(default=None, ge=1)
+    bulk_build: bool | None = None
+
+    def builds_in_bulk(self, assignment_variables: int) -> bool:
+        """Whether a model with this many assignment variables is built in bulk."""
+        if self.bulk_build is not None:
+            return self.bulk_build
+        return assignment_variables >= BULK_BUILD_MIN_VARIABLES
@@ -0,0 +1,485 @@
+"""Compiled, integer-indexed form of a scheduling problem.
+
+The solver's hot loops work on this instead of the pydantic models. Employees
+and shifts become dense indices, shift times int64 epoch seconds sorted by
+start, ability lists interned bitmasks, and preferences a table of parallel
+arrays with one row per preference.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import NamedTuple
+
+import numpy as np
+
+from scheduling.models.employee import Employee
+from scheduling.models.preferences.prefer_period import PreferPeriodPreference
+from scheduling.models.preferences.prefer_shift import PreferShiftPreference
+from scheduling.models.preferences.unavailable import UnavailablePeriodPreference
+from scheduling.models.shift import Shift
+from scheduling.types import Ability, EmployeeId, PreferenceType, ShiftId
+
+# Preference kinds stored in CompiledProblem.pref_kind.
+PREFER_SHIFT = 0
+PREFER_PERIOD = 1
+UNAVAILABLE_PERIOD = 2
+
+PREFERENCE_TYPES: tuple[PreferenceType, ...] = (
+    PreferenceType("prefer_shift"),
+    PreferenceType("prefer_period"),
+    PreferenceType("unavailable_period"),
+)
+
+UNASSIGNED = -1
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def epoch_seconds(value: datetime) -> int:
+    """Whole seconds since the Unix epoch; naive datetimes are taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _SECOND
+
+
+class ProblemValidationError(ValueError):
+    """Raised with every problem found in the input, not just the first."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+@dataclass(frozen=True, eq=False)
+class CompiledProblem:
+    employee_ids: list[EmployeeId]
+    # Shift index order is ascending start time.
+    shift_ids: list[ShiftId]
+    employee_index: dict[EmployeeId, int]
+    shift_index: dict[ShiftId, int]
+    shift_start: np.ndarray
+    shift_end: np.ndarray
+    max_shift_duration: int
+    abilities: list[Ability]
+    employee_abilities: list[int]
+    shift_requirements: list[int]
+    # Indices of the employees holding every ability a shift requires.
+    qualified: list[list[int]]
+    pref_employee: np.ndarray
+    pref_kind: np.ndarray
+    pref_hard: np.ndarray
+    # Shift index of a prefer_shift row, UNASSIGNED for periods and unknown shifts.
+    pref_shift: np.ndarray
+    pref_start: np.ndarray
+    pref_end: np.ndarray
+    # Position of the preference in its employee's preference list.
+    pref_position: np.ndarray
+    # Rows of employee e are pref_offsets[e]:pref_offsets[e + 1].
+    pref_offsets: np.ndarray
+    # Time zone of the input times, used to turn epoch seconds back into datetimes.
+    tz: tzinfo | None = None
+
+    @property
+    def num_employees(self) -> int:
+        return len(self.employee_ids)
+
+    @property
+    def num_shifts(self) -> int:
+        return len(self.shift_ids)
+
+    @property
+    def num_preferences(self) -> int:
+        return len(self.pref_kind)
+
+    def is_qualified(self, employee: int, shift: int) -> bool:
+        required = self.shift_requirements[shift]
+        return self.employee_abilities[employee] & required == required
+
+    def to_datetime(self, seconds: int) -> datetime:
+        """Inverse of epoch_seconds, in the time zone of the input."""
+        value = _EPOCH + timedelta(seconds=seconds)
+        if self.tz is None:
+            return value
+        return value.replace(tzinfo=timezone.utc).astimezone(self.tz)
+
+    def shifts_overlapping(self, start: int, end: int) -> np.ndarray:
+        """Indices of the shifts overlapping the half-open period [start, end)."""
+        lo = int(np.searchsorted(self.shift_start, start - self.max_shift_duration, "right"))
+        hi = int(np.searchsorted(self.shift_start, end, "left"))
+        candidates = np.arange(lo, hi)
+        return candidates[self.shift_end[lo:hi] > start]
+
+    def shift_pairs(self, window: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Pairs of shifts (i, j), i < j, where j starts less than `window` after i ends.
+
+        Returns (overlap_i, overlap_j, near_i, near_j): the pairs that overlap
+        in time and the non-overlapping ones, whose rest is then shorter than
+        `window`. Pairs further apart are never generated.
+        """
+        n = self.num_shifts
+        ends = np.searchsorted(self.shift_start, self.shift_end + window, "left")
+        counts = ends - np.arange(1, n + 1)
+        first = np.repeat(np.arange(n), counts)
+        offsets = np.arange(len(first)) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = first + 1 + offsets
+        overlap = self.shift_start[second] < self.shift_end[first]
+        return first[overlap], second[overlap], first[~overlap], second[~overlap]
+
+    def overlap_cliques(self) -> tuple[np.ndarray, np.ndarray]:
+        """Maximal sets of mutually overlapping shifts, of at least two shifts.
+
+        Returns (clique, shift) membership arrays sorted by clique. Shifts are
+        intervals, so the shifts running at a start time form a clique, and it
+        is maximal unless all of them are still running at the next start time.
+        """
+        start, end = self.shift_start, self.shift_end
+        times = np.unique(start)
+        hi = np.searchsorted(start, times, "right")
+        lo = np.searchsorted(start, times - self.max_shift_duration, "right")
+        counts = hi - lo
+        clique = np.repeat(np.arange(len(times)), counts)
+        shift = (
+            np.repeat(lo, counts)
+            + np.arange(len(clique))
+            - np.repeat(np.cumsum(counts) - counts, counts)
+        )
+        running = end[shift] > times[clique]
+        clique, shift = clique[running], shift[running]
+
+        sizes = np.bincount(clique, minlength=len(times))
+        first_end = np.full(len(times), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_end, clique, end[shift])
+        next_start = np.append(times[1:], np.iinfo(np.int64).max)
+        maximal = (sizes >= 2) & (first_end <= next_start)
+        keep = maximal[clique]
+        return clique[keep], shift[keep]
+
+    def encode_assignments(self, assignments: dict[ShiftId, EmployeeId]) -> np.ndarray:
+        """Employee index per shift index, UNASSIGNED where the shift has no employee."""
+        assigned = np.full(self.num_shifts, UNASSIGNED, dtype=np.int32)
+        for shift_id, employee_id in assignments.items():
+            assigned[self.shift_index[shift_id]] = self.employee_index[employee_id]
+        return assigned
+
+    def decode_assignments(self, assigned: np.ndarray) -> dict[ShiftId, EmployeeId]:
+        return {
+            self.shift_ids[s]: self.employee_ids[e]
+            for s, e in enumerate(assigned.tolist())
+            if e != UNASSIGNED
+        }
+
+
+class ProblemBuilder:
+    """Collects raw employee, shift and preference data and compiles it in one pass.
+
+    Preferences belong to the most recently added employee and may name shifts
+    added later. build() reports every validation error at once.
+    """
+
+    def __init__(self) -> None:
+        self._errors: list[str] = []
+        self._ability_bits: dict[Ability, int] = {}
+        self._tz: tzinfo | None = None
+        self._shift_ids: list[ShiftId] = []
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        self._requirements: list[int] = []
+        self._employee_ids: list[EmployeeId] = []
+        self._employee_abilities: list[int] = []
+        self._position = 0
+        # (employee, kind, is_hard, shift id, start, end, position)
+        self._rows: list[tuple[int, int, bool, ShiftId | None, int, int, int]] = []
+
+    def _mask(self, abilities: Iterable[str]) -> int:
+        bits = 0
+        for ability in abilities:
+            bits |= 1 << self._ability_bits.setdefault(Ability(ability), len(self._ability_bits))
+        return bits
+
+    def add_shift(
+        self,
+        shift_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        required_abilities: Iterable[str] = (),
+    ) -> None:
+        if not self._shift_ids:
+            self._tz = start_time.tzinfo
+        start, end = epoch_seconds(start_time), epoch_seconds(end_time)
+        if end <= start:
+            self._errors.append(f"Shift '{shift_id}': end_time must be after start_time")
+        self._shift_ids.append(ShiftId(shift_id))
+        self._starts.append(start)
+        self._ends.append(end)
+        self._requirements.append(self._mask(required_abilities))
+
+    def add_employee(self, employee_id: str, abilities: Iterable[str] = ()) -> None:
+        self._employee_ids.append(EmployeeId(employee_id))
+        self._employee_abilities.append(self._mask(abilities))
+        self._position = 0
+
+    def add_prefer_shift(self, shift_id: str, is_hard: bool = False) -> None:
+        self._add_row(PREFER_SHIFT, is_hard, ShiftId(shift_id), 0, 0)
+
+    def add_prefer_period(self, start: datetime, end: datetime, is_hard: bool = False) -> None:
+        self._add_period(PREFER_PERIOD, start, end, is_hard)
+
+    def add_unavailable_period(self, start: datetime, end: datetime, is_hard: bool = True) -> None:
+        self._add_period(UNAVAILABLE_PERIOD, start, end, is_hard)
+
+    def _add_period(self, kind: int, start: datetime, end: datetime, is_hard: bool) -> None:
+        employee = self._current_employee()
+        start_seconds, end_seconds = epoch_seconds(start), epoch_seconds(end)
+        if end_seconds <= start_seconds:
+            self._errors.append(
+                f"Employee '{self._employee_ids[employee]}' preference {self._position}: "
+                "end must be after start"
+            )
+        self._add_row(kind, is_hard, None, start_seconds, end_seconds)
+
+    def _current_employee(self) -> int:
+        """The employee new preferences belong to; raises if none was added yet."""
+        if not self._employee_ids:
+            raise ProblemValidationError(["Preference added before any employee"])
+        return len(self._employee_ids) - 1
+
+    def _add_row(
+        self, kind: int, is_hard: bool, shift_id: ShiftId | None, start: int, end: int
+    ) -> None:
+        employee = self._current_employee()
+        self._rows.append((employee, kind, is_hard, shift_id, start, end, self._position))
+        self._position += 1
+
+    def build(self, validate: bool = True) -> CompiledProblem:
+        """Compile the collected data.
+
+        With `validate`, duplicate ids, unknown shift references and reversed
+        periods raise one ProblemValidationError listing all of them. Without
+        it, nothing is checked: a prefer_shift naming an unknown shift matches
+        no shift, and a duplicated id refers to one of its entries.
+        """
+        errors = list(self._errors) if validate else None
+        shift_positions = _index(self._shift_ids, "shift", errors)
+
+        pref_shift: list[int] = []
+        for employee, _, _, shift_id, _, _, _ in self._rows:
+            if shift_id is None:
+                pref_shift.append(UNASSIGNED)
+                continue
+            shift = shift_positions.get(shift_id)
+            if shift is None:
+                if errors is not None:
+                    errors.append(
+                        f"Employee '{self._employee_ids[employee]}' has preference for "
+                        f"shift_id '{shift_id}' does not exist"
+                    )
+                shift = UNASSIGNED
+            pref_shift.append(shift)
+
+        columns = list(zip(*self._rows, strict=True)) if self._rows else [()] * 7
+        return _assemble(
+            employee_ids=list(self._employee_ids),
+            employee_abilities=list(self._employee_abilities),
+            abilities=list(self._ability_bits),
+            shift_ids=list(self._shift_ids),
+            starts=np.array(self._starts, dtype=np.int64),
+            ends=np.array(self._ends, dtype=np.int64),
+            requirements=list(self._requirements),
+            preferences=PreferenceColumns(
+                employee=np.array(columns[0], dtype=np.int32),
+                kind=np.array(columns[1], dtype=np.int8),
+                hard=np.array(columns[2], dtype=bool),
+                shift=np.array(pref_shift, dtype=np.int32),
+                start=np.array(columns[4], dtype=np.int64),
+                end=np.array(columns[5], dtype=np.int64),
+                position=np.array(columns[6], dtype=np.int32),
+            ),
+            errors=errors,
+            tz=self._tz,
+        )
+
+
+class PreferenceColumns(NamedTuple):
+    """Preference rows as parallel arrays, with shifts given by input position."""
+
+    employee: np.ndarray
+    kind: np.ndarray
+    hard: np.ndarray
+    shift: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    position: np.ndarray
+
+
+def compile_columns(
+    employee_ids: list[str],
+    employee_abilities: list[int],
+    abilities: list[str],
+    shift_ids: list[str],
+    starts: np.ndarray,
+    ends: np.ndarray,
+    requirements: list[int],
+    preferences: PreferenceColumns,
+    validate: bool = True,
+) -> CompiledProblem:
+    """Compile a problem that is already in columnar form.
+
+    Ability bit i stands for `abilities[i]`; times are epoch seconds (UTC).
+    Preference rows refer to employees and shifts by their position in
+    `employee_ids` and `shift_ids`, and may come in any order. With
+    `validate`, every reversed time range, duplicate id and out-of-range
+    reference is reported in one ProblemValidationError.
+    """
+    errors: list[str] | None = None
+    if validate:
+        errors = []
+        num_employees, num_shifts = len(employee_ids), len(shift_ids)
+        for shift in np.flatnonzero(ends <= starts).tolist():
+            errors.append(f"Shift '{shift_ids[shift]}': end_time must be after start_time")
+        if any(bits >> len(abilities) for bits in (*employee_abilities, *requirements)):
+            errors.append(f"Ability bitsets must only use the {len(abilities)} listed abilities")
+        bad_employee = (preferences.employee < 0) | (preferences.employee >= num_employees)
+        for row in np.flatnonzero(bad_employee).tolist():
+            errors.append(
+                f"{PREFERENCE_TYPES[preferences.kind[row]]} preference "
+                f"{preferences.position[row]}: employee {preferences.employee[row]} does not exist"
+            )
+        is_shift = preferences.kind == PREFER_SHIFT
+        bad_shift = is_shift & ((preferences.shift < 0) | (preferences.shift >= num_shifts))
+        for row in np.flatnonzero(bad_shift & ~bad_employee).tolist():
+            errors.append(
+                f"Employee '{employee_ids[preferences.employee[row]]}' has preference for "
+                f"shift {preferences.shift[row]} does not exist"
+            )
+        reversed_period = ~is_shift & (preferences.end <= preferences.start)
+        for row in np.flatnonzero(reversed_period & ~bad_employee).tolist():
+            errors.append(
+                f"Employee '{employee_ids[preferences.employee[row]]}' "
+                f"{PREFERENCE_TYPES[preferences.kind[row]]} preference "
+                f"{preferences.position[row]}: end must be after start"
+            )
+        _index(shift_ids, "shift", errors)
+
+    order = np.argsort(preferences.employee, kind="stable")
+    preferences = PreferenceColumns(*(column[order] for column in preferences))
+    return _assemble(
+        employee_ids=[EmployeeId(e) for e in employee_ids],
+        employee_abilities=list(employee_abilities),
+        abilities=[Ability(a) for a in abilities],
+        shift_ids=[ShiftId(s) for s in shift_ids],
+        starts=starts,
+        ends=ends,
+        requirements=list(requirements),
+        preferences=preferences,
+        errors=errors,
+    )
+
+
+def _assemble(
+    employee_ids: list[EmployeeId],
+    employee_abilities: list[int],
+    abilities: list[Ability],
+    shift_ids: list[ShiftId],
+    starts: np.ndarray,
+    ends: np.ndarray,
+    requirements: list[int],
+    preferences: PreferenceColumns,
+    errors: list[str] | None,
+    tz: tzinfo | None = None,
+) -> CompiledProblem:
+    """Sort shifts by start and index everything; raises if `errors` is not empty.
+
+    Preference rows must already be grouped by employee. `errors` is None when
+    the input is not validated.
+    """
+    employee_index = _index(employee_ids, "employee", errors)
+    if errors:
+        raise ProblemValidationError(errors)
+
+    order = np.argsort(starts, kind="stable")
+    shift_ids = [shift_ids[i] for i in order.tolist()]
+    shift_index = {shift_id: index for index, shift_id in enumerate(shift_ids)}
+    shift_requirements = [requirements[i] for i in order.tolist()]
+    shift_start = starts[order]
+    shift_end = ends[order]
+    # Shift references in the rows are input positions; map them to sorted indices.
+    rank = np.empty(len(order), dtype=np.int32)
+    rank[order] = np.arange(len(order), dtype=np.int32)
+    pref_shift = np.full(len(preferences.shift), UNASSIGNED, dtype=np.int32)
+    known = (preferences.shift >= 0) & (preferences.shift < len(rank))
+    pref_shift[known] = rank[preferences.shift[known]]
+
+    by_abilities: dict[int, list[int]] = {}
+    for index, bits in enumerate(employee_abilities):
+        by_abilities.setdefault(bits, []).append(index)
+    qualified_by_requirement: dict[int, list[int]] = {}
+    for required in set(shift_requirements):
+        qualified_by_requirement[required] = sorted(
+            index
+            for bits, indices in by_abilities.items()
+            if bits & required == required
+            for index in indices
+        )
+
+    pref_employee = preferences.employee.astype(np.int32, copy=False)
+    return CompiledProblem(
+        employee_ids=employee_ids,
+        shift_ids=shift_ids,
+        employee_index=employee_index,
+        shift_index=shift_index,
+        shift_start=shift_start,
+        shift_end=shift_end,
+        max_shift_duration=int((shift_end - shift_start).max()) if len(order) else 0,
+        abilities=abilities,
+        employee_abilities=employee_abilities,
+        shift_requirements=shift_requirements,
+        qualified=[qualified_by_requirement[bits] for bits in shift_requirements],
+        pref_employee=pref_employee,
+        pref_kind=preferences.kind.astype(np.int8, copy=False),
+        pref_hard=preferences.hard.astype(bool, copy=False),
+        pref_shift=pref_shift,
+        pref_start=preferences.start.astype(np.int64, copy=False),
+        pref_end=preferences.end.astype(np.int64, copy=False),
+        pref_position=preferences.position.astype(np.int32, copy=False),
+        pref_offsets=np.searchsorted(pref_employee, np.arange(len(employee_ids) + 1)),
+        tz=tz,
+    )
+
+
+def _index(ids: list[str], kind: str, errors: list[str] | None) -> dict:
+    """Map ids to their positions, recording each duplicate id once in `errors`.
+
+    A duplicated id maps to its first position; `errors` may be None to skip
+    the report.
+    """
+    index: dict = {}
+    duplicates: list[str] = []
+    reported: set[str] = set()
+    for position, item in enumerate(ids):
+        if index.setdefault(item, position) != position and item not in reported:
+            reported.add(item)
+            duplicates.append(item)
+    if errors is not None:
+        errors.extend(f"Duplicate {kind} id: '{item}'" for item in duplicates)
+    return index
+
+
+def compile_problem(
+    employees: list[Employee], shifts: list[Shift], validate: bool = True
+) -> CompiledProblem:
+    """Compile domain models into a CompiledProblem (see ProblemBuilder.build)."""
+    builder = ProblemBuilder()
+    for shift in shifts:
+        builder.add_shift(shift.id, shift.start_time, shift.end_time, shift.required_abilities)
+    for employee in employees:
+        builder.add_employee(employee.id, employee.abilities)
+        for pref in employee.preferences:
+            if isinstance(pref, PreferShiftPreference):
+                builder.add_prefer_shift(pref.shift_id, pref.is_hard)
+            elif isinstance(pref, PreferPeriodPreference):
+                builder.add_prefer_period(pref.start, pref.end, pref.is_hard)
+            elif isinstance(pref, UnavailablePeriodPreference):
+                builder.add_unavailable_period(pref.start, pref.end, pref.is_hard)
+    return builder.build(validate)
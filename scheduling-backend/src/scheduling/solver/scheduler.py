@@ -1,49 +1,191 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable
+
+import numpy as np
 from ortools.sat.python import cp_model
 
 from scheduling.models.employee import Employee
-from scheduling.models.preferences.prefer_shift import PreferShiftPreference
+from scheduling.models.feasibility import Conflict
 from scheduling.models.shift import Shift
-from scheduling.models.solution import Solution
+from scheduling.models.solution import (
+    Solution,
+    SolveResult,
+    SolveStats,
+    SolveStatus,
+    SolveTrace,
+    StopReason,
+)
+from scheduling.solver.bulk import AssignmentVariables, build_bulk_model
+from scheduling.solver.export import export_model
+from scheduling.solver.feasibility import check_problem_feasibility
+from scheduling.solver.greedy import greedy_assign, greedy_solve
 from scheduling.solver.handlers import apply_preference
 from scheduling.solver.metrics import compute_metrics
-from scheduling.types import EmployeeId, ShiftId
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.problem import (
+    PREFERENCE_TYPES,
+    UNASSIGNED,
+    CompiledProblem,
+    compile_problem,
+)
+from scheduling.solver.scoring import (
+    PREFERENCE_WEIGHT,
+    REST_THRESHOLD_SECONDS,
+    rest_penalty_seconds,
+)
+
+EXPLAIN_TIME_LIMIT = 10.0
+# A traced solve keeps this many lines from each end of its search log.
+SEARCH_LOG_LINES = 5000
+
+_STATUS_NAMES: dict[int, SolveStatus] = {
+    cp_model.OPTIMAL: "optimal",
+    cp_model.FEASIBLE: "feasible",
+    cp_model.INFEASIBLE: "infeasible",
+    cp_model.MODEL_INVALID: "model_invalid",
+    cp_model.UNKNOWN: "unknown",
+}
+
+
+class SearchLog:
+    """CP-SAT log lines from a log callback, keeping the start and the end of long logs."""
+
+    def __init__(self, lines: int = SEARCH_LOG_LINES):
+        self._lines = lines
+        self._head: list[str] = []
+        self._tail: deque[str] = deque(maxlen=lines)
+        self.dropped = 0
+
+    def append(self, line: str) -> None:
+        if len(self._head) < self._lines:
+            self._head.append(line)
+            return
+        if len(self._tail) == self._lines:
+            self.dropped += 1
+        self._tail.append(line)
+
+    @property
+    def lines(self) -> list[str]:
+        return self._head + list(self._tail)
 
 
 class SolutionCollector(cp_model.CpSolverSolutionCallback):
     def __init__(
         self,
-        assign_vars: dict[tuple[EmployeeId, ShiftId], cp_model.IntVar],
-        employees: list[Employee],
-        shifts: list[Shift],
-        objective_var: cp_model.IntVar | None,
+        assignment: AssignmentVariables,
+        problem: CompiledProblem,
+        objective: int | None,
         max_solutions: int = 0,
+        options: SolverOptions | None = None,
     ):
         super().__init__()
-        self._assign_vars = assign_vars
-        self._employees = employees
-        self._shifts = shifts
-        self._objective_var = objective_var
+        self._assignment = assignment
+        self._assign_index = assignment.index.tolist()
+        self._problem = problem
+        self._objective = objective
         self._max_solutions = max_solutions
+        self._options = options or SolverOptions()
         self._solutions: list[tuple[Solution, int]] = []  # (solution, objective_value)
+        self._best_objective: int | None = None
+        self._lock = threading.Lock()
+        self._stall_timer: threading.Timer | None = None
+        self._solver: cp_model.CpSolver | None = None
+        self._searching = True
+        self.stop_reason: StopReason | None = None
+
+    def bind(self, solver: cp_model.CpSolver) -> None:
+        """Attach the solver so stop() can interrupt it from other threads."""
+        with self._lock:
+            self._solver = solver
 
     def on_solution_callback(self):
-        assignments: dict[ShiftId, EmployeeId] = {}
-        for (employee_id, shift_id), var in self._assign_vars.items():
-            if self.Value(var) == 1:
-                assignments[shift_id] = employee_id
+        value = self.SolutionBooleanValue
+        chosen = np.array([value(index) for index in self._assign_index], dtype=bool)
+        assigned = np.full(self._problem.num_shifts, UNASSIGNED, dtype=np.int32)
+        assigned[self._assignment.shift[chosen]] = self._assignment.employee[chosen]
 
         # compute_metrics calculates soft_preference_score as the count of satisfied
         # preferences, which is what we want to display. The internal objective value
         # includes weighted preferences and rest penalties for optimization purposes.
-        metrics = compute_metrics(assignments, self._employees, self._shifts)
-        solution = Solution(assignments=assignments, metrics=metrics)
+        metrics = compute_metrics(self._problem, assigned)
+        solution = Solution(assignments=self._problem.decode_assignments(assigned), metrics=metrics)
 
         # Store objective value for sorting (higher is better)
-        obj_value = self.Value(self._objective_var) if self._objective_var is not None else 0
+        obj_value = self.SolutionIntegerValue(self._objective) if self._objective is not None else 0
         self._solutions.append((solution, obj_value))
 
-        if self._max_solutions > 0 and len(self._solutions) >= self._max_solutions:
+        if self._best_objective is None or obj_value > self._best_objective:
+            self._best_objective = obj_value
+            self._restart_stall_timer()
+
+        if self.stop_reason is not None:
+            # A stop was requested before the search could be interrupted.
             self.StopSearch()
+        elif self._max_solutions > 0 and len(self._solutions) >= self._max_solutions:
+            self.stop("max_solutions")
+        elif self._options.stop_at_first_feasible:
+            self.stop("first_feasible")
+        elif self._objective is not None:
+            self._check_objective_rules(obj_value)
+
+    def _check_objective_rules(self, obj_value: int) -> None:
+        target = self._options.objective_target
+        if target is not None and obj_value >= target:
+            self.stop("objective_target")
+            return
+
+        gap_limit = self._options.relative_gap_limit
+        if gap_limit is not None:
+            bound = self.BestObjectiveBound()
+            gap = abs(bound - obj_value) / max(1.0, abs(obj_value))
+            if gap <= gap_limit:
+                self.stop("gap_limit")
+
+    def _restart_stall_timer(self) -> None:
+        if self._options.stall_timeout is None:
+            return
+        with self._lock:
+            if self._stall_timer is not None:
+                self._stall_timer.cancel()
+            if not self._searching:
+                return
+            self._stall_timer = threading.Timer(
+                self._options.stall_timeout, self.stop, args=("stall_timeout",)
+            )
+            self._stall_timer.daemon = True
+            self._stall_timer.start()
+
+    def stop(self, reason: StopReason) -> None:
+        """Ask the running search to stop, remembering the first reason given.
+
+        Safe to call from any thread and before the search has started; calls
+        after the search finished are ignored.
+        """
+        with self._lock:
+            if not self._searching:
+                return
+            if self.stop_reason is None:
+                self.stop_reason = reason
+            if self._solver is not None:
+                self._solver.StopSearch()
+
+    def finish(self) -> None:
+        """Mark the search as finished and cancel any pending stall timer."""
+        with self._lock:
+            self._searching = False
+            if self._stall_timer is not None:
+                self._stall_timer.cancel()
+                self._stall_timer = None
+
+    @property
+    def stopped(self) -> bool:
+        return self.stop_reason is not None
+
+    @property
+    def num_solutions(self) -> int:
+        return len(self._solutions)
 
     @property
     def solutions(self) -> list[Solution]:
@@ -57,126 +199,180 @@ class SolutionCollector(cp_model.CpSolverSolutionCallback):
 
 class Scheduler:
     def __init__(self, employees: list[Employee], shifts: list[Shift]):
-        self._validate_unique_ids(employees, shifts)
-        self._validate_shift_preferences(employees, shifts)
-        self.employees = employees
-        self.shifts = shifts
-
-    @staticmethod
-    def _validate_unique_ids(employees: list[Employee], shifts: list[Shift]) -> None:
-        """Ensure all employee and shift IDs are unique."""
-        employee_ids = [e.id for e in employees]
-        if len(employee_ids) != len(set(employee_ids)):
-            seen = set()
-            for eid in employee_ids:
-                if eid in seen:
-                    raise ValueError(f"Duplicate employee id: '{eid}'")
-                seen.add(eid)
-
-        shift_ids = [s.id for s in shifts]
-        if len(shift_ids) != len(set(shift_ids)):
-            seen = set()
-            for sid in shift_ids:
-                if sid in seen:
-                    raise ValueError(f"Duplicate shift id: '{sid}'")
-                seen.add(sid)
-
-    @staticmethod
-    def _validate_shift_preferences(
-        employees: list[Employee], shifts: list[Shift]
-    ) -> None:
-        """Ensure all PreferShiftPreference references existing shifts."""
-        shift_ids = {s.id for s in shifts}
-        for employee in employees:
-            for pref in employee.preferences:
-                if isinstance(pref, PreferShiftPreference) and pref.shift_id not in shift_ids:
-                    raise ValueError(
-                        f"Employee '{employee.id}' has preference for "
-                        f"shift_id '{pref.shift_id}' does not exist"
-                    )
+        self._setup(compile_problem(employees, shifts))
+
+    @classmethod
+    def from_problem(cls, problem: CompiledProblem) -> "Scheduler":
+        """Create a scheduler for an already compiled and validated problem."""
+        scheduler = cls.__new__(cls)
+        scheduler._setup(problem)
+        return scheduler
+
+    def _setup(self, problem: CompiledProblem) -> None:
+        self.problem = problem
+        self._cancel_lock = threading.Lock()
+        self._cancel_reason: StopReason | None = None
+        self._collector: SolutionCollector | None = None
+        self._pairs: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray] | None = None
+
+    def cancel(self, reason: StopReason = "cancelled") -> None:
+        """Stop the running (or next) solve, keeping the solutions found so far.
+
+        Safe to call from another thread while solve() is running. Solves after
+        the one it stopped run normally.
+        """
+        with self._cancel_lock:
+            if self._cancel_reason is None:
+                self._cancel_reason = reason
+            collector = self._collector
+        if collector is not None:
+            collector.stop(self._cancel_reason)
+
+    def _shift_pairs(
+        self, active: np.ndarray | None = None, fixed: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Overlapping pairs and short-rest pairs of shift indices, from one sorted sweep.
+
+        Returns (overlap_i, overlap_j, rest_i, rest_j). Short-rest pairs are
+        ordered (earlier, later) and have less than REST_THRESHOLD between the
+        end of one and the start of the other. Pairs further apart than that
+        are never visited. The sweep runs once per scheduler; with `active`,
+        only pairs of two active shifts are returned, and with `fixed`, pairs
+        of two fixed shifts are left out.
+        """
+        if self._pairs is None:
+            self._pairs = self.problem.shift_pairs(REST_THRESHOLD_SECONDS)
+        if active is None and fixed is None:
+            return self._pairs
+        everything = np.ones(self.problem.num_shifts, dtype=bool)
+        keep = everything if active is None else active
+        free = everything if fixed is None else fixed == UNASSIGNED
+        overlap_i, overlap_j, rest_i, rest_j = self._pairs
+        overlap = keep[overlap_i] & keep[overlap_j] & (free[overlap_i] | free[overlap_j])
+        rest = keep[rest_i] & keep[rest_j] & (free[rest_i] | free[rest_j])
+        return overlap_i[overlap], overlap_j[overlap], rest_i[rest], rest_j[rest]
+
+    def _shifts(self, active: np.ndarray | None) -> list[int]:
+        """Indices of the active shifts, or of every shift."""
+        if active is None:
+            return list(range(self.problem.num_shifts))
+        return np.flatnonzero(active).tolist()
 
     @staticmethod
-    def _shifts_overlap(shift1: Shift, shift2: Shift) -> bool:
-        """Check if two shifts overlap in time."""
-        return shift1.start_time < shift2.end_time and shift2.start_time < shift1.end_time
+    def _employees_by_shift(
+        assign_vars: dict[tuple[int, int], cp_model.IntVar], num_shifts: int
+    ) -> list[list[int]]:
+        """Group the employees that have an assignment variable by shift."""
+        qualified: list[list[int]] = [[] for _ in range(num_shifts)]
+        for employee, shift in assign_vars:
+            qualified[shift].append(employee)
+        return qualified
 
     def _create_assignment_variables(
-        self, model: cp_model.CpModel
-    ) -> dict[tuple[EmployeeId, ShiftId], cp_model.IntVar]:
+        self,
+        model: cp_model.CpModel,
+        active: np.ndarray | None = None,
+        fixed: np.ndarray | None = None,
+    ) -> dict[tuple[int, int], cp_model.IntVar]:
         """Create boolean variables for each valid employee-shift assignment.
 
-        Only creates variables for employees who have the required abilities for a shift.
+        Only creates variables for employees who have the required abilities for
+        a shift. Keys are (employee index, shift index) into self.problem. A
+        shift fixed to an employee gets a constant 1 for that employee only.
         """
-        assign_vars: dict[tuple[EmployeeId, ShiftId], cp_model.IntVar] = {}
+        assign_vars: dict[tuple[int, int], cp_model.IntVar] = {}
+        owners = fixed.tolist() if fixed is not None else None
 
-        for employee in self.employees:
-            for shift in self.shifts:
-                if employee.has_abilities(shift.required_abilities):
-                    var = model.NewBoolVar(f"assign_{employee.id}_{shift.id}")
-                    assign_vars[(employee.id, shift.id)] = var
+        for shift in self._shifts(active):
+            owner = owners[shift] if owners is not None else UNASSIGNED
+            if owner != UNASSIGNED:
+                assign_vars[(owner, shift)] = model.NewConstant(1)
+                continue
+            for employee in self.problem.qualified[shift]:
+                assign_vars[(employee, shift)] = model.NewBoolVar(f"assign_{employee}_{shift}")
 
         return assign_vars
 
     def _add_exactly_one_employee_per_shift_constraint(
         self,
         model: cp_model.CpModel,
-        assign_vars: dict[tuple[EmployeeId, ShiftId], cp_model.IntVar],
+        assign_vars: dict[tuple[int, int], cp_model.IntVar],
+        coverage_literals: list[cp_model.IntVar] | None = None,
+        active: np.ndarray | None = None,
     ) -> None:
-        """Ensure each shift is assigned to exactly one employee.
+        """Ensure each (active) shift is assigned to exactly one employee.
 
         If no qualified employees exist for a shift, the model becomes infeasible.
+        With `coverage_literals`, each shift's constraint only applies while its
+        literal is true.
         """
-        for shift in self.shifts:
-            shift_vars = [
-                assign_vars[(e.id, shift.id)]
-                for e in self.employees
-                if (e.id, shift.id) in assign_vars
-            ]
-            if shift_vars:
-                model.Add(sum(shift_vars) == 1)
-            else:
-                model.Add(0 == 1)
+        qualified = self._employees_by_shift(assign_vars, self.problem.num_shifts)
+        for shift in self._shifts(active):
+            shift_vars = [assign_vars[(e, shift)] for e in qualified[shift]]
+            ct = model.Add(sum(shift_vars) == 1) if shift_vars else model.Add(0 == 1)
+            if coverage_literals is not None:
+                ct.OnlyEnforceIf(coverage_literals[shift])
 
     def _add_no_overlapping_shifts_constraint(
         self,
         model: cp_model.CpModel,
-        assign_vars: dict[tuple[EmployeeId, ShiftId], cp_model.IntVar],
+        assign_vars: dict[tuple[int, int], cp_model.IntVar],
+        active: np.ndarray | None = None,
+        fixed: np.ndarray | None = None,
     ) -> None:
         """Prevent employees from being assigned to overlapping shifts.
 
         An employee can work at most one shift during any overlapping time period.
         """
-        for employee in self.employees:
-            for i, shift1 in enumerate(self.shifts):
-                for shift2 in self.shifts[i + 1 :]:
-                    if self._shifts_overlap(shift1, shift2):
-                        var1 = assign_vars.get((employee.id, shift1.id))
-                        var2 = assign_vars.get((employee.id, shift2.id))
-                        if var1 is not None and var2 is not None:
-                            model.Add(var1 + var2 <= 1)
+        first, second, _, _ = self._shift_pairs(active, fixed)
+        qualified = self._employees_by_shift(assign_vars, self.problem.num_shifts)
+        for shift1, shift2 in zip(first.tolist(), second.tolist(), strict=True):
+            for employee in qualified[shift1]:
+                var2 = assign_vars.get((employee, shift2))
+                if var2 is not None:
+                    model.Add(assign_vars[(employee, shift1)] + var2 <= 1)
 
     def _collect_preference_indicators(
         self,
         model: cp_model.CpModel,
-        assign_vars: dict[tuple[EmployeeId, ShiftId], cp_model.IntVar],
+        assign_vars: dict[tuple[int, int], cp_model.IntVar],
+        preference_literals: dict[int, cp_model.IntVar] | None = None,
+        active: np.ndarray | None = None,
     ) -> list[cp_model.IntVar]:
         """Collect soft preference indicator variables.
 
         Returns list of boolean variables that are 1 when a preference is satisfied.
+        `preference_literals` maps a preference row of self.problem to the
+        literal enforcing that hard preference. With `active`, only the rows of
+        employees that have a variable are visited.
         """
         soft_indicators: list[cp_model.IntVar] = []
-
-        for employee in self.employees:
-            for pref in employee.preferences:
-                indicators = apply_preference(pref, employee, self.shifts, assign_vars, model)
-                soft_indicators.extend(indicators)
+        preference_literals = preference_literals or {}
+
+        rows: Iterable[int] = range(self.problem.num_preferences)
+        if active is not None:
+            has_vars = np.zeros(self.problem.num_employees, dtype=bool)
+            has_vars[[employee for employee, _ in assign_vars]] = True
+            rows = np.flatnonzero(has_vars[self.problem.pref_employee]).tolist()
+
+        for index in rows:
+            indicators = apply_preference(
+                self.problem,
+                index,
+                assign_vars,
+                model,
+                enforce=preference_literals.get(index),
+            )
+            soft_indicators.extend(indicators)
 
         return soft_indicators
 
     def _collect_rest_penalties(
         self,
         model: cp_model.CpModel,
-        assign_vars: dict[tuple[EmployeeId, ShiftId], cp_model.IntVar],
+        assign_vars: dict[tuple[int, int], cp_model.IntVar],
+        active: np.ndarray | None = None,
+        fixed: np.ndarray | None = None,
     ) -> list[tuple[cp_model.IntVar, int]]:
         """Create penalty indicators for short rest between consecutive shifts.
 
@@ -188,47 +384,39 @@ class Scheduler:
         shifts that are close together (e.g., late night shift ending at 2am
         followed by morning shift at 10am).
         """
-        REST_THRESHOLD_HOURS = 12
         penalties: list[tuple[cp_model.IntVar, int]] = []
 
-        # Sort shifts by end time to efficiently find consecutive pairs
-        sorted_shifts = sorted(self.shifts, key=lambda s: s.end_time)
-
-        for employee in self.employees:
-            for i, shift1 in enumerate(sorted_shifts):
-                for shift2 in sorted_shifts[i + 1 :]:
-                    # Skip if shifts overlap (already handled by hard constraint)
-                    if self._shifts_overlap(shift1, shift2):
-                        continue
-
-                    key1 = (employee.id, shift1.id)
-                    key2 = (employee.id, shift2.id)
-                    if key1 not in assign_vars or key2 not in assign_vars:
-                        continue
-
-                    # Calculate rest hours between shifts
-                    rest_seconds = (shift2.start_time - shift1.end_time).total_seconds()
-                    rest_hours = rest_seconds / 3600
-
-                    if rest_hours >= REST_THRESHOLD_HOURS:
-                        continue  # Enough rest, no penalty needed
-
-                    # Create indicator: 1 if employee works BOTH shifts
-                    both = model.NewBoolVar(f"both_{employee.id}_{shift1.id}_{shift2.id}")
-                    # both = assign_vars[key1] AND assign_vars[key2]
-                    model.AddMultiplicationEquality(both, [assign_vars[key1], assign_vars[key2]])
-
-                    # Penalty proportional to how short the rest is
-                    # Scale to integers (0-1200 range for 0-12 hours)
-                    penalty = int((REST_THRESHOLD_HOURS - rest_hours) * 100)
-                    penalties.append((both, penalty))
+        # Overlapping pairs are skipped (already handled by hard constraint)
+        _, _, first, second = self._shift_pairs(active, fixed)
+        rests = self.problem.shift_start[second] - self.problem.shift_end[first]
+        qualified = self._employees_by_shift(assign_vars, self.problem.num_shifts)
+
+        for shift1, shift2, rest in zip(
+            first.tolist(), second.tolist(), rests.tolist(), strict=True
+        ):
+            penalty = rest_penalty_seconds(rest)
+            for employee in qualified[shift1]:
+                key1 = (employee, shift1)
+                key2 = (employee, shift2)
+                if key2 not in assign_vars:
+                    continue
+
+                # Create indicator: 1 if employee works BOTH shifts
+                both = model.NewBoolVar(f"both_{employee}_{shift1}_{shift2}")
+                # both = assign_vars[key1] AND assign_vars[key2]
+                model.AddMultiplicationEquality(both, [assign_vars[key1], assign_vars[key2]])
+
+                # Penalty proportional to how short the rest is
+                penalties.append((both, penalty))
 
         return penalties
 
     def _build_objective(
         self,
         model: cp_model.CpModel,
-        assign_vars: dict[tuple[EmployeeId, ShiftId], cp_model.IntVar],
+        assign_vars: dict[tuple[int, int], cp_model.IntVar],
+        active: np.ndarray | None = None,
+        fixed: np.ndarray | None = None,
     ) -> cp_model.IntVar | None:
         """Build combined objective from preferences and rest optimization.
 
@@ -236,10 +424,8 @@ class Scheduler:
         take priority over rest optimization. Rest penalties are subtracted
         to encourage longer rest periods when multiple valid assignments exist.
         """
-        PREFERENCE_WEIGHT = 1000
-
-        pref_indicators = self._collect_preference_indicators(model, assign_vars)
-        rest_penalties = self._collect_rest_penalties(model, assign_vars)
+        pref_indicators = self._collect_preference_indicators(model, assign_vars, active=active)
+        rest_penalties = self._collect_rest_penalties(model, assign_vars, active, fixed)
 
         if not pref_indicators and not rest_penalties:
             return None
@@ -267,25 +453,331 @@ class Scheduler:
 
         return objective_var
 
-    def solve(self, max_solutions: int = 100) -> list[Solution]:
-        model = cp_model.CpModel()
+    def build_model(
+        self,
+        model: cp_model.CpModel,
+        active: np.ndarray | None = None,
+        fixed: np.ndarray | None = None,
+    ) -> tuple[dict[tuple[int, int], cp_model.IntVar], cp_model.IntVar | None]:
+        """Add variables, hard constraints and the objective to `model`.
+
+        Returns the assignment variables, keyed by (employee index, shift
+        index), and the objective variable (None when there is nothing to
+        optimize). `active`, a boolean mask over shift indices, restricts the
+        model to those shifts: constraints and objective terms involving any
+        other shift are left out. `fixed` gives an employee index per shift
+        (UNASSIGNED for none); a fixed shift keeps that employee as a
+        constant, so its terms with decided shifts are kept without a
+        decision. Overlap and rest terms between two fixed shifts are
+        constant and left out, so the objective then differs from the full
+        problem's by a constant.
+        """
+        assign_vars = self._create_assignment_variables(model, active, fixed)
+
+        self._add_exactly_one_employee_per_shift_constraint(model, assign_vars, active=active)
+        self._add_no_overlapping_shifts_constraint(model, assign_vars, active, fixed)
+        objective_var = self._build_objective(model, assign_vars, active, fixed)
+
+        return assign_vars, objective_var
 
+    def _add_hint(
+        self,
+        model: cp_model.CpModel,
+        variables: AssignmentVariables,
+        assignment: np.ndarray,
+    ) -> None:
+        """Hint an employee index per shift to the solver; UNASSIGNED shifts get no hint."""
+        hint = assignment[variables.shift]
+        hinted = hint != UNASSIGNED
+        model.proto.solution_hint.vars.extend(variables.index[hinted].tolist())
+        model.proto.solution_hint.values.extend(
+            (hint[hinted] == variables.employee[hinted]).astype(np.int64).tolist()
+        )
+
+    def _use_bulk_build(self, options: SolverOptions) -> bool:
+        variables = sum(len(employees) for employees in self.problem.qualified)
+        return options.builds_in_bulk(variables)
+
+    def explain_infeasibility(self, time_limit: float = EXPLAIN_TIME_LIMIT) -> list[Conflict]:
+        """Find a minimal set of hard constraints that cannot hold together.
+
+        Every shift's coverage constraint and every hard preference is put
+        behind its own enforcement literal and solved under the assumption that
+        all of them hold. CP-SAT returns a sufficient subset of the assumptions
+        for infeasibility, which is then shrunk by dropping one literal at a time
+        while the rest stays infeasible. Ability and overlap rules are structural
+        and always enforced. Returns an empty list when the problem is feasible
+        or the time limit runs out before infeasibility is proven.
+        """
+        deadline = time.monotonic() + time_limit
+        model = cp_model.CpModel()
         assign_vars = self._create_assignment_variables(model)
 
-        self._add_exactly_one_employee_per_shift_constraint(model, assign_vars)
+        problem = self.problem
+        conflicts: dict[int, Conflict] = {}
+        coverage_literals: list[cp_model.IntVar] = []
+        for shift, shift_id in enumerate(problem.shift_ids):
+            literal = model.NewBoolVar(f"cover_{shift}")
+            coverage_literals.append(literal)
+            conflicts[literal.Index()] = Conflict(kind="coverage", shift_id=shift_id)
+
+        preference_literals: dict[int, cp_model.IntVar] = {}
+        for index in np.flatnonzero(problem.pref_hard).tolist():
+            literal = model.NewBoolVar(f"hard_{index}")
+            preference_literals[index] = literal
+            shift = int(problem.pref_shift[index])
+            conflicts[literal.Index()] = Conflict(
+                kind="preference",
+                employee_id=problem.employee_ids[problem.pref_employee[index]],
+                preference_index=int(problem.pref_position[index]),
+                preference_type=PREFERENCE_TYPES[problem.pref_kind[index]],
+                shift_id=problem.shift_ids[shift] if shift != UNASSIGNED else None,
+            )
+
+        self._add_exactly_one_employee_per_shift_constraint(model, assign_vars, coverage_literals)
         self._add_no_overlapping_shifts_constraint(model, assign_vars)
-        objective_var = self._build_objective(model, assign_vars)
+        self._collect_preference_indicators(model, assign_vars, preference_literals)
+
+        literals = [*coverage_literals, *preference_literals.values()]
+        core = self._infeasible_core(model, literals, deadline)
+        if core is None:
+            return []
+
+        # Deletion-based minimization: a literal stays only if the others are
+        # feasible without it.
+        index = 0
+        while index < len(core) and time.monotonic() < deadline:
+            candidate = core[:index] + core[index + 1 :]
+            smaller = self._infeasible_core(model, candidate, deadline)
+            if smaller is None:
+                index += 1
+            else:
+                core = smaller
+                index = min(index, len(core))
+
+        return [conflicts[literal.Index()] for literal in core]
 
+    @staticmethod
+    def _infeasible_core(
+        model: cp_model.CpModel, literals: list[cp_model.IntVar], deadline: float
+    ) -> list[cp_model.IntVar] | None:
+        """Solve assuming `literals`; return a sufficient infeasible subset, or None."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        model.ClearAssumptions()
+        model.AddAssumptions(literals)
         solver = cp_model.CpSolver()
-        solver.parameters.enumerate_all_solutions = True
-        solver.parameters.max_time_in_seconds = 60.0
+        solver.parameters.max_time_in_seconds = remaining
+        # Assumption cores are only reported by the single-threaded search.
+        solver.parameters.num_workers = 1
+        if solver.Solve(model) != cp_model.INFEASIBLE:
+            return None
+        by_index = {literal.Index(): literal for literal in literals}
+        return [by_index[i] for i in solver.SufficientAssumptionsForInfeasibility()]
 
-        collector = SolutionCollector(
-            assign_vars, self.employees, self.shifts, objective_var, max_solutions
-        )
+    def greedy_solution(self) -> Solution | None:
+        """Build a schedule instantly with the greedy heuristic, without solving.
 
-        status = solver.Solve(model, collector)
+        Returns None when the heuristic cannot cover every shift within the hard constraints.
+        """
+        return greedy_solve(self.problem)
+
+    def solve(
+        self, max_solutions: int = 100, options: SolverOptions | None = None
+    ) -> list[Solution]:
+        return self.solve_with_stats(max_solutions, options).solutions
+
+    def solve_with_stats(
+        self,
+        max_solutions: int = 100,
+        options: SolverOptions | None = None,
+        hint: np.ndarray | None = None,
+    ) -> SolveResult:
+        """Solve the model and report how the search ended alongside the solutions.
+
+        With `options.precheck`, a problem the feasibility pre-check proves
+        infeasible is reported without building or solving a model, and so
+        without writing `options.dump_path`. With
+        `options.explain_infeasibility`, an infeasible result also carries a
+        minimal set of conflicting constraints. The seconds spent in each
+        phase are reported in `stats.phase_times`. With
+        `options.trace_threshold`, a solve that took at least that long also
+        returns its search log and model statistics in `trace`. `hint` gives
+        an employee index per shift (UNASSIGNED for none) to start the search
+        from; with `options.greedy_hint`, the greedy schedule fills its gaps.
+        A cancel() applies to this solve only, however it ends.
+        """
+        try:
+            return self._solve_with_stats(max_solutions, options, hint)
+        finally:
+            with self._cancel_lock:
+                self._cancel_reason = None
+
+    def _solve_with_stats(
+        self, max_solutions: int, options: SolverOptions | None, hint: np.ndarray | None
+    ) -> SolveResult:
+        options = options or SolverOptions()
+        phases: dict[str, float] = {}
+        phase_started = time.perf_counter()
+
+        def end_phase(name: str) -> None:
+            nonlocal phase_started
+            now = time.perf_counter()
+            phases[name] = now - phase_started
+            phase_started = now
+
+        if options.precheck:
+            report = check_problem_feasibility(self.problem)
+            end_phase("precheck")
+            if not report.feasible:
+                conflicts = self.explain_infeasibility() if options.explain_infeasibility else []
+                if options.explain_infeasibility:
+                    end_phase("explain")
+                return SolveResult(
+                    stats=SolveStats(
+                        status="infeasible", wall_time=phases["precheck"], phase_times=phases
+                    ),
+                    feasibility=report,
+                    conflicts=conflicts,
+                )
+
+        model = cp_model.CpModel()
+
+        if self._use_bulk_build(options):
+            # Names only help someone reading a dumped model.
+            variables, objective = build_bulk_model(
+                self.problem, model, names=options.dump_path is not None
+            )
+        else:
+            assign_vars, objective_var = self.build_model(model)
+            variables = AssignmentVariables.from_vars(assign_vars)
+            objective = objective_var.Index() if objective_var is not None else None
+        end_phase("build")
+        assignment = greedy_assign(self.problem) if options.greedy_hint else None
+        if hint is not None:
+            assignment = (
+                hint if assignment is None else np.where(hint != UNASSIGNED, hint, assignment)
+            )
+        if assignment is not None:
+            self._add_hint(model, variables, assignment)
+            end_phase("hint")
+
+        solver = cp_model.CpSolver()
+        solver.parameters.enumerate_all_solutions = True
+        solver.parameters.max_time_in_seconds = options.max_time_in_seconds
+        if options.relative_gap_limit is not None:
+            solver.parameters.relative_gap_limit = options.relative_gap_limit
+        if options.num_workers is not None:
+            solver.parameters.num_workers = options.num_workers
+        if options.max_memory_mb is not None:
+            solver.parameters.max_memory_in_mb = options.max_memory_mb
+        if options.dump_path is not None:
+            export_model(
+                options.dump_path,
+                model,
+                str(solver.parameters),
+                self.problem,
+                variables,
+                max_solutions,
+            )
+            end_phase("dump")
+        search_log = None
+        if options.trace_threshold is not None:
+            search_log = SearchLog()
+            solver.parameters.log_search_progress = True
+            solver.parameters.log_to_stdout = False
+            solver.log_callback = search_log.append
+
+        collector = SolutionCollector(variables, self.problem, objective, max_solutions, options)
+        collector.bind(solver)
+        with self._cancel_lock:
+            self._collector = collector
+            if self._cancel_reason is not None:
+                collector.stop(self._cancel_reason)
+        if collector.stopped:
+            solver.parameters.max_time_in_seconds = 0.0
+
+        try:
+            status = solver.Solve(model, collector)
+        finally:
+            collector.finish()
+            with self._cancel_lock:
+                self._collector = None
+        end_phase("solve")
+        stats = self._build_stats(
+            solver, status, collector, options, has_objective=objective is not None
+        )
+        trace = None
+        if search_log is not None and sum(phases.values()) >= options.trace_threshold:
+            trace = SolveTrace(
+                parameters=str(solver.parameters),
+                model_stats=model.ModelStats(),
+                search_log=search_log.lines,
+                search_log_dropped=search_log.dropped,
+            )
 
         if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            return collector.solutions
-        return []
+            return SolveResult(
+                solutions=collector.solutions,
+                stats=stats.model_copy(update={"phase_times": phases}),
+                trace=trace,
+            )
+        conflicts = []
+        if status == cp_model.INFEASIBLE and options.explain_infeasibility:
+            conflicts = self.explain_infeasibility()
+            end_phase("explain")
+        return SolveResult(
+            stats=stats.model_copy(update={"phase_times": phases}),
+            conflicts=conflicts,
+            trace=trace,
+        )
+
+    @staticmethod
+    def _build_stats(
+        solver: cp_model.CpSolver,
+        status: int,
+        collector: SolutionCollector,
+        options: SolverOptions,
+        has_objective: bool,
+    ) -> SolveStats:
+        """Translate the solver's final state into a SolveStats summary.
+
+        The time limit counts as hit when the search ended without proving
+        optimality or infeasibility and the collector did not stop it itself.
+        CP-SAT reports a search ended by its own relative_gap_limit as optimal,
+        so a non-zero gap on an optimal status is attributed to the gap limit.
+        """
+        found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        objective_value = None
+        best_bound = None
+        gap = None
+        if has_objective and found:
+            objective_value = solver.ObjectiveValue()
+            best_bound = solver.BestObjectiveBound()
+            gap = abs(best_bound - objective_value) / max(1.0, abs(objective_value))
+
+        stop_reason = collector.stop_reason
+        if (
+            stop_reason is None
+            and status == cp_model.OPTIMAL
+            and options.relative_gap_limit is not None
+            and gap
+        ):
+            stop_reason = "gap_limit"
+
+        return SolveStats(
+            status=_STATUS_NAMES.get(status, "unknown"),
+            objective_value=objective_value,
+            best_objective_bound=best_bound,
+            gap=gap,
+            wall_time=solver.WallTime(),
+            user_time=solver.UserTime(),
+            num_conflicts=solver.NumConflicts(),
+            num_branches=solver.NumBranches(),
+            num_solutions=collector.num_solutions,
+            stop_reason=stop_reason,
+            hit_time_limit=(
+                status in (cp_model.FEASIBLE, cp_model.UNKNOWN) and not collector.stopped
+            ),
+        )
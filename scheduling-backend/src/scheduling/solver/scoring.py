@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+import numpy as np
+
+from scheduling.solver.problem import (
+    PREFER_PERIOD,
+    PREFER_SHIFT,
+    UNASSIGNED,
+    UNAVAILABLE_PERIOD,
+    CompiledProblem,
+)
+
+# Each satisfied soft preference is worth more than any amount of rest penalty,
+# so rest only breaks ties between equally preferred schedules.
+PREFERENCE_WEIGHT = 1000
+REST_THRESHOLD_HOURS = 12
+REST_THRESHOLD = timedelta(hours=REST_THRESHOLD_HOURS)
+REST_THRESHOLD_SECONDS = REST_THRESHOLD_HOURS * 3600
+
+
+def rest_penalty_seconds(rest: float) -> int:
+    """Penalty for one employee working two shifts `rest` seconds apart.
+
+    Proportional to how far the rest falls short of REST_THRESHOLD_HOURS,
+    scaled to integers (0-1200 for 0-12 hours). Returns 0 when there is enough
+    rest. The shifts must not overlap.
+    """
+    rest_hours = rest / 3600
+    if rest_hours >= REST_THRESHOLD_HOURS:
+        return 0
+    return int((REST_THRESHOLD_HOURS - rest_hours) * 100)
+
+
+def objective_value(problem: CompiledProblem, assigned: np.ndarray) -> int:
+    """Evaluate the solver's objective for a complete assignment, without a model.
+
+    `assigned` holds the employee index per shift index (see encode_assignments),
+    and nobody may work two overlapping shifts.
+    Mirrors Scheduler._build_objective and the preference handlers, including
+    their edge cases: a soft unavailability only counts when the employee is
+    qualified for a shift overlapping it.
+    """
+    satisfied = 0
+    for row in np.flatnonzero(~problem.pref_hard).tolist():
+        employee = int(problem.pref_employee[row])
+        kind = problem.pref_kind[row]
+        if kind == PREFER_SHIFT:
+            shift = int(problem.pref_shift[row])
+            satisfied += bool(shift != UNASSIGNED and assigned[shift] == employee)
+            continue
+        overlapping = problem.shifts_overlapping(
+            int(problem.pref_start[row]), int(problem.pref_end[row])
+        )
+        works = bool((assigned[overlapping] == employee).any())
+        if kind == PREFER_PERIOD:
+            satisfied += works
+        elif kind == UNAVAILABLE_PERIOD and not works:
+            satisfied += any(problem.is_qualified(employee, s) for s in overlapping.tolist())
+
+    _, _, first, second = problem.shift_pairs(REST_THRESHOLD_SECONDS)
+    both = (assigned[first] == assigned[second]) & (assigned[first] != UNASSIGNED)
+    rests = (problem.shift_start[second[both]] - problem.shift_end[first[both]]).tolist()
+    penalty = sum(map(rest_penalty_seconds, rests))
+
+    return satisfied * PREFERENCE_WEIGHT - penalty
@@ -0,0 +1,134 @@
+"""Warm starts from similar past schedules.
+
+Recurring rosters differ little from week to week, but their shift ids and
+dates all change. A solved schedule is therefore kept as a PastSchedule of
+slots (weekday, local start time, duration and required abilities) and
+employee ids. For a new problem, `similarity` scores a past schedule by the
+overlap of the two rosters and of the two multisets of slots, and
+`map_schedule` carries the past assignment over: each new shift takes the
+employee of an unused past shift in the same slot, or failing that, the
+same weekday and abilities. Employees no longer on the roster or no longer
+qualified are skipped, so the result is a partial hint for the solver, not
+a schedule.
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+
+from scheduling.models.history import PastSchedule
+from scheduling.models.solution import Solution
+from scheduling.solver.problem import UNASSIGNED, CompiledProblem
+
+SECONDS_PER_DAY = 86400
+# 1970-01-01, day 0 of the epoch, was a Thursday.
+EPOCH_WEEKDAY = 3
+
+
+@dataclass(frozen=True)
+class WarmStart:
+    """A hint mapped from a past schedule, and how well that schedule matched."""
+
+    hint: np.ndarray
+    similarity: float
+    hinted_shifts: int
+
+
+def shift_slots(problem: CompiledProblem) -> list[str]:
+    """The slot of every shift, by shift index; see PastSchedule."""
+    start = problem.shift_start
+    if problem.tz is not None:
+        offsets = [
+            problem.to_datetime(seconds).utcoffset().total_seconds() for seconds in start.tolist()
+        ]
+        start = start + np.array(offsets, dtype=np.int64)
+    weekday = (start // SECONDS_PER_DAY + EPOCH_WEEKDAY) % 7
+    time_of_day = start % SECONDS_PER_DAY
+    duration = problem.shift_end - problem.shift_start
+    names: dict[int, str] = {}
+    for mask in set(problem.shift_requirements):
+        names[mask] = ",".join(
+            sorted(name for bit, name in enumerate(problem.abilities) if mask >> bit & 1)
+        )
+    return [
+        f"{day} {seconds} {length} {names[mask]}"
+        for day, seconds, length, mask in zip(
+            weekday.tolist(),
+            time_of_day.tolist(),
+            duration.tolist(),
+            problem.shift_requirements,
+            strict=True,
+        )
+    ]
+
+
+def past_schedule(
+    problem: CompiledProblem, solution: Solution, slots: list[str] | None = None
+) -> PastSchedule:
+    """Reduce a solution of `problem` to a PastSchedule."""
+    slots = slots if slots is not None else shift_slots(problem)
+    return PastSchedule(
+        employees=list(problem.employee_ids),
+        slots=slots,
+        assignments=[solution.assignments[shift_id] for shift_id in problem.shift_ids],
+    )
+
+
+def similarity(past: PastSchedule, problem: CompiledProblem, slots: list[str]) -> float:
+    """Between 0 and 1: the mean of the roster and slot overlap (Jaccard) of the two."""
+    roster_old, roster_new = set(past.employees), set(problem.employee_ids)
+    roster = len(roster_old & roster_new) / max(len(roster_old | roster_new), 1)
+    slots_old, slots_new = Counter(past.slots), Counter(slots)
+    pattern = sum((slots_old & slots_new).values()) / max(sum((slots_old | slots_new).values()), 1)
+    return (roster + pattern) / 2
+
+
+def _loose(slot: str) -> str:
+    """Weekday and abilities of a slot, without its times."""
+    weekday, _, _, abilities = slot.split(" ", 3)
+    return f"{weekday} {abilities}"
+
+
+def map_schedule(past: PastSchedule, problem: CompiledProblem, slots: list[str]) -> np.ndarray:
+    """The past assignment carried over to `problem`, as an employee index per shift.
+
+    Shifts without a matching past shift, or whose past employee cannot
+    work them now, are UNASSIGNED.
+    """
+    exact: dict[str, list[str]] = defaultdict(list)
+    loose: dict[str, list[str]] = defaultdict(list)
+    # Reversed so that pop() hands out past shifts in their original order.
+    for slot, employee in zip(reversed(past.slots), reversed(past.assignments), strict=True):
+        exact[slot].append(employee)
+    matched: list[str | None] = [exact[slot].pop() if exact[slot] else None for slot in slots]
+    for slot, employees in exact.items():
+        loose[_loose(slot)].extend(employees)
+
+    hint = np.full(problem.num_shifts, UNASSIGNED, dtype=np.int64)
+    for shift, (slot, employee_id) in enumerate(zip(slots, matched, strict=True)):
+        if employee_id is None:
+            candidates = loose[_loose(slot)]
+            employee_id = candidates.pop() if candidates else None
+        employee = problem.employee_index.get(employee_id) if employee_id is not None else None
+        if employee is not None and problem.is_qualified(employee, shift):
+            hint[shift] = employee
+    return hint
+
+
+def best_warm_start(
+    candidates: list[PastSchedule], problem: CompiledProblem, min_similarity: float
+) -> WarmStart | None:
+    """A hint from the candidate most similar to `problem`, if it is similar enough."""
+    if not candidates:
+        return None
+    slots = shift_slots(problem)
+    score, past = max(
+        ((similarity(past, problem, slots), past) for past in candidates), key=lambda c: c[0]
+    )
+    if score < min_similarity:
+        return None
+    hint = map_schedule(past, problem, slots)
+    return WarmStart(
+        hint=hint, similarity=score, hinted_shifts=int(np.count_nonzero(hint != UNASSIGNED))
+    )
@@ -0,0 +1,102 @@
+"""Shared test data factories."""
+
+import random
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+from scheduling.models.employee import Employee
+from scheduling.models.feasibility import FeasibilityReport
+from scheduling.models.preferences.prefer_period import PreferPeriodPreference
+from scheduling.models.preferences.prefer_shift import PreferShiftPreference
+from scheduling.models.preferences.unavailable import UnavailablePeriodPreference
+from scheduling.models.shift import Shift
+from scheduling.models.solution import Solution
+from scheduling.solver.feasibility import check_problem_feasibility
+from scheduling.solver.greedy import greedy_assign, greedy_solve
+from scheduling.solver.problem import compile_problem
+from scheduling.types import EmployeeId, ShiftId
+
+ABILITIES = ["waiter", "bartender"]
+
+
+def make_shift(
+    shift_id: str,
+    start_hour: int,
+    end_hour: int,
+    abilities=("waiter",),
+    day: int = 25,
+) -> Shift:
+    """A shift on `day` December 2024, named after its id."""
+    return Shift(
+        id=shift_id,
+        name=shift_id,
+        start_time=datetime(2024, 12, day, start_hour, 0),
+        end_time=datetime(2024, 12, day, end_hour, 0),
+        required_abilities=list(abilities),
+    )
+
+
+def make_roster(
+    seed: int,
+    num_employees: int = 4,
+    num_shifts: int = 6,
+    start_hours: Sequence[int] = (0, 4, 6, 10, 16, 22, 28),
+) -> tuple[list[Employee], list[Shift]]:
+    """Overlapping and closely spaced shifts, with soft and hard preferences of every kind.
+
+    Shifts start at one of `start_hours` after 2 December 2024 and last 4 or 6 hours.
+    """
+    rng = random.Random(seed)
+    base = datetime(2024, 12, 2)
+    shifts = []
+    for k in range(num_shifts):
+        start = base + timedelta(hours=rng.choice(start_hours))
+        shifts.append(
+            Shift(
+                id=f"s{k}",
+                name=f"Shift {k}",
+                start_time=start,
+                end_time=start + timedelta(hours=rng.choice([4, 6])),
+                required_abilities=[rng.choice(ABILITIES)],
+            )
+        )
+    employees = []
+    for i in range(num_employees):
+        hour = base + timedelta(hours=rng.choice([0, 6, 12]))
+        preferences = [
+            PreferShiftPreference(shift_id=rng.choice(shifts).id, is_hard=rng.random() < 0.2),
+            PreferShiftPreference(shift_id=rng.choice(shifts).id),
+            PreferPeriodPreference(
+                start=hour, end=hour + timedelta(hours=8), is_hard=rng.random() < 0.2
+            ),
+            UnavailablePeriodPreference(
+                start=hour + timedelta(hours=12),
+                end=hour + timedelta(hours=18),
+                is_hard=rng.random() < 0.3,
+            ),
+        ]
+        employees.append(
+            Employee(
+                id=f"e{i}",
+                name=f"Employee {i}",
+                abilities=rng.sample(ABILITIES, rng.choice([1, 2, 2])),
+                preferences=preferences,
+            )
+        )
+    return employees, shifts
+
+
+def greedy_assignments(employees: list[Employee], shifts: list[Shift]) -> dict[ShiftId, EmployeeId]:
+    """greedy_assign for domain models, as a shift id to employee id mapping."""
+    problem = compile_problem(employees, shifts, validate=False)
+    return problem.decode_assignments(greedy_assign(problem))
+
+
+def greedy_solution(employees: list[Employee], shifts: list[Shift]) -> Solution | None:
+    """greedy_solve for domain models."""
+    return greedy_solve(compile_problem(employees, shifts, validate=False))
+
+
+def check_feasibility(employees: list[Employee], shifts: list[Shift]) -> FeasibilityReport:
+    """check_problem_feasibility for domain models."""
+    return check_problem_feasibility(compile_problem(employees, shifts, validate=False))
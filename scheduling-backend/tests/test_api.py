@@ -1,9 +1,45 @@
 """Tests for the FastAPI optimization endpoint."""
 
+import asyncio
+import io
+import json
+import subprocess
+import sys
+import time
+import zipfile
+from datetime import datetime, timedelta
+
+import httpx
 import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.testclient import TestClient
 
+from scheduling.api import compression, history
+from scheduling.api.admission import Admission, AdmissionPolicy, AdmissionRejected
 from scheduling.api.app import app
+from scheduling.api.coalesce import Coalescer
+from scheduling.api.lanes import SolveQueue
+from scheduling.api.recorder import FlightRecorder
+from scheduling.api.routes import _solve_until_cancelled
+from scheduling.api.store import MemoryStore, SqliteStore
+from scheduling.api.warmup import WarmupState
+from scheduling.models.employee import Employee
+from scheduling.models.shift import Shift
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.scheduler import Scheduler
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch):
+    """A fresh result cache per test, so repeated requests are really solved."""
+    store = MemoryStore()
+    monkeypatch.setattr(app.state, "store", store)
+    monkeypatch.setattr(app.state, "recorder", None)
+    monkeypatch.setattr(app.state, "admission", Admission(AdmissionPolicy()))
+    monkeypatch.setattr(app.state, "solve_queue", SolveQueue())
+    monkeypatch.setattr(app.state, "coalescer", Coalescer())
+    return store
 
 
 @pytest.fixture
@@ -15,7 +51,56 @@ class TestHealthEndpoint:
     def test_health_returns_healthy(self, client: TestClient):
         response = client.get("/api/health")
         assert response.status_code == 200
-        assert response.json() == {"status": "healthy"}
+        assert response.json() == {
+            "status": "healthy",
+            "lane_depth": {"interactive": 0, "batch": 0},
+        }
+
+    def test_metrics_report_lanes(self, client: TestClient):
+        client.post("/api/optimize", json=_simple_request(), headers={"X-Priority": "batch"})
+
+        data = client.get("/api/metrics").json()
+
+        assert data["lanes"]["batch"]["completed"] == 1
+        assert data["lanes"]["interactive"]["completed"] == 0
+        assert data["lanes"]["batch"]["waiting"] == 0
+        assert data["heavy_running"] == 0
+
+
+class TestReadiness:
+    def test_not_ready_before_warm_up(self, client: TestClient, monkeypatch):
+        monkeypatch.setattr(app.state, "warmup", WarmupState())
+
+        response = client.get("/api/ready")
+
+        assert response.status_code == 503
+        assert response.json()["status"] == "pending"
+
+    def test_ready_after_warm_up(self, monkeypatch):
+        monkeypatch.setattr(app.state, "warmup", WarmupState())
+
+        with TestClient(app) as client:
+            assert app.state.warmup.done.wait(timeout=30)
+            response = client.get("/api/ready")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["app_import_seconds"] > 0
+        assert data["solver_import_seconds"] >= 0
+        assert data["warmup_seconds"] > 0
+
+    def test_app_starts_without_the_solver(self):
+        code = (
+            "import sys, scheduling.api.app; "
+            "print(any(m.startswith(('ortools', 'rich')) for m in sys.modules))"
+        )
+
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.strip() == "False"
 
 
 class TestOptimizeEndpoint:
@@ -292,3 +377,781 @@ class TestOptimizeEndpoint:
         assert "soft_preference_score" in solution["metrics"]
         assert "total_shifts_assigned" in solution["metrics"]
         assert solution["metrics"]["total_shifts_assigned"] == 1
+
+
+class TestOptimizeValidation:
+    def test_all_validation_errors_are_reported(self, client: TestClient):
+        request = {
+            "employees": [
+                {
+                    "id": "alice",
+                    "name": "Alice",
+                    "preferences": [{"type": "prefer_shift", "shift_id": "ghost"}],
+                },
+                {"id": "alice", "name": "Alice again"},
+            ],
+            "shifts": [
+                {
+                    "id": "backwards",
+                    "name": "Backwards",
+                    "start_time": "2024-12-25T14:00:00",
+                    "end_time": "2024-12-25T08:00:00",
+                }
+            ],
+        }
+
+        response = client.post("/api/optimize", json=request)
+
+        data = response.json()
+        assert data["success"] is False
+        assert len(data["errors"]) == 3
+        assert any("end_time must be after start_time" in e for e in data["errors"])
+        assert any("Duplicate employee id: 'alice'" in e for e in data["errors"])
+        assert any("shift_id 'ghost' does not exist" in e for e in data["errors"])
+        assert data["error"] == "; ".join(data["errors"])
+
+
+def _simple_request() -> dict:
+    return {
+        "employees": [{"id": "emp1", "name": "Alice", "abilities": ["bartender"]}],
+        "shifts": [
+            {
+                "id": "shift1",
+                "name": "Morning",
+                "start_time": "2024-12-25T08:00:00",
+                "end_time": "2024-12-25T14:00:00",
+                "required_abilities": ["bartender"],
+            }
+        ],
+    }
+
+
+def _columnar_request() -> dict:
+    """Two shifts on 2024-12-25; bob is hard-unavailable in the morning."""
+    day = 1735084800
+    return {
+        "abilities": ["waiter", "bartender"],
+        "ability_sets": [[0], [0, 1]],
+        "shifts": {
+            "ids": ["evening", "morning"],
+            "start": [day + 16 * 3600, day + 8 * 3600],
+            "end": [day + 22 * 3600, day + 14 * 3600],
+            "ability_set": [0, 0],
+        },
+        "employees": {"ids": ["alice", "bob"], "abilities": [0b11, 0b01]},
+        "preferences": {
+            "prefer_shift": {"employee": [0], "shift": [0], "is_hard": [False]},
+            "unavailable_period": {
+                "employee": [1],
+                "start": [day + 7 * 3600],
+                "end": [day + 15 * 3600],
+                "is_hard": [True],
+            },
+        },
+    }
+
+
+class TestOptimizeV2:
+    def test_columnar_request_is_solved(self, client: TestClient):
+        response = client.post("/api/v2/optimize", json=_columnar_request())
+
+        data = response.json()
+        assert data["success"] is True
+        assert data["solutions"][0]["assignments"] == {"morning": "alice", "evening": "bob"}
+
+    def test_compact_response(self, client: TestClient):
+        request = {**_columnar_request(), "response_format": "compact"}
+
+        compact = client.post("/api/v2/optimize", json=request).json()["compact"]
+
+        assert compact["shift_ids"] == ["morning", "evening"]
+        assert compact["solutions"][0]["assignments"] == [0, 1]
+
+    def test_all_validation_errors_are_reported(self, client: TestClient):
+        request = _columnar_request()
+        request["ability_sets"] = [[0, 7]]
+        request["shifts"]["ability_set"] = [0, 3]
+        request["preferences"]["prefer_shift"]["shift"] = [9]
+
+        data = client.post("/api/v2/optimize", json=request).json()
+
+        assert data["success"] is False
+        assert data["errors"] == [
+            "Ability set 0: ability 7 does not exist",
+            "Shift 'morning': ability set 3 does not exist",
+            "Employee 'alice' has preference for shift 9 does not exist",
+        ]
+
+    def test_columns_of_unequal_length_are_rejected(self, client: TestClient):
+        request = _columnar_request()
+        request["shifts"]["end"].pop()
+
+        response = client.post("/api/v2/optimize", json=request)
+
+        assert response.status_code == 422
+
+
+class TestOptimizeEncodings:
+    def test_json_is_the_default(self, client: TestClient):
+        response = client.post("/api/optimize", json=_simple_request())
+
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()["solutions"][0]["assignments"] == {"shift1": "emp1"}
+
+    def test_msgpack_request_and_response(self, client: TestClient):
+        msgpack = pytest.importorskip("msgpack")
+
+        response = client.post(
+            "/api/optimize",
+            content=msgpack.packb(_simple_request()),
+            headers={"Content-Type": "application/msgpack", "Accept": "application/msgpack"},
+        )
+
+        assert response.headers["content-type"] == "application/msgpack"
+        data = msgpack.unpackb(response.content)
+        json_data = client.post("/api/optimize", json=_simple_request()).json()
+        assert data.keys() == json_data.keys()
+        assert data["solutions"] == json_data["solutions"]
+
+    def test_json_preferred_when_ranked_higher(self, client: TestClient):
+        pytest.importorskip("msgpack")
+
+        response = client.post(
+            "/api/optimize",
+            json=_simple_request(),
+            headers={"Accept": "application/json, application/msgpack;q=0.5"},
+        )
+
+        assert response.headers["content-type"] == "application/json"
+
+    def test_invalid_msgpack_body_is_rejected(self, client: TestClient):
+        msgpack = pytest.importorskip("msgpack")
+
+        response = client.post(
+            "/api/optimize",
+            content=msgpack.packb({"employees": []}),
+            headers={"Content-Type": "application/msgpack"},
+        )
+
+        assert response.status_code == 422
+
+
+class TestCompactResponses:
+    def test_compact_format_uses_id_tables(self, client: TestClient):
+        request = {**_enumeration_request(max_solutions=3), "response_format": "compact"}
+        full = client.post("/api/optimize", json=_enumeration_request(max_solutions=3)).json()
+
+        data = client.post("/api/optimize", json=request).json()
+
+        assert data["solutions"] == []
+        compact = data["compact"]
+        decoded = [
+            {
+                compact["shift_ids"][s]: compact["employee_ids"][e]
+                for s, e in enumerate(solution["assignments"])
+            }
+            for solution in compact["solutions"]
+        ]
+        assert decoded == [solution["assignments"] for solution in full["solutions"]]
+
+    def test_delta_format_sends_differences_from_best(self, client: TestClient):
+        request = {**_enumeration_request(max_solutions=3), "response_format": "delta"}
+
+        compact = client.post("/api/optimize", json=request).json()["compact"]
+
+        best, *others = compact["solutions"]
+        assert len(best["assignments"]) == len(compact["shift_ids"])
+        assert others
+        for solution in others:
+            assert solution["assignments"] is None
+            assert solution["changed_shifts"]
+            assert len(solution["changed_shifts"]) == len(solution["changed_employees"])
+            for shift, employee in zip(
+                solution["changed_shifts"], solution["changed_employees"], strict=True
+            ):
+                assert best["assignments"][shift] != employee
+
+
+class TestResponseCompression:
+    def test_large_responses_are_gzipped(self, client: TestClient):
+        response = client.post(
+            "/api/optimize",
+            json=_enumeration_request(max_solutions=20),
+            headers={"Accept-Encoding": "gzip"},
+        )
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert len(response.json()["solutions"]) == 20
+
+    def test_small_responses_are_not_compressed(self, client: TestClient):
+        response = client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_uncompressed_responses_vary_on_accept_encoding(self, client: TestClient):
+        response = client.post(
+            "/api/optimize",
+            json=_enumeration_request(max_solutions=20),
+            headers={"Accept-Encoding": "identity"},
+        )
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_large_bodies_are_compressed_off_the_event_loop(self, monkeypatch):
+        threaded = []
+
+        async def run_in_threadpool(func):
+            threaded.append(func)
+            return func()
+
+        monkeypatch.setattr(compression, "run_in_threadpool", run_in_threadpool)
+        bodies = {"/small": "shift,employee\n" * 100, "/large": "shift,employee\n" * 10_000}
+        roster = FastAPI()
+        for path, body in bodies.items():
+            roster.get(path)(lambda body=body: PlainTextResponse(body))
+        roster.add_middleware(compression.CompressionMiddleware, thread_minimum_size=64 * 1024)
+        client = TestClient(roster)
+
+        for path, body in bodies.items():
+            response = client.get(path, headers={"Accept-Encoding": "gzip"})
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.text == body
+        assert len(threaded) == 1
+
+    def test_brotli_preferred_when_available(self, client: TestClient):
+        pytest.importorskip("brotli")
+
+        response = client.post(
+            "/api/optimize",
+            json=_enumeration_request(max_solutions=20),
+            headers={"Accept-Encoding": "gzip, br"},
+        )
+
+        assert response.headers["content-encoding"] == "br"
+        assert len(response.json()["solutions"]) == 20
+
+
+class TestOptimizeStats:
+    def test_stats_report_optimal_status(self, client: TestClient):
+        """A solvable request reports how the search ended."""
+        request = {
+            "employees": [
+                {"id": "alice", "name": "Alice", "abilities": ["waiter"], "preferences": []}
+            ],
+            "shifts": [
+                {
+                    "id": "shift1",
+                    "name": "Morning",
+                    "start_time": "2024-12-25T08:00:00",
+                    "end_time": "2024-12-25T14:00:00",
+                    "required_abilities": ["waiter"],
+                }
+            ],
+            "max_solutions": 1,
+        }
+
+        response = client.post("/api/optimize", json=request)
+
+        stats = response.json()["stats"]
+        assert stats["status"] in ("optimal", "feasible")
+        assert stats["num_solutions"] == 1
+        assert stats["hit_time_limit"] is False
+        assert stats["wall_time"] >= 0.0
+
+    def test_stats_report_infeasible_status(self, client: TestClient):
+        """An impossible request is reported as proven infeasible, not as a timeout."""
+        request = {
+            "employees": [
+                {"id": "alice", "name": "Alice", "abilities": ["waiter"], "preferences": []}
+            ],
+            "shifts": [
+                {
+                    "id": "shift1",
+                    "name": "Bartender Shift",
+                    "start_time": "2024-12-25T08:00:00",
+                    "end_time": "2024-12-25T14:00:00",
+                    "required_abilities": ["bartender"],
+                }
+            ],
+            "max_solutions": 1,
+        }
+
+        response = client.post("/api/optimize", json=request)
+
+        data = response.json()
+        assert data["solutions"] == []
+        assert data["stats"]["status"] == "infeasible"
+        assert data["stats"]["hit_time_limit"] is False
+        assert data["feasibility"]["uncoverable_shifts"] == [
+            {"shift_id": "shift1", "reason": "no_qualified_employee"}
+        ]
+
+    def test_conflicts_explain_infeasible_request(self, client: TestClient):
+        request = {
+            "employees": [
+                {
+                    "id": "alice",
+                    "name": "Alice",
+                    "abilities": ["waiter"],
+                    "preferences": [
+                        {"type": "prefer_shift", "shift_id": "shift1", "is_hard": True},
+                        {
+                            "type": "unavailable_period",
+                            "start": "2024-12-25T00:00:00",
+                            "end": "2024-12-26T00:00:00",
+                        },
+                    ],
+                },
+                {"id": "bob", "name": "Bob", "abilities": ["waiter"]},
+            ],
+            "shifts": [
+                {
+                    "id": "shift1",
+                    "name": "Morning",
+                    "start_time": "2024-12-25T08:00:00",
+                    "end_time": "2024-12-25T14:00:00",
+                    "required_abilities": ["waiter"],
+                }
+            ],
+            "options": {"explain_infeasibility": True},
+        }
+
+        response = client.post("/api/optimize", json=request)
+
+        data = response.json()
+        assert data["stats"]["status"] == "infeasible"
+        assert {(c["employee_id"], c["preference_index"]) for c in data["conflicts"]} == {
+            ("alice", 0),
+            ("alice", 1),
+        }
+
+
+class TestResultCache:
+    def test_repeated_request_is_served_from_cache(self, client: TestClient):
+        first = client.post("/api/optimize", json=_simple_request())
+        second = client.post("/api/optimize", json=_simple_request())
+
+        assert first.headers["X-Cache"] == "miss"
+        assert second.headers["X-Cache"] == "hit"
+        assert second.json() == first.json()
+        assert second.headers["X-Job-Id"] != first.headers["X-Job-Id"]
+
+    def test_failed_validation_is_not_cached(self, client: TestClient, store: MemoryStore):
+        request = _simple_request()
+        request["shifts"][0]["end_time"] = "2024-12-25T07:00:00"
+
+        client.post("/api/optimize", json=request)
+        response = client.post("/api/optimize", json=request)
+
+        assert response.headers["X-Cache"] == "miss"
+        assert store.keys("results") == []
+
+    def test_truncated_response_is_not_cached(self, client: TestClient, store: MemoryStore):
+        client.post(
+            "/api/optimize",
+            json=_simple_request(),
+            headers={"X-Request-Deadline": str(time.time() - 1)},
+        )
+
+        assert store.keys("results") == []
+
+    def test_job_state_is_recorded(self, client: TestClient):
+        response = client.post("/api/optimize", json=_simple_request())
+
+        job = client.get(f"/api/jobs/{response.headers['X-Job-Id']}")
+
+        assert job.status_code == 200
+        data = job.json()
+        assert data["status"] == "done"
+        assert data["success"] is True
+        assert data["cached"] is False
+        assert data["finished_at"] is not None
+
+    def test_unknown_job_is_not_found(self, client: TestClient):
+        assert client.get("/api/jobs/missing").status_code == 404
+
+    def test_workers_sharing_a_database_share_results(
+        self, client: TestClient, monkeypatch, tmp_path
+    ):
+        monkeypatch.setattr(app.state, "store", SqliteStore(tmp_path / "store.db"))
+        first = client.post("/api/optimize", json=_simple_request())
+
+        # A second worker process opens its own connection to the same file.
+        monkeypatch.setattr(app.state, "store", SqliteStore(tmp_path / "store.db"))
+        second = client.post("/api/optimize", json=_simple_request())
+        job = client.get(f"/api/jobs/{first.headers['X-Job-Id']}")
+
+        assert second.headers["X-Cache"] == "hit"
+        assert job.json()["status"] == "done"
+
+
+class TestCoalescing:
+    def test_key_order_and_whitespace_do_not_matter(self, client: TestClient):
+        client.post("/api/optimize", json=_simple_request())
+        reordered = dict(reversed(_simple_request().items()))
+
+        response = client.post(
+            "/api/optimize",
+            content=json.dumps(reordered, indent=2),
+            headers={"Content-Type": "application/json"},
+        )
+
+        assert response.headers["X-Cache"] == "hit"
+
+    def test_concurrent_identical_requests_share_one_solve(self, client: TestClient):
+        request = {**_simple_request(), "options": {"warm_start": False}}
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                return await asyncio.gather(
+                    *(http.post("/api/optimize", json=request) for _ in range(3))
+                )
+
+        responses = asyncio.run(run())
+        leaders = [r.headers["X-Job-Id"] for r in responses if "X-Coalesced-With" not in r.headers]
+        metrics = client.get("/api/metrics").json()
+
+        assert len(leaders) == 1
+        assert all(r.json() == responses[0].json() for r in responses)
+        followers = [r for r in responses if "X-Coalesced-With" in r.headers]
+        assert {r.headers["X-Coalesced-With"] for r in followers} == set(leaders)
+        job = client.get(f"/api/jobs/{followers[0].headers['X-Job-Id']}").json()
+        assert job["coalesced_with"] == leaders[0]
+        assert metrics["coalescing"] == {
+            "leaders": 1,
+            "followers": 2,
+            "remote_followers": 0,
+            "retries": 0,
+        }
+        assert metrics["lanes"]["interactive"]["completed"] == 1
+
+    def test_interactive_requests_do_not_follow_batch_ones(self, client: TestClient):
+        request = {**_simple_request(), "options": {"warm_start": False}}
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                return await asyncio.gather(
+                    http.post("/api/optimize", json=request, headers={"X-Priority": "batch"}),
+                    http.post("/api/optimize", json=request),
+                )
+
+        responses = asyncio.run(run())
+        metrics = client.get("/api/metrics").json()
+
+        assert all("X-Coalesced-With" not in r.headers for r in responses)
+        assert metrics["coalescing"]["leaders"] == 2
+        assert metrics["lanes"]["batch"]["completed"] == 1
+        assert metrics["lanes"]["interactive"]["completed"] == 1
+
+
+class TestFlightRecorder:
+    def test_slow_requests_are_captured(self, client: TestClient, monkeypatch, tmp_path):
+        monkeypatch.setattr(app.state, "recorder", FlightRecorder(tmp_path, threshold=0))
+
+        client.post("/api/optimize", json=_simple_request())
+        captures = client.get("/api/captures").json()
+
+        assert len(captures) == 1
+        capture = captures[0]
+        assert capture["endpoint"] == "/api/optimize"
+        assert (capture["num_employees"], capture["num_shifts"]) == (1, 1)
+        assert capture["has_search_log"] is True
+        assert {"compile", "build", "solve"} <= capture["phase_times"].keys()
+
+        download = client.get(f"/api/captures/{capture['id']}")
+        assert download.headers["content-type"] == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+            assert json.loads(archive.read("request.json")) == _simple_request()
+            assert "#Variables" in archive.read("model_stats.txt").decode()
+            assert "CP-SAT" in archive.read("search.log").decode()
+
+    def test_oldest_captures_are_dropped(self, client: TestClient, monkeypatch, tmp_path):
+        monkeypatch.setattr(
+            app.state, "recorder", FlightRecorder(tmp_path, threshold=0, capacity=2)
+        )
+
+        for max_solutions in (1, 2, 3):
+            client.post("/api/optimize", json={**_simple_request(), "max_solutions": max_solutions})
+
+        captures = client.get("/api/captures").json()
+        assert len(captures) == 2
+        assert len(list(tmp_path.glob("*.zip"))) == 2
+        assert captures[0]["recorded_at"] > captures[1]["recorded_at"]
+
+    def test_fast_requests_are_not_captured(self, client: TestClient, monkeypatch, tmp_path):
+        monkeypatch.setattr(app.state, "recorder", FlightRecorder(tmp_path, threshold=60))
+
+        client.post("/api/optimize", json=_simple_request())
+
+        assert client.get("/api/captures").json() == []
+
+    def test_unknown_capture_is_not_found(self, client: TestClient, monkeypatch, tmp_path):
+        monkeypatch.setattr(app.state, "recorder", FlightRecorder(tmp_path, threshold=0))
+
+        assert client.get("/api/captures/00000000000000000000-deadbeef").status_code == 404
+        assert client.get("/api/captures/..%2Fstore").status_code == 404
+
+
+class TestSolveLanes:
+    def test_unknown_priority_is_rejected(self, client: TestClient):
+        response = client.post(
+            "/api/optimize", json=_simple_request(), headers={"X-Priority": "urgent"}
+        )
+
+        assert response.status_code == 422
+
+
+class TestWarmStart:
+    def test_next_week_starts_from_last_weeks_schedule(self, client: TestClient):
+        first = client.post("/api/optimize", json=_weekly_request(0)).json()
+        second = client.post("/api/optimize", json=_weekly_request(7)).json()
+
+        assert first["warm_start"] is None
+        assert second["success"] is True
+        assert second["warm_start"] == {"similarity": 1.0, "hinted_shifts": 3}
+
+    def test_history_is_kept_per_tenant(self, client: TestClient):
+        client.post("/api/optimize", json=_weekly_request(0), headers={"X-Tenant-Id": "venue-a"})
+        response = client.post(
+            "/api/optimize", json=_weekly_request(7), headers={"X-Tenant-Id": "venue-b"}
+        )
+
+        assert response.json()["warm_start"] is None
+
+    def test_each_tenant_keeps_its_newest_schedules(
+        self, client: TestClient, store: MemoryStore, monkeypatch
+    ):
+        monkeypatch.setattr(history, "HISTORY_LIMIT", 2)
+        for offset in range(3):
+            client.post(
+                "/api/optimize",
+                json=_weekly_request(offset),
+                headers={"X-Tenant-Id": "venue-a"},
+            )
+        client.post("/api/optimize", json=_weekly_request(7), headers={"X-Tenant-Id": "venue-b"})
+
+        assert len(store.keys("history/venue-a")) == 2
+        assert len(store.keys("history/venue-b")) == 1
+
+    def test_tenants_do_not_share_cached_responses(self, client: TestClient, store: MemoryStore):
+        client.post("/api/optimize", json=_weekly_request(0), headers={"X-Tenant-Id": "venue-a"})
+        client.post("/api/optimize", json=_weekly_request(7), headers={"X-Tenant-Id": "venue-a"})
+
+        other = client.post(
+            "/api/optimize", json=_weekly_request(7), headers={"X-Tenant-Id": "venue-b"}
+        )
+
+        assert other.headers["X-Cache"] == "miss"
+        assert other.json()["warm_start"] is None
+        assert len(store.keys("history/venue-b")) == 1
+
+    def test_warm_start_can_be_turned_off(self, client: TestClient):
+        client.post("/api/optimize", json=_weekly_request(0))
+        request = {**_weekly_request(7), "options": {"warm_start": False}}
+
+        assert client.post("/api/optimize", json=request).json()["warm_start"] is None
+
+
+def _weekly_request(offset_days: int) -> dict:
+    """Three daily shifts of the week starting 2024-12-02 plus `offset_days`."""
+    monday = datetime(2024, 12, 2) + timedelta(days=offset_days)
+    return {
+        "employees": [
+            {"id": "emp1", "name": "Alice", "abilities": ["waiter"]},
+            {"id": "emp2", "name": "Bob", "abilities": ["waiter"]},
+        ],
+        "shifts": [
+            {
+                "id": f"{monday:%m%d}-{day}",
+                "name": f"Day {day}",
+                "start_time": (monday + timedelta(days=day, hours=8)).isoformat(),
+                "end_time": (monday + timedelta(days=day, hours=14)).isoformat(),
+                "required_abilities": ["waiter"],
+            }
+            for day in range(3)
+        ],
+    }
+
+
+class TestAdmission:
+    def test_analyze_estimates_without_solving(self, client: TestClient):
+        response = client.post("/api/analyze", json=_simple_request())
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["estimate"]["assignment_variables"] == 1
+        assert data["estimate"]["constraints"] >= 1
+        assert data["admission"] == "accept"
+        assert data["memory_limit_mb"] is None
+
+    def test_heavy_or_configured_solves_get_a_memory_limit(self, client: TestClient, monkeypatch):
+        policies = [AdmissionPolicy(heavy_cpu_seconds=0), AdmissionPolicy(max_memory_mb=100)]
+        limits = []
+        for policy in policies:
+            monkeypatch.setattr(app.state, "admission", Admission(policy))
+            limits.append(client.post("/api/analyze", json=_simple_request()).json())
+
+        assert [data["memory_limit_mb"] for data in limits] == [256, 100]
+
+    def test_analyze_v2(self, client: TestClient):
+        data = client.post("/api/v2/analyze", json=_columnar_request()).json()
+
+        assert data["success"] is True
+        assert data["estimate"]["preferences"] == 2
+
+    def test_analyze_reports_validation_errors(self, client: TestClient):
+        request = _simple_request()
+        request["shifts"][0]["end_time"] = "2024-12-25T07:00:00"
+
+        data = client.post("/api/analyze", json=request).json()
+
+        assert data["success"] is False
+        assert data["estimate"] is None
+        assert data["errors"]
+
+    def test_oversized_problem_is_rejected(self, client: TestClient, monkeypatch, store):
+        monkeypatch.setattr(app.state, "admission", Admission(AdmissionPolicy(max_variables=1)))
+
+        analyzed = client.post("/api/analyze", json=_simple_request()).json()
+        response = client.post("/api/optimize", json=_simple_request())
+
+        assert analyzed["admission"] == "reject"
+        assert response.status_code == 413
+        assert response.json()["success"] is False
+        assert "too large" in response.json()["error"]
+        assert store.keys("results") == []
+
+    def test_heavy_problem_waits_for_the_heavy_lane(self, client: TestClient, monkeypatch):
+        policy = AdmissionPolicy(heavy_cpu_seconds=0)
+        monkeypatch.setattr(app.state, "admission", Admission(policy))
+
+        analyzed = client.post("/api/analyze", json=_simple_request()).json()
+        response = client.post("/api/optimize", json=_simple_request())
+
+        assert analyzed["admission"] == "queue"
+        assert response.status_code == 200
+        assert response.json()["success"] is True
+
+    def test_heavy_lane_times_out_when_full(self):
+        admission = Admission(AdmissionPolicy(heavy_slots=1))
+
+        async def run():
+            async with admission.heavy_slot(1.0):
+                assert admission.heavy_running == 1
+                with pytest.raises(AdmissionRejected) as rejected:
+                    async with admission.heavy_slot(0.05):
+                        pass
+            assert rejected.value.status_code == 503
+            assert (admission.heavy_waiting, admission.heavy_running) == (0, 0)
+
+        asyncio.run(run())
+
+    def test_solve_runs_under_a_memory_limit(self, client: TestClient, monkeypatch, tmp_path):
+        monkeypatch.setattr(app.state, "recorder", FlightRecorder(tmp_path, threshold=0))
+        monkeypatch.setattr(app.state, "admission", Admission(AdmissionPolicy(max_memory_mb=100)))
+
+        client.post("/api/optimize", json=_simple_request())
+        capture = client.get("/api/captures").json()[0]
+        download = client.get(f"/api/captures/{capture['id']}")
+
+        with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+            assert "max_memory_in_mb: 100" in archive.read("parameters.pbtxt").decode()
+
+
+def _enumeration_request(max_solutions: int = 100) -> dict:
+    """A request with a large number of equally good solutions."""
+    return {
+        "employees": [
+            {"id": f"emp{i}", "name": f"Employee {i}", "abilities": ["waiter"]} for i in range(8)
+        ],
+        "shifts": [
+            {
+                "id": f"shift{i}",
+                "name": f"Shift {i}",
+                "start_time": f"2024-12-{i + 1:02d}T08:00:00",
+                "end_time": f"2024-12-{i + 1:02d}T10:00:00",
+                "required_abilities": ["waiter"],
+            }
+            for i in range(0, 12, 2)
+        ],
+        "max_solutions": max_solutions,
+    }
+
+
+class _DisconnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return True
+
+
+class TestOptimizeCancellation:
+    def test_expired_deadline_returns_greedy_fallback(self, client: TestClient):
+        response = client.post(
+            "/api/optimize",
+            json=_enumeration_request(),
+            headers={"X-Request-Deadline": str(time.time() - 1)},
+        )
+
+        data = response.json()
+        assert data["success"] is True
+        assert data["truncated"] is True
+        assert data["heuristic"] is True
+        assert data["stats"]["stop_reason"] == "deadline"
+        assert len(data["solutions"]) == 1
+        assert len(data["solutions"][0]["assignments"]) == 6
+
+    def test_future_deadline_is_not_truncated(self, client: TestClient):
+        response = client.post(
+            "/api/optimize",
+            json=_enumeration_request(max_solutions=5),
+            headers={"X-Request-Deadline": str(time.time() + 30)},
+        )
+
+        data = response.json()
+        assert data["truncated"] is False
+        assert len(data["solutions"]) == 5
+
+    def test_invalid_deadline_is_reported(self, client: TestClient):
+        response = client.post(
+            "/api/optimize",
+            json=_enumeration_request(),
+            headers={"X-Request-Deadline": "tomorrow"},
+        )
+
+        data = response.json()
+        assert data["success"] is False
+        assert "X-Request-Deadline" in data["error"]
+
+    def test_client_disconnect_cancels_solve(self):
+        scheduler = Scheduler(
+            employees=[
+                Employee(id=f"emp{i}", name=f"E{i}", abilities=["waiter"]) for i in range(8)
+            ],
+            shifts=[
+                Shift(
+                    id=f"shift{i}",
+                    name=f"Shift {i}",
+                    start_time=f"2024-12-{2 * i + 1:02d}T08:00:00",
+                    end_time=f"2024-12-{2 * i + 1:02d}T10:00:00",
+                )
+                for i in range(6)
+            ],
+        )
+
+        result = asyncio.run(
+            _solve_until_cancelled(
+                scheduler,
+                0,
+                SolverOptions(max_time_in_seconds=30.0),
+                _DisconnectedRequest(),
+                deadline=None,
+            )
+        )
+
+        assert result.stats.stop_reason == "cancelled"
+        assert result.stats.wall_time < 10.0
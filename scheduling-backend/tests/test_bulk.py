@@ -0,0 +1,122 @@
+"""Tests for building the CP-SAT model in bulk from index arrays."""
+
+from datetime import datetime
+
+import pytest
+from ortools.sat.python import cp_model
+
+from scheduling.models.employee import Employee
+from scheduling.models.shift import Shift
+from scheduling.solver.bulk import AssignmentVariables, build_bulk_model
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.problem import compile_problem
+from scheduling.solver.scheduler import Scheduler
+from scheduling.solver.scoring import REST_THRESHOLD_SECONDS
+from tests.conftest import make_roster
+
+
+def _all_solutions(
+    model: cp_model.CpModel, variables: AssignmentVariables, objective: int | None
+) -> dict[tuple, int]:
+    """Every feasible assignment of `model` and its objective variable's value."""
+    model.proto.clear_objective()
+    found: dict[tuple, int] = {}
+
+    class Collector(cp_model.CpSolverSolutionCallback):
+        def on_solution_callback(self):
+            assignment = tuple(
+                (employee, shift)
+                for index, employee, shift in zip(
+                    variables.index.tolist(),
+                    variables.employee.tolist(),
+                    variables.shift.tolist(),
+                    strict=True,
+                )
+                if self.SolutionBooleanValue(index)
+            )
+            found[assignment] = self.SolutionIntegerValue(objective) if objective is not None else 0
+
+    solver = cp_model.CpSolver()
+    solver.parameters.enumerate_all_solutions = True
+    solver.parameters.num_workers = 1
+    solver.Solve(model, Collector())
+    return found
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_bulk_model_has_the_same_solutions_and_objective(seed: int):
+    problem = compile_problem(*make_roster(seed))
+    standard = cp_model.CpModel()
+    assign_vars, objective_var = Scheduler.from_problem(problem).build_model(standard)
+    bulk = cp_model.CpModel()
+    variables, objective = build_bulk_model(problem, bulk)
+
+    expected = _all_solutions(
+        standard,
+        AssignmentVariables.from_vars(assign_vars),
+        objective_var.Index() if objective_var is not None else None,
+    )
+
+    assert _all_solutions(bulk, variables, objective) == expected
+    assert (objective is None) == (objective_var is None)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_cliques_cover_exactly_the_overlapping_pairs(seed: int):
+    problem = compile_problem(*make_roster(seed, num_shifts=12))
+    clique, shift = problem.overlap_cliques()
+
+    covered = {
+        (a, b)
+        for c in set(clique.tolist())
+        for a in shift[clique == c].tolist()
+        for b in shift[clique == c].tolist()
+        if a < b
+    }
+    first, second, _, _ = problem.shift_pairs(REST_THRESHOLD_SECONDS)
+
+    assert covered == set(zip(first.tolist(), second.tolist(), strict=True))
+
+
+def test_scheduler_solves_bulk_models_the_same_way():
+    problem = compile_problem(*make_roster(0, num_employees=4, num_shifts=8))
+
+    results = [
+        Scheduler.from_problem(problem).solve_with_stats(
+            1000, SolverOptions(bulk_build=bulk, greedy_hint=False)
+        )
+        for bulk in (False, True)
+    ]
+
+    assert results[0].stats.status == results[1].stats.status == "optimal"
+    assert results[0].stats.objective_value == results[1].stats.objective_value
+    assert results[0].solutions[0].metrics == results[1].solutions[0].metrics
+
+
+def test_names_are_optional():
+    problem = compile_problem(*make_roster(1))
+    unnamed, named = cp_model.CpModel(), cp_model.CpModel()
+
+    build_bulk_model(problem, unnamed)
+    build_bulk_model(problem, named, names=True)
+
+    assert all(variable.name == "" for variable in unnamed.proto.variables)
+    assert named.proto.variables[0].name.startswith("assign_")
+
+
+def test_shift_nobody_can_work_is_infeasible():
+    shift = Shift(
+        id="bar",
+        name="Bar",
+        start_time=datetime(2024, 12, 2, 18),
+        end_time=datetime(2024, 12, 2, 23),
+        required_abilities=["bartender"],
+    )
+    employee = Employee(id="alice", name="Alice", abilities=["waiter"])
+    problem = compile_problem([employee], [shift], validate=False)
+
+    result = Scheduler.from_problem(problem).solve_with_stats(
+        options=SolverOptions(bulk_build=True, precheck=False)
+    )
+
+    assert result.stats.status == "infeasible"
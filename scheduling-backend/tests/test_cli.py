@@ -0,0 +1,104 @@
+"""Tests for the batch solve command."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from scheduling.cli import SolveSettings, completed_ids, main, run_solve
+
+
+def _request(shifts: int = 2) -> dict:
+    return {
+        "employees": [
+            {"id": "alice", "name": "Alice", "abilities": ["waiter"]},
+            {"id": "bob", "name": "Bob", "abilities": ["waiter"]},
+        ],
+        "shifts": [
+            {
+                "id": f"shift{i}",
+                "name": f"Shift {i}",
+                "start_time": f"2024-12-{10 + i}T08:00:00",
+                "end_time": f"2024-12-{10 + i}T14:00:00",
+                "required_abilities": ["waiter"],
+            }
+            for i in range(shifts)
+        ],
+    }
+
+
+@pytest.fixture
+def problems(tmp_path: Path) -> Path:
+    path = tmp_path / "problems.jsonl"
+    lines = [{**_request(), "id": "first"}, {**_request(3), "id": "second"}, {"employees": []}]
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    return path
+
+
+def _results(path: Path) -> dict[str, dict]:
+    return {record["id"]: record for record in map(json.loads, path.read_text().splitlines())}
+
+
+class TestBatchSolve:
+    def test_solves_every_problem(self, problems: Path, tmp_path: Path):
+        output = tmp_path / "results.jsonl"
+
+        totals = run_solve([problems], output, SolveSettings())
+
+        results = _results(output)
+        assert set(results) == {"first", "second", "problems.jsonl:3"}
+        assert results["first"]["response"]["solutions"][0]["assignments"].keys() == {
+            "shift0",
+            "shift1",
+        }
+        assert results["problems.jsonl:3"]["response"]["success"] is False
+        assert (totals["solved"], totals["failed"]) == (2, 1)
+
+    def test_malformed_line_fails_alone(self, problems: Path, tmp_path: Path):
+        problems.write_text(problems.read_text() + '{"employees": [\n')
+        output = tmp_path / "results.jsonl"
+
+        code = main(["solve", str(problems), "-o", str(output), "-j", "1"])
+
+        results = _results(output)
+        assert code == 2
+        assert results["first"]["response"]["success"] is True
+        assert results["problems.jsonl:4"]["response"]["success"] is False
+
+    def test_reads_directories_of_json_files(self, tmp_path: Path):
+        (tmp_path / "in" / "week").mkdir(parents=True)
+        (tmp_path / "in" / "week" / "monday.json").write_text(json.dumps(_request()))
+        output = tmp_path / "results.jsonl"
+
+        run_solve([tmp_path / "in"], output, SolveSettings())
+
+        assert _results(output)["week/monday"]["response"]["success"] is True
+
+    def test_resumes_after_interruption(self, problems: Path, tmp_path: Path):
+        output = tmp_path / "results.jsonl"
+        run_solve([problems], output, SolveSettings())
+        lines = output.read_bytes().splitlines(keepends=True)
+        # The run stopped while writing the second result.
+        output.write_bytes(lines[0] + lines[1][:10])
+
+        totals = run_solve([problems], output, SolveSettings())
+
+        assert totals["skipped"] == 1
+        assert sorted(_results(output)) == sorted(["first", "second", "problems.jsonl:3"])
+        assert completed_ids(output) == {"first", "second", "problems.jsonl:3"}
+
+    def test_profile_records_phase_timings(self, problems: Path, tmp_path: Path):
+        output = tmp_path / "results.jsonl"
+
+        run_solve([problems], output, SolveSettings(profile=True))
+
+        profile = _results(output)["first"]["profile"]
+        assert {"parse", "compile", "build", "solve", "respond"} <= profile.keys()
+
+    def test_process_pool(self, problems: Path, tmp_path: Path):
+        output = tmp_path / "results.jsonl"
+
+        code = main(["solve", str(problems), "-o", str(output), "-j", "2", "--time-limit", "5"])
+
+        assert code == 2  # one problem is invalid
+        assert len(_results(output)) == 3
@@ -0,0 +1,140 @@
+"""Tests for single-flight coalescing of identical optimize requests."""
+
+import asyncio
+import time
+
+from scheduling.api.admission import AdmissionRejected
+from scheduling.api.coalesce import Coalescer
+from scheduling.api.dto import OptimizeResponse, SolveStatsDto
+from scheduling.api.store import MemoryStore
+
+
+def _solver(
+    calls: list[str],
+    name: str,
+    stop_reason: str | None = None,
+    delay: float = 0.2,
+    truncated: bool = False,
+):
+    """A solve that takes `delay` seconds and records that it ran."""
+
+    async def solve() -> OptimizeResponse:
+        calls.append(name)
+        await asyncio.sleep(delay)
+        stats = SolveStatsDto(status="feasible", stop_reason=stop_reason)
+        return OptimizeResponse(success=True, stats=stats, error=name, truncated=truncated)
+
+    return solve
+
+
+def test_identical_requests_share_one_solve():
+    coalescer, store, calls = Coalescer(), MemoryStore(), []
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                coalescer.run(store, "key", f"job{i}", _solver(calls, f"job{i}"), lease=10)
+                for i in range(3)
+            )
+        )
+
+    outcomes = asyncio.run(run())
+
+    assert calls == ["job0"]
+    assert [leader for _, leader in outcomes] == [None, "job0", "job0"]
+    assert {response.error for response, _ in outcomes} == {"job0"}
+    assert (coalescer.leaders, coalescer.followers) == (1, 2)
+    assert store.keys("inflight") == []
+
+
+def test_workers_sharing_a_store_share_one_solve():
+    workers, store, calls = [Coalescer(), Coalescer()], MemoryStore(), []
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                worker.run(store, "key", f"job{i}", _solver(calls, f"job{i}"), lease=10)
+                for i, worker in enumerate(workers)
+            )
+        )
+
+    outcomes = asyncio.run(run())
+
+    assert calls == ["job0"]
+    assert outcomes[1] == (outcomes[0][0], "job0")
+    assert workers[1].remote_followers == 1
+
+
+def test_followers_start_over_when_the_leader_is_cancelled():
+    coalescer, store, calls = Coalescer(), MemoryStore(), []
+
+    async def run():
+        return await asyncio.gather(
+            coalescer.run(store, "key", "job0", _solver(calls, "job0", "cancelled"), lease=10),
+            coalescer.run(store, "key", "job1", _solver(calls, "job1"), lease=10),
+        )
+
+    (_, _), (response, leader) = asyncio.run(run())
+
+    assert calls == ["job0", "job1"]
+    assert (response.error, leader) == ("job1", None)
+    assert coalescer.retries == 1
+
+
+def test_followers_start_over_when_the_leader_is_truncated():
+    workers, store, calls = [Coalescer(), Coalescer()], MemoryStore(), []
+    leader = _solver(calls, "job0", "deadline", truncated=True)
+
+    async def run():
+        return await asyncio.gather(
+            workers[0].run(store, "key", "job0", leader, lease=10),
+            workers[0].run(store, "key", "job1", _solver(calls, "job1"), lease=10),
+            workers[1].run(store, "key", "job2", _solver(calls, "job2"), lease=10),
+        )
+
+    (truncated, _), *followers = asyncio.run(run())
+
+    assert truncated.truncated
+    assert calls[0] == "job0" and len(calls) == 2
+    assert all(not response.truncated for response, _ in followers)
+    assert workers[0].retries + workers[1].retries == 2
+
+
+def test_followers_stop_waiting_at_their_deadline():
+    coalescer, store, calls = Coalescer(), MemoryStore(), []
+
+    async def run():
+        leader = asyncio.create_task(
+            coalescer.run(store, "key", "job0", _solver(calls, "job0", delay=2), lease=10)
+        )
+        await asyncio.sleep(0.05)
+        follower = await coalescer.run(
+            store, "key", "job1", _solver(calls, "job1", delay=0), 10, time.time() + 0.1
+        )
+        await leader
+        return follower
+
+    response, leader = asyncio.run(run())
+
+    assert (response.error, leader) == ("job1", None)
+
+
+def test_rejections_reach_followers():
+    coalescer, store = Coalescer(), MemoryStore()
+
+    async def reject() -> OptimizeResponse:
+        await asyncio.sleep(0.1)
+        raise AdmissionRejected("too large", 413)
+
+    async def run():
+        return await asyncio.gather(
+            coalescer.run(store, "key", "job0", reject, lease=10),
+            coalescer.run(store, "key", "job1", reject, lease=10),
+            return_exceptions=True,
+        )
+
+    outcomes = asyncio.run(run())
+
+    assert all(isinstance(outcome, AdmissionRejected) for outcome in outcomes)
+    assert coalescer.leaders == 1
+    assert store.keys("inflight") == []
@@ -0,0 +1,107 @@
+"""Tests for the column-generation engine."""
+
+import itertools
+import random
+from datetime import datetime
+
+import pytest
+
+from scheduling.models.employee import Employee
+from scheduling.models.preferences.unavailable import UnavailablePeriodPreference
+from scheduling.models.shift import Shift
+from scheduling.solver.colgen import ColumnGenerationScheduler
+from scheduling.solver.metrics import compute_metrics
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.scheduler import Scheduler
+from scheduling.solver.scoring import objective_value
+from tests.conftest import make_roster
+
+# Spread over two days, so longer rosters still leave room to rest.
+START_HOURS = (0, 4, 6, 10, 16, 22, 28, 34, 40)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_matches_the_optimal_objective_of_scheduler(seed: int):
+    employees, shifts = make_roster(seed, num_shifts=8, start_hours=START_HOURS)
+    expected = Scheduler(employees=employees, shifts=shifts).solve_with_stats(
+        1000, SolverOptions(max_time_in_seconds=20)
+    )
+
+    result = ColumnGenerationScheduler(employees, shifts).solve(time_budget=20.0)
+
+    assert result.stats.status == expected.stats.status
+    if expected.stats.status == "optimal":
+        assert result.stats.objective_value == expected.stats.objective_value
+        assert result.stats.best_objective_bound >= result.stats.objective_value
+
+
+def test_solution_scores_and_metrics_match_the_scheduler():
+    employees, shifts = make_roster(3, num_employees=6, num_shifts=14, start_hours=START_HOURS)
+
+    engine = ColumnGenerationScheduler(employees, shifts)
+    result = engine.solve(time_budget=20.0)
+    solution = result.solutions[0]
+
+    assert result.stats.status == "optimal"
+    assigned = engine.problem.encode_assignments(solution.assignments)
+    assert objective_value(engine.problem, assigned) == result.stats.objective_value
+    assert solution.metrics == compute_metrics(engine.problem, assigned)
+    assert set(solution.assignments) == {shift.id for shift in shifts}
+    assert list(result.stats.phase_times) == ["precheck", "columns", "integer"]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_pricing_finds_the_best_pattern(seed: int):
+    employees, shifts = make_roster(seed, num_employees=3, num_shifts=9, start_hours=START_HOURS)
+    engine = ColumnGenerationScheduler(employees, shifts)
+    rng = random.Random(seed)
+    duals = [rng.uniform(-800, 1500) for _ in shifts]
+
+    for data in engine._employees():
+        best, found = data.price(duals, limit=5)
+        values = [
+            value - sum(duals[s] for s in pattern)
+            for k in range(len(data.shifts) + 1)
+            for pattern in itertools.combinations(data.shifts, k)
+            if (value := data.value(pattern)) is not None
+        ]
+
+        assert best == pytest.approx(max(values, default=float("-inf")))
+        for reduced, pattern in found:
+            assert reduced == pytest.approx(data.value(pattern) - sum(duals[s] for s in pattern))
+
+
+def test_progress_is_reported_each_round():
+    employees, shifts = make_roster(1, num_employees=5, num_shifts=12, start_hours=START_HOURS)
+    rounds = []
+
+    ColumnGenerationScheduler(employees, shifts).solve(time_budget=20.0, on_progress=rounds.append)
+
+    assert rounds
+    assert [p.iteration for p in rounds] == list(range(1, len(rounds) + 1))
+    assert rounds[-1].columns >= rounds[0].columns
+
+
+def test_impossible_hard_preference_is_infeasible():
+    shift = Shift(
+        id="bar",
+        name="Bar",
+        start_time=datetime(2024, 12, 2, 18),
+        end_time=datetime(2024, 12, 2, 23),
+        required_abilities=["bartender"],
+    )
+    employee = Employee(
+        id="alice",
+        name="Alice",
+        abilities=["bartender"],
+        preferences=[
+            UnavailablePeriodPreference(
+                start=datetime(2024, 12, 2, 17), end=datetime(2024, 12, 3), is_hard=True
+            )
+        ],
+    )
+
+    result = ColumnGenerationScheduler([employee], [shift]).solve(time_budget=5.0)
+
+    assert result.stats.status == "infeasible"
+    assert result.solutions == []
@@ -0,0 +1,348 @@
+"""Tests for the compiled, integer-indexed problem representation."""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from scheduling.models.employee import Employee
+from scheduling.models.preferences.prefer_period import PreferPeriodPreference
+from scheduling.models.preferences.prefer_shift import PreferShiftPreference
+from scheduling.models.preferences.unavailable import UnavailablePeriodPreference
+from scheduling.solver.metrics import compute_metrics
+from scheduling.solver.problem import (
+    PREFER_PERIOD,
+    PREFER_SHIFT,
+    UNASSIGNED,
+    UNAVAILABLE_PERIOD,
+    PreferenceColumns,
+    ProblemBuilder,
+    ProblemValidationError,
+    compile_columns,
+    compile_problem,
+    epoch_seconds,
+)
+from tests.conftest import make_shift
+
+
+class TestCompileProblem:
+    def test_shifts_are_indexed_by_start_time(self):
+        shifts = [
+            make_shift("late", 16, 22),
+            make_shift("early", 8, 14),
+            make_shift("next", 8, 14, day=26),
+        ]
+
+        problem = compile_problem([], shifts)
+
+        assert problem.shift_ids == ["early", "late", "next"]
+        assert problem.shift_index == {"early": 0, "late": 1, "next": 2}
+        assert problem.shift_start.dtype == np.int64
+        assert problem.shift_start[0] == epoch_seconds(datetime(2024, 12, 25, 8))
+        assert problem.max_shift_duration == 6 * 3600
+
+    def test_aware_and_naive_times_share_one_clock(self):
+        naive = datetime(2024, 12, 25, 8)
+        aware = datetime(2024, 12, 25, 10, tzinfo=timezone(timedelta(hours=2)))
+
+        assert epoch_seconds(naive) == epoch_seconds(aware)
+        assert epoch_seconds(naive) == int(naive.replace(tzinfo=timezone.utc).timestamp())
+
+    def test_qualified_employees_follow_ability_masks(self):
+        employees = [
+            Employee(id="alice", name="Alice", abilities=["waiter", "bartender"]),
+            Employee(id="bob", name="Bob", abilities=["waiter"]),
+            Employee(id="carol", name="Carol", abilities=["kitchen"]),
+        ]
+        shifts = [
+            make_shift("floor", 8, 14),
+            make_shift("bar", 10, 16, abilities=("waiter", "bartender")),
+            make_shift("any", 18, 20, abilities=()),
+        ]
+
+        problem = compile_problem(employees, shifts)
+
+        assert problem.qualified == [[0, 1], [0], [0, 1, 2]]
+
+    def test_preferences_become_typed_rows(self):
+        period_start = datetime(2024, 12, 25, 0)
+        employees = [
+            Employee(
+                id="alice",
+                name="Alice",
+                preferences=[
+                    PreferShiftPreference(shift_id="late"),
+                    UnavailablePeriodPreference(
+                        start=period_start, end=period_start + timedelta(hours=12)
+                    ),
+                ],
+            ),
+            Employee(
+                id="bob",
+                name="Bob",
+                preferences=[
+                    PreferPeriodPreference(
+                        start=period_start, end=period_start + timedelta(days=1)
+                    ),
+                    PreferShiftPreference(shift_id="missing", is_hard=True),
+                ],
+            ),
+        ]
+        shifts = [make_shift("late", 16, 22), make_shift("early", 8, 14)]
+
+        problem = compile_problem(employees, shifts, validate=False)
+
+        assert problem.pref_employee.tolist() == [0, 0, 1, 1]
+        assert problem.pref_kind.tolist() == [
+            PREFER_SHIFT,
+            UNAVAILABLE_PERIOD,
+            PREFER_PERIOD,
+            PREFER_SHIFT,
+        ]
+        assert problem.pref_hard.tolist() == [False, True, False, True]
+        assert problem.pref_shift.tolist() == [1, UNASSIGNED, UNASSIGNED, UNASSIGNED]
+        assert problem.pref_position.tolist() == [0, 1, 0, 1]
+        assert problem.pref_start[1] == epoch_seconds(period_start)
+
+    def test_empty_problem(self):
+        problem = compile_problem([], [])
+
+        assert problem.num_shifts == 0
+        assert problem.num_preferences == 0
+        assert [len(pairs) for pairs in problem.shift_pairs(12 * 3600)] == [0, 0, 0, 0]
+
+
+class TestProblemBuilder:
+    def test_preferences_may_name_shifts_added_later(self):
+        builder = ProblemBuilder()
+        builder.add_employee("alice", ["waiter"])
+        builder.add_prefer_shift("late", is_hard=True)
+        builder.add_shift("late", datetime(2024, 12, 25, 16), datetime(2024, 12, 25, 22))
+
+        problem = builder.build()
+
+        assert problem.pref_shift.tolist() == [0]
+        assert problem.pref_offsets.tolist() == [0, 1]
+
+    def test_collects_every_error(self):
+        builder = ProblemBuilder()
+        builder.add_shift("a", datetime(2024, 12, 25, 8), datetime(2024, 12, 25, 8))
+        builder.add_shift("a", datetime(2024, 12, 25, 9), datetime(2024, 12, 25, 10))
+        builder.add_employee("alice")
+        builder.add_prefer_period(datetime(2024, 12, 26), datetime(2024, 12, 25))
+        builder.add_prefer_shift("ghost")
+
+        with pytest.raises(ProblemValidationError) as exc_info:
+            builder.build()
+
+        assert exc_info.value.errors == [
+            "Shift 'a': end_time must be after start_time",
+            "Employee 'alice' preference 0: end must be after start",
+            "Duplicate shift id: 'a'",
+            "Employee 'alice' has preference for shift_id 'ghost' does not exist",
+        ]
+
+    def test_preference_before_any_employee_is_an_error(self):
+        builder = ProblemBuilder()
+
+        with pytest.raises(ProblemValidationError, match="before any employee"):
+            builder.add_prefer_period(datetime(2024, 12, 26), datetime(2024, 12, 25))
+        with pytest.raises(ProblemValidationError, match="before any employee"):
+            builder.add_prefer_shift("a")
+
+    def test_without_validation_duplicates_are_not_reported(self):
+        builder = ProblemBuilder()
+        builder.add_shift("a", datetime(2024, 12, 25, 8), datetime(2024, 12, 25, 14))
+        builder.add_shift("a", datetime(2024, 12, 25, 16), datetime(2024, 12, 25, 22))
+        builder.add_employee("alice")
+        builder.add_employee("alice")
+
+        problem = builder.build(validate=False)
+
+        assert problem.num_shifts == 2
+        assert problem.employee_index == {"alice": 0}
+
+    def test_times_convert_back_in_input_time_zone(self):
+        tz = timezone(timedelta(hours=2))
+        start = datetime(2024, 12, 25, 8, tzinfo=tz)
+        builder = ProblemBuilder()
+        builder.add_shift("a", start, start + timedelta(hours=6))
+
+        problem = builder.build()
+
+        converted = problem.to_datetime(int(problem.shift_start[0]))
+        assert converted == start
+        assert converted.utcoffset() == timedelta(hours=2)
+
+
+def _preference_columns(rows: list[tuple[int, int, bool, int, int, int]]) -> PreferenceColumns:
+    """Columns from (employee, kind, is_hard, shift, start, end) rows, positioned by row."""
+    columns = list(zip(*rows, strict=True)) if rows else [()] * 6
+    return PreferenceColumns(
+        employee=np.array(columns[0], dtype=np.int64),
+        kind=np.array(columns[1], dtype=np.int8),
+        hard=np.array(columns[2], dtype=bool),
+        shift=np.array(columns[3], dtype=np.int64),
+        start=np.array(columns[4], dtype=np.int64),
+        end=np.array(columns[5], dtype=np.int64),
+        position=np.arange(len(rows), dtype=np.int32),
+    )
+
+
+class TestCompileColumns:
+    def test_matches_compile_problem(self):
+        shifts = [
+            make_shift("late", 16, 22),
+            make_shift("early", 8, 14, abilities=("waiter", "bar")),
+        ]
+        employees = [
+            Employee(
+                id="alice",
+                name="Alice",
+                abilities=["waiter", "bar"],
+                preferences=[PreferShiftPreference(shift_id="late")],
+            ),
+            Employee(id="bob", name="Bob", abilities=["waiter"]),
+        ]
+        day = epoch_seconds(datetime(2024, 12, 25))
+
+        problem = compile_columns(
+            employee_ids=["alice", "bob"],
+            employee_abilities=[0b11, 0b01],
+            abilities=["waiter", "bar"],
+            shift_ids=["late", "early"],
+            starts=np.array([day + 16 * 3600, day + 8 * 3600]),
+            ends=np.array([day + 22 * 3600, day + 14 * 3600]),
+            requirements=[0b01, 0b11],
+            preferences=_preference_columns(
+                [
+                    (1, UNAVAILABLE_PERIOD, True, UNASSIGNED, day, day + 12 * 3600),
+                    (0, PREFER_SHIFT, False, 0, 0, 0),
+                ]
+            ),
+        )
+        expected = compile_problem(employees, shifts)
+
+        assert problem.shift_ids == expected.shift_ids == ["early", "late"]
+        assert problem.qualified == expected.qualified
+        assert problem.shift_start.tolist() == expected.shift_start.tolist()
+        # Rows are regrouped by employee; shift references follow the sort.
+        assert problem.pref_employee.tolist() == [0, 1]
+        assert problem.pref_shift.tolist() == [1, UNASSIGNED]
+        assert problem.pref_offsets.tolist() == [0, 1, 2]
+
+    def test_collects_every_error(self):
+        with pytest.raises(ProblemValidationError) as exc_info:
+            compile_columns(
+                employee_ids=["alice", "alice"],
+                employee_abilities=[0b100, 0],
+                abilities=["waiter"],
+                shift_ids=["a"],
+                starts=np.array([10]),
+                ends=np.array([5]),
+                requirements=[0],
+                preferences=_preference_columns(
+                    [
+                        (0, PREFER_SHIFT, False, 3, 0, 0),
+                        (5, PREFER_PERIOD, False, UNASSIGNED, 0, 10),
+                        (1, PREFER_PERIOD, False, UNASSIGNED, 10, 0),
+                    ]
+                ),
+            )
+
+        assert exc_info.value.errors == [
+            "Shift 'a': end_time must be after start_time",
+            "Ability bitsets must only use the 1 listed abilities",
+            "prefer_period preference 1: employee 5 does not exist",
+            "Employee 'alice' has preference for shift 3 does not exist",
+            "Employee 'alice' prefer_period preference 2: end must be after start",
+            "Duplicate employee id: 'alice'",
+        ]
+
+
+class TestShiftQueries:
+    def test_shifts_overlapping_period(self):
+        shifts = [
+            make_shift("night", 20, 23, day=24),
+            make_shift("early", 8, 14),
+            make_shift("late", 14, 22),
+            make_shift("next", 8, 14, day=26),
+        ]
+        problem = compile_problem([], shifts)
+        start = epoch_seconds(datetime(2024, 12, 25, 12))
+        end = epoch_seconds(datetime(2024, 12, 25, 14))
+
+        overlapping = problem.shifts_overlapping(start, end)
+
+        assert [problem.shift_ids[s] for s in overlapping] == ["early"]
+
+    def test_shift_pairs_split_overlap_and_short_rest(self):
+        shifts = [
+            make_shift("early", 8, 14),
+            make_shift("mid", 12, 18),
+            make_shift("late", 20, 23),
+            make_shift("far", 8, 14, day=27),
+        ]
+        problem = compile_problem([], shifts)
+
+        overlap_i, overlap_j, rest_i, rest_j = problem.shift_pairs(12 * 3600)
+
+        names = problem.shift_ids
+        assert [(names[i], names[j]) for i, j in zip(overlap_i, overlap_j, strict=True)] == [
+            ("early", "mid")
+        ]
+        assert [(names[i], names[j]) for i, j in zip(rest_i, rest_j, strict=True)] == [
+            ("early", "late"),
+            ("mid", "late"),
+        ]
+
+
+class TestComputeMetrics:
+    def test_counts_satisfied_soft_preferences(self):
+        employees = [
+            Employee(
+                id="alice",
+                name="Alice",
+                abilities=["waiter"],
+                preferences=[
+                    PreferShiftPreference(shift_id="late"),
+                    PreferPeriodPreference(
+                        start=datetime(2024, 12, 26, 0), end=datetime(2024, 12, 27, 0)
+                    ),
+                ],
+            ),
+            Employee(
+                id="bob",
+                name="Bob",
+                abilities=["waiter"],
+                preferences=[
+                    UnavailablePeriodPreference(
+                        start=datetime(2024, 12, 25, 0),
+                        end=datetime(2024, 12, 25, 12),
+                        is_hard=False,
+                    ),
+                ],
+            ),
+        ]
+        shifts = [make_shift("early", 8, 14), make_shift("late", 16, 22)]
+        problem = compile_problem(employees, shifts)
+
+        metrics = compute_metrics(
+            problem, problem.encode_assignments({"early": "alice", "late": "alice"})
+        )
+
+        assert metrics.soft_preference_score == 2
+        assert metrics.preferences_satisfied == {"prefer_shift": 1, "unavailable_period": 1}
+        assert metrics.total_shifts_assigned == 2
+        assert metrics.fairness_score == np.std([2, 0], ddof=1)
+
+    def test_round_trips_assignments(self):
+        employees = [Employee(id="alice", name="Alice"), Employee(id="bob", name="Bob")]
+        shifts = [make_shift("late", 16, 22), make_shift("early", 8, 14)]
+        problem = compile_problem(employees, shifts)
+        assignments = {"late": "bob"}
+
+        assigned = problem.encode_assignments(assignments)
+
+        assert assigned.tolist() == [UNASSIGNED, 1]
+        assert problem.decode_assignments(assigned) == assignments
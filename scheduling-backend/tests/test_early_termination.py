@@ -0,0 +1,143 @@
+"""Tests for the solver's early-termination rules."""
+
+import threading
+from datetime import datetime, timedelta
+
+from scheduling.models.employee import Employee
+from scheduling.models.preferences.prefer_shift import PreferShiftPreference
+from scheduling.models.shift import Shift
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.scheduler import Scheduler
+
+
+def _daily_shifts(count: int) -> list[Shift]:
+    """Shifts on separate weeks, so there are no overlaps or short-rest pairs."""
+    base = datetime(2024, 12, 2, 8, 0)
+    return [
+        Shift(
+            id=f"shift{i}",
+            name=f"Shift {i}",
+            start_time=base + timedelta(weeks=i),
+            end_time=base + timedelta(weeks=i, hours=6),
+            required_abilities=["waiter"],
+        )
+        for i in range(count)
+    ]
+
+
+def _waiters(count: int) -> list[Employee]:
+    return [
+        Employee(id=f"emp{i}", name=f"Employee {i}", abilities=["waiter"]) for i in range(count)
+    ]
+
+
+class TestEarlyTermination:
+    def test_stop_at_first_feasible(self):
+        scheduler = Scheduler(employees=_waiters(3), shifts=_daily_shifts(2))
+
+        result = scheduler.solve_with_stats(options=SolverOptions(stop_at_first_feasible=True))
+
+        assert len(result.solutions) == 1
+        assert result.stats.stop_reason == "first_feasible"
+        assert result.stats.hit_time_limit is False
+
+    def test_stop_at_objective_target(self):
+        employees = [
+            Employee(
+                id="alice",
+                name="Alice",
+                abilities=["waiter"],
+                preferences=[PreferShiftPreference(shift_id="shift0", is_hard=False)],
+            ),
+            *_waiters(3),
+        ]
+        scheduler = Scheduler(employees=employees, shifts=_daily_shifts(3))
+
+        result = scheduler.solve_with_stats(options=SolverOptions(objective_target=1000))
+
+        assert result.solutions[0].assignments["shift0"] == "alice"
+        assert result.stats.objective_value == 1000
+        assert result.stats.stop_reason == "objective_target"
+
+    def test_stall_timeout_stops_enumeration(self):
+        # 8^6 solutions without an objective: enumeration never improves, so the
+        # stall timer ends the search long before the time limit.
+        scheduler = Scheduler(employees=_waiters(8), shifts=_daily_shifts(6))
+
+        result = scheduler.solve_with_stats(
+            max_solutions=0,
+            options=SolverOptions(stall_timeout=0.2, max_time_in_seconds=30.0),
+        )
+
+        assert result.stats.stop_reason == "stall_timeout"
+        assert result.stats.hit_time_limit is False
+        assert result.stats.wall_time < 10.0
+        assert len(result.solutions) >= 1
+
+    def test_stop_at_relative_gap(self):
+        employees = [
+            Employee(
+                id=f"emp{i}",
+                name=f"Employee {i}",
+                abilities=["waiter"],
+                preferences=[
+                    PreferShiftPreference(shift_id=f"shift{(i + k) % 6}", is_hard=False)
+                    for k in range(2)
+                ],
+            )
+            for i in range(8)
+        ]
+        scheduler = Scheduler(employees=employees, shifts=_daily_shifts(6))
+
+        result = scheduler.solve_with_stats(
+            max_solutions=0, options=SolverOptions(relative_gap_limit=0.5)
+        )
+
+        assert result.stats.stop_reason == "gap_limit"
+        assert result.stats.gap <= 0.5
+        assert result.stats.hit_time_limit is False
+
+    def test_default_options_keep_existing_behaviour(self):
+        scheduler = Scheduler(employees=_waiters(3), shifts=_daily_shifts(1))
+
+        result = scheduler.solve_with_stats()
+
+        assert len(result.solutions) == 3
+        assert result.stats.stop_reason is None
+
+
+class TestCancellation:
+    def test_cancel_from_another_thread_keeps_partial_solutions(self):
+        scheduler = Scheduler(employees=_waiters(8), shifts=_daily_shifts(6))
+        timer = threading.Timer(0.3, scheduler.cancel)
+        timer.start()
+
+        result = scheduler.solve_with_stats(
+            max_solutions=0, options=SolverOptions(max_time_in_seconds=30.0)
+        )
+        timer.cancel()
+
+        assert result.stats.stop_reason == "cancelled"
+        assert result.stats.hit_time_limit is False
+        assert result.stats.wall_time < 10.0
+        assert len(result.solutions) >= 1
+
+    def test_cancel_before_solve_returns_immediately(self):
+        scheduler = Scheduler(employees=_waiters(3), shifts=_daily_shifts(2))
+        scheduler.cancel("deadline")
+
+        result = scheduler.solve_with_stats()
+
+        assert result.stats.stop_reason == "deadline"
+        assert result.stats.status == "unknown"
+        assert result.solutions == []
+
+    def test_cancel_does_not_stop_later_solves(self):
+        scheduler = Scheduler(employees=_waiters(3), shifts=_daily_shifts(2))
+        scheduler.cancel()
+        scheduler.solve_with_stats()
+
+        result = scheduler.solve_with_stats()
+
+        assert result.stats.stop_reason is None
+        assert len(result.solutions) == 9
@@ -0,0 +1,105 @@
+"""Tests for estimating a problem's model size and solve cost."""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from ortools.sat.python import cp_model
+
+from scheduling.models.employee import Employee
+from scheduling.models.preferences.prefer_period import PreferPeriodPreference
+from scheduling.models.preferences.prefer_shift import PreferShiftPreference
+from scheduling.models.preferences.unavailable import UnavailablePeriodPreference
+from scheduling.models.shift import Shift
+from scheduling.solver.bulk import build_bulk_model
+from scheduling.solver.estimate import MEMORY_BASE_BYTES, estimate_problem
+from scheduling.solver.problem import compile_problem
+from scheduling.solver.scheduler import Scheduler
+
+ABILITIES = ["waiter", "bartender", "kitchen"]
+
+
+def _roster(num_employees: int, num_days: int, seed: int = 0):
+    """Overlapping shifts of mixed abilities, with every kind of preference."""
+    rng = random.Random(seed)
+    base = datetime(2024, 12, 2)
+    shifts = []
+    for day in range(num_days):
+        for k in range(4):
+            start = base + timedelta(days=day, hours=rng.choice([6, 10, 14, 18, 20]))
+            shifts.append(
+                Shift(
+                    id=f"s{day}_{k}",
+                    name=f"Shift {day}/{k}",
+                    start_time=start,
+                    end_time=start + timedelta(hours=rng.choice([4, 6, 8])),
+                    required_abilities=[rng.choice(ABILITIES)],
+                )
+            )
+    employees = []
+    for i in range(num_employees):
+        day = base + timedelta(days=rng.randrange(num_days))
+        preferences = [
+            PreferShiftPreference(shift_id=rng.choice(shifts).id, is_hard=rng.random() < 0.3),
+            PreferPeriodPreference(start=day, end=day + timedelta(days=1)),
+            UnavailablePeriodPreference(
+                start=day, end=day + timedelta(hours=12), is_hard=rng.random() < 0.5
+            ),
+        ]
+        employees.append(
+            Employee(
+                id=f"e{i}",
+                name=f"Employee {i}",
+                abilities=rng.sample(ABILITIES, rng.choice([1, 2, 3])),
+                preferences=preferences,
+            )
+        )
+    return employees, shifts
+
+
+@pytest.mark.parametrize(("num_employees", "num_days"), [(5, 3), (20, 7)])
+def test_counts_match_the_built_model(num_employees: int, num_days: int):
+    problem = compile_problem(*_roster(num_employees, num_days))
+    model = cp_model.CpModel()
+    Scheduler.from_problem(problem).build_model(model)
+    proto = model.Proto()
+
+    estimate = estimate_problem(problem)
+
+    # Period preferences are counted against every shift they could overlap,
+    # so the estimate may be slightly high but never low.
+    assert len(proto.variables) <= estimate.variables <= len(proto.variables) * 1.05
+    assert len(proto.constraints) <= estimate.constraints <= len(proto.constraints) * 1.1
+    assert estimate.overlap_pairs > 0
+    assert estimate.rest_pairs > 0
+
+
+def test_bulk_counts_match_the_bulk_built_model():
+    problem = compile_problem(*_roster(20, 7))
+    model = cp_model.CpModel()
+    build_bulk_model(problem, model)
+    proto = model.Proto()
+
+    estimate = estimate_problem(problem, bulk_build=True)
+
+    assert len(proto.variables) <= estimate.variables <= len(proto.variables) * 1.05
+    assert len(proto.constraints) <= estimate.constraints <= len(proto.constraints) * 1.1
+    assert estimate.constraints < estimate_problem(problem, bulk_build=False).constraints
+
+
+def test_solve_time_is_capped_by_the_time_limit():
+    problem = compile_problem(*_roster(20, 7))
+
+    estimate = estimate_problem(problem, max_time_in_seconds=0.001, num_workers=1)
+
+    assert estimate.solve_seconds == 0.001
+    assert estimate.cpu_seconds == pytest.approx(estimate.build_seconds + 0.001)
+
+
+def test_memory_grows_with_workers():
+    problem = compile_problem(*_roster(5, 3))
+
+    one = estimate_problem(problem, num_workers=1)
+    four = estimate_problem(problem, num_workers=4)
+
+    assert MEMORY_BASE_BYTES < one.memory_bytes < four.memory_bytes
@@ -0,0 +1,155 @@
+"""Tests for the combinatorial feasibility pre-check."""
+
+from datetime import datetime
+
+from scheduling.models.employee import Employee
+from scheduling.models.preferences.prefer_shift import PreferShiftPreference
+from scheduling.models.preferences.unavailable import UnavailablePeriodPreference
+from scheduling.solver.feasibility import _hopcroft_karp
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.scheduler import Scheduler
+from tests.conftest import check_feasibility, make_shift
+
+
+class TestUncoverableShifts:
+    def test_no_qualified_employee(self):
+        employees = [Employee(id="alice", name="Alice", abilities=["waiter"])]
+        shifts = [make_shift("bar", 8, 14, abilities=("bartender",))]
+
+        report = check_feasibility(employees, shifts)
+
+        assert not report.feasible
+        assert [(u.shift_id, u.reason) for u in report.uncoverable_shifts] == [
+            ("bar", "no_qualified_employee")
+        ]
+
+    def test_everyone_qualified_is_unavailable(self):
+        employees = [
+            Employee(
+                id="alice",
+                name="Alice",
+                abilities=["waiter"],
+                preferences=[
+                    UnavailablePeriodPreference(
+                        start=datetime(2024, 12, 25, 0, 0), end=datetime(2024, 12, 26, 0, 0)
+                    )
+                ],
+            )
+        ]
+        shifts = [make_shift("christmas", 8, 14)]
+
+        report = check_feasibility(employees, shifts)
+
+        assert report.uncoverable_shifts[0].reason == "no_available_employee"
+
+    def test_conflicting_hard_shift_preferences(self):
+        employees = [
+            Employee(
+                id=name,
+                name=name,
+                abilities=["waiter"],
+                preferences=[PreferShiftPreference(shift_id="morning", is_hard=True)],
+            )
+            for name in ("alice", "bob")
+        ]
+        shifts = [make_shift("morning", 8, 14)]
+
+        report = check_feasibility(employees, shifts)
+
+        assert report.uncoverable_shifts[0].reason == "conflicting_hard_preferences"
+
+
+class TestBottlenecks:
+    def test_too_few_staff_for_peak(self):
+        employees = [
+            Employee(id="alice", name="Alice", abilities=["waiter"]),
+            Employee(id="bob", name="Bob", abilities=["waiter"]),
+        ]
+        shifts = [
+            make_shift("a", 8, 14),
+            make_shift("b", 10, 16),
+            make_shift("c", 12, 18),
+            make_shift("d", 18, 22),
+        ]
+
+        report = check_feasibility(employees, shifts)
+
+        assert not report.feasible
+        assert len(report.bottlenecks) == 1
+        window = report.bottlenecks[0]
+        assert set(window.shift_ids) == {"a", "b", "c"}
+        assert (window.required, window.available) == (3, 2)
+        assert window.start == datetime(2024, 12, 25, 12, 0)
+        assert window.end == datetime(2024, 12, 25, 14, 0)
+        assert len(window.unmatched_shift_ids) == 1
+
+    def test_matching_detects_ability_bottleneck(self):
+        # Three people for two overlapping shifts, but only alice can bartend
+        # and alice is also the only one who can run the kitchen.
+        employees = [
+            Employee(id="alice", name="Alice", abilities=["bartender", "kitchen"]),
+            Employee(id="bob", name="Bob", abilities=["waiter"]),
+            Employee(id="carol", name="Carol", abilities=["waiter"]),
+        ]
+        shifts = [
+            make_shift("bar", 8, 14, abilities=("bartender",)),
+            make_shift("kitchen", 10, 16, abilities=("kitchen",)),
+        ]
+
+        report = check_feasibility(employees, shifts)
+
+        assert not report.uncoverable_shifts
+        assert report.bottlenecks[0].available == 1
+
+    def test_back_to_back_shifts_do_not_overlap(self):
+        employees = [Employee(id="alice", name="Alice", abilities=["waiter"])]
+        shifts = [make_shift("a", 8, 14), make_shift("b", 14, 20)]
+
+        assert check_feasibility(employees, shifts).feasible
+
+    def test_feasible_problem_passes(self):
+        employees = [
+            Employee(id="alice", name="Alice", abilities=["waiter"]),
+            Employee(id="bob", name="Bob", abilities=["waiter"]),
+        ]
+        shifts = [make_shift("a", 8, 14), make_shift("b", 10, 16), make_shift("c", 16, 20)]
+
+        report = check_feasibility(employees, shifts)
+
+        assert report.feasible
+        assert report.bottlenecks == []
+
+
+class TestMatching:
+    def test_long_augmenting_path(self):
+        # Shift i first tries employee i, so the last shift, which only
+        # employee 0 may take, is matched along a path through every shift.
+        n = 5000
+        adjacency = [[i, i + 1] for i in range(n - 1)] + [[0]]
+
+        matching = _hopcroft_karp(adjacency)
+
+        assert sorted(matching) == list(range(n))
+
+
+class TestSchedulerPrecheck:
+    def test_infeasible_problem_skips_solver(self):
+        employees = [Employee(id="alice", name="Alice", abilities=["waiter"])]
+        shifts = [make_shift("a", 8, 14), make_shift("b", 10, 16)]
+
+        result = Scheduler(employees=employees, shifts=shifts).solve_with_stats()
+
+        assert result.stats.status == "infeasible"
+        assert result.feasibility is not None
+        assert result.feasibility.bottlenecks[0].required == 2
+
+    def test_precheck_can_be_disabled(self):
+        employees = [Employee(id="alice", name="Alice", abilities=["waiter"])]
+        shifts = [make_shift("a", 8, 14), make_shift("b", 10, 16)]
+
+        result = Scheduler(employees=employees, shifts=shifts).solve_with_stats(
+            options=SolverOptions(precheck=False)
+        )
+
+        assert result.stats.status == "infeasible"
+        assert result.feasibility is None
@@ -0,0 +1,145 @@
+"""Tests for the greedy construction heuristic."""
+
+from datetime import datetime
+
+from scheduling.models.employee import Employee
+from scheduling.models.preferences.prefer_period import PreferPeriodPreference
+from scheduling.models.preferences.prefer_shift import PreferShiftPreference
+from scheduling.models.preferences.unavailable import UnavailablePeriodPreference
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.scheduler import Scheduler
+from tests.conftest import greedy_assignments, greedy_solution, make_shift
+
+
+class TestGreedyAssignments:
+    def test_most_constrained_shift_filled_first(self):
+        # Only alice can bartend; if the waiter shift were filled first it could
+        # take alice and leave the overlapping bar shift uncovered.
+        employees = [
+            Employee(id="alice", name="Alice", abilities=["waiter", "bartender"]),
+            Employee(id="bob", name="Bob", abilities=["waiter"]),
+        ]
+        shifts = [
+            make_shift("floor", 8, 14),
+            make_shift("bar", 10, 16, abilities=("bartender",)),
+        ]
+
+        assignments = greedy_assignments(employees, shifts)
+
+        assert assignments == {"bar": "alice", "floor": "bob"}
+
+    def test_never_assigns_overlapping_shifts(self):
+        employees = [Employee(id="alice", name="Alice", abilities=["waiter"])]
+        shifts = [make_shift("a", 8, 14), make_shift("b", 12, 18), make_shift("c", 18, 22)]
+
+        assignments = greedy_assignments(employees, shifts)
+
+        assert "c" in assignments
+        assert len(assignments) == 2
+
+    def test_respects_hard_unavailability_and_soft_preferences(self):
+        employees = [
+            Employee(
+                id="alice",
+                name="Alice",
+                abilities=["waiter"],
+                preferences=[
+                    UnavailablePeriodPreference(
+                        start=datetime(2024, 12, 25, 0, 0), end=datetime(2024, 12, 26, 0, 0)
+                    )
+                ],
+            ),
+            Employee(
+                id="bob",
+                name="Bob",
+                abilities=["waiter"],
+                preferences=[PreferShiftPreference(shift_id="boxing_day")],
+            ),
+            Employee(id="carol", name="Carol", abilities=["waiter"]),
+        ]
+        shifts = [make_shift("christmas", 8, 14), make_shift("boxing_day", 8, 14, day=26)]
+
+        assignments = greedy_assignments(employees, shifts)
+
+        assert assignments["christmas"] != "alice"
+        assert assignments["boxing_day"] == "bob"
+
+    def test_spreads_load_and_avoids_short_rest(self):
+        employees = [
+            Employee(id="alice", name="Alice", abilities=["waiter"]),
+            Employee(id="bob", name="Bob", abilities=["waiter"]),
+        ]
+        shifts = [make_shift("late", 16, 23), make_shift("early", 6, 12, day=26)]
+
+        assignments = greedy_assignments(employees, shifts)
+
+        assert assignments["late"] != assignments["early"]
+
+
+class TestGreedySolution:
+    def test_returns_none_when_coverage_impossible(self):
+        employees = [Employee(id="alice", name="Alice", abilities=["waiter"])]
+        shifts = [make_shift("bar", 8, 14, abilities=("bartender",))]
+
+        assert greedy_solution(employees, shifts) is None
+
+    def test_returns_none_when_hard_period_preference_missed(self):
+        employees = [
+            Employee(
+                id="alice",
+                name="Alice",
+                abilities=["waiter"],
+                preferences=[
+                    PreferPeriodPreference(
+                        start=datetime(2024, 12, 25, 0, 0),
+                        end=datetime(2024, 12, 26, 0, 0),
+                        is_hard=True,
+                    )
+                ],
+            ),
+            Employee(
+                id="bob",
+                name="Bob",
+                abilities=["waiter"],
+                preferences=[PreferShiftPreference(shift_id="christmas", is_hard=True)],
+            ),
+        ]
+        shifts = [make_shift("christmas", 8, 14)]
+
+        assert greedy_solution(employees, shifts) is None
+
+    def test_solution_includes_metrics(self):
+        employees = [
+            Employee(
+                id="alice",
+                name="Alice",
+                abilities=["waiter"],
+                preferences=[PreferShiftPreference(shift_id="a")],
+            )
+        ]
+        shifts = [make_shift("a", 8, 14)]
+
+        solution = greedy_solution(employees, shifts)
+
+        assert solution is not None
+        assert solution.metrics.soft_preference_score == 1
+
+
+class TestGreedyHint:
+    def test_hinted_and_unhinted_solves_agree_on_objective(self):
+        employees = [
+            Employee(
+                id=f"emp{i}",
+                name=f"Employee {i}",
+                abilities=["waiter"],
+                preferences=[PreferShiftPreference(shift_id=f"s{i}")],
+            )
+            for i in range(4)
+        ]
+        shifts = [make_shift(f"s{i}", 8, 14, day=20 + i) for i in range(4)]
+        scheduler = Scheduler(employees=employees, shifts=shifts)
+
+        hinted = scheduler.solve_with_stats(options=SolverOptions(greedy_hint=True))
+        plain = scheduler.solve_with_stats(options=SolverOptions(greedy_hint=False))
+
+        assert hinted.stats.objective_value == plain.stats.objective_value == 4000
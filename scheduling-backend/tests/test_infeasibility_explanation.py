@@ -0,0 +1,109 @@
+"""Tests for explaining infeasible problems with assumption cores."""
+
+from datetime import datetime
+
+from scheduling.models.employee import Employee
+from scheduling.models.preferences.prefer_period import PreferPeriodPreference
+from scheduling.models.preferences.prefer_shift import PreferShiftPreference
+from scheduling.models.preferences.unavailable import UnavailablePeriodPreference
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.scheduler import Scheduler
+from tests.conftest import make_shift
+
+
+class TestExplainInfeasibility:
+    def test_conflicting_hard_preferences_of_one_employee(self):
+        employees = [
+            Employee(
+                id="alice",
+                name="Alice",
+                abilities=["waiter"],
+                preferences=[
+                    PreferPeriodPreference(
+                        start=datetime(2024, 12, 27, 0, 0),
+                        end=datetime(2024, 12, 28, 0, 0),
+                        is_hard=True,
+                    ),
+                    PreferShiftPreference(shift_id="christmas", is_hard=True),
+                    UnavailablePeriodPreference(
+                        start=datetime(2024, 12, 25, 0, 0), end=datetime(2024, 12, 26, 0, 0)
+                    ),
+                ],
+            ),
+            Employee(id="bob", name="Bob", abilities=["waiter"]),
+        ]
+        shifts = [make_shift("christmas", 8, 14), make_shift("friday", 8, 14, day=27)]
+
+        conflicts = Scheduler(employees=employees, shifts=shifts).explain_infeasibility()
+
+        assert sorted((c.kind, c.employee_id, c.preference_index) for c in conflicts) == [
+            ("preference", "alice", 1),
+            ("preference", "alice", 2),
+        ]
+        prefer_shift = next(c for c in conflicts if c.preference_index == 1)
+        assert prefer_shift.preference_type == "prefer_shift"
+        assert prefer_shift.shift_id == "christmas"
+
+    def test_core_includes_coverage_constraints(self):
+        employees = [
+            Employee(
+                id="alice",
+                name="Alice",
+                abilities=["waiter"],
+                preferences=[
+                    UnavailablePeriodPreference(
+                        start=datetime(2024, 12, 25, 0, 0), end=datetime(2024, 12, 26, 0, 0)
+                    )
+                ],
+            ),
+        ]
+        shifts = [make_shift("christmas", 8, 14), make_shift("friday", 8, 14, day=27)]
+
+        conflicts = Scheduler(employees=employees, shifts=shifts).explain_infeasibility()
+
+        assert sorted((c.kind, c.shift_id, c.employee_id) for c in conflicts) == [
+            ("coverage", "christmas", None),
+            ("preference", None, "alice"),
+        ]
+
+    def test_feasible_problem_has_no_conflicts(self):
+        employees = [Employee(id="alice", name="Alice", abilities=["waiter"])]
+        shifts = [make_shift("morning", 8, 14)]
+
+        assert Scheduler(employees=employees, shifts=shifts).explain_infeasibility() == []
+
+    def test_solve_attaches_conflicts_on_request(self):
+        employees = [
+            Employee(
+                id="alice",
+                name="Alice",
+                abilities=["waiter"],
+                preferences=[
+                    PreferPeriodPreference(
+                        start=datetime(2024, 12, 27, 0, 0),
+                        end=datetime(2024, 12, 28, 0, 0),
+                        is_hard=True,
+                    ),
+                ],
+            ),
+            Employee(
+                id="bob",
+                name="Bob",
+                abilities=["waiter"],
+                preferences=[PreferShiftPreference(shift_id="friday", is_hard=True)],
+            ),
+        ]
+        shifts = [make_shift("friday", 8, 14, day=27)]
+        scheduler = Scheduler(employees=employees, shifts=shifts)
+
+        plain = scheduler.solve_with_stats()
+        explained = scheduler.solve_with_stats(options=SolverOptions(explain_infeasibility=True))
+
+        assert plain.stats.status == "infeasible"
+        assert plain.conflicts == []
+        # Without the coverage rule both could work the shift.
+        assert {(c.kind, c.employee_id, c.preference_type) for c in explained.conflicts} == {
+            ("coverage", None, None),
+            ("preference", "alice", "prefer_period"),
+            ("preference", "bob", "prefer_shift"),
+        }
@@ -0,0 +1,164 @@
+"""Tests for the interactive and batch solve lanes."""
+
+import asyncio
+from datetime import datetime, timedelta
+from functools import partial
+
+from scheduling.api.lanes import SolveQueue
+from scheduling.models.employee import Employee
+from scheduling.models.shift import Shift
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.scheduler import Scheduler
+
+
+def _run_jobs(queue: SolveQueue, jobs: list[tuple[str, str, float]]) -> list[str]:
+    """Queue (lane, tenant, cost) jobs behind one running solve; return their start order."""
+    started: list[str] = []
+
+    async def job(lane, tenant, cost, name):
+        async with queue.slot(lane, tenant, cost, lambda: None):
+            started.append(name)
+            await asyncio.sleep(0)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def blocker():
+            async with queue.slot("interactive", "blocker", 1.0, lambda: None):
+                await release.wait()
+
+        tasks = [asyncio.create_task(blocker())]
+        await asyncio.sleep(0)
+        for i, (lane, tenant, cost) in enumerate(jobs):
+            tasks.append(asyncio.create_task(job(lane, tenant, cost, f"{tenant}{i}")))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    return started
+
+
+def test_interactive_work_starts_before_batch_work():
+    queue = SolveQueue(slots=1, preemption=False)
+
+    started = _run_jobs(
+        queue, [("batch", "nightly", 1.0), ("interactive", "venue", 1.0), ("batch", "x", 1.0)]
+    )
+
+    assert started == ["venue1", "nightly0", "x2"]
+
+
+def test_tenants_take_turns():
+    started = _run_jobs(
+        SolveQueue(slots=1), [("interactive", "a", 1.0)] * 3 + [("interactive", "b", 1.0)] * 2
+    )
+
+    assert started == ["a0", "b3", "a1", "b4", "a2"]
+
+
+def test_tenant_weights_and_costs_scale_their_share():
+    weighted = _run_jobs(
+        SolveQueue(slots=1, weights={"big": 2.0}),
+        [("interactive", "big", 1.0)] * 4 + [("interactive", "small", 1.0)] * 2,
+    )
+    costly = _run_jobs(
+        SolveQueue(slots=1), [("batch", "slow", 3.0)] * 2 + [("batch", "fast", 1.0)] * 3
+    )
+
+    assert weighted == ["big0", "big1", "small4", "big2", "big3", "small5"]
+    assert costly == ["fast2", "fast3", "slow0", "fast4", "slow1"]
+
+
+def test_idle_tenants_are_forgotten():
+    queue = SolveQueue(slots=1)
+
+    started = _run_jobs(
+        queue,
+        [("interactive", f"once{i}", 1.0) for i in range(5)] + [("interactive", "busy", 1.0)] * 5,
+    )
+
+    assert started[-1] == "busy9"
+    assert queue._lanes["interactive"].finish_tags == {"busy": 5.0}
+
+
+def test_batch_work_leaves_reserved_slots_free():
+    queue = SolveQueue(slots=3, reserved=1)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def batch():
+            async with queue.slot("batch", "nightly", 1.0, lambda: None):
+                await release.wait()
+
+        tasks = [asyncio.create_task(batch()) for _ in range(3)]
+        await asyncio.sleep(0)
+        stats = queue.stats()
+        async with queue.slot("interactive", "venue", 1.0, lambda: None, timeout=0) as granted:
+            assert granted
+        release.set()
+        await asyncio.gather(*tasks)
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert (stats["batch"].running, stats["batch"].waiting, stats["batch"].slots) == (2, 1, 2)
+    assert stats["batch"].waiting_by_tenant == {"nightly": 1}
+
+
+def test_no_slot_within_the_timeout():
+    queue = SolveQueue(slots=1, preemption=False)
+
+    async def run():
+        async with (
+            queue.slot("batch", "nightly", 1.0, lambda: None),
+            queue.slot("interactive", "venue", 1.0, lambda: None, timeout=0.05) as granted,
+        ):
+            return granted
+
+    assert asyncio.run(run()) is False
+    assert queue.stats()["interactive"].waiting == 0
+
+
+def _busy_scheduler() -> Scheduler:
+    """Far more equally good solutions than a test can enumerate."""
+    base = datetime(2024, 12, 2, 8, 0)
+    shifts = [
+        Shift(
+            id=f"shift{i}",
+            name=f"Shift {i}",
+            start_time=base + timedelta(days=i),
+            end_time=base + timedelta(days=i, hours=2),
+            required_abilities=["waiter"],
+        )
+        for i in range(8)
+    ]
+    employees = [
+        Employee(id=f"emp{i}", name=f"Employee {i}", abilities=["waiter"]) for i in range(8)
+    ]
+    return Scheduler(employees, shifts)
+
+
+def test_interactive_work_preempts_batch_solves():
+    queue = SolveQueue(slots=1)
+    scheduler = _busy_scheduler()
+
+    async def batch():
+        async with queue.slot("batch", "nightly", 1.0, partial(scheduler.cancel, "preempted")):
+            return await asyncio.to_thread(
+                scheduler.solve_with_stats, 10_000_000, SolverOptions(max_time_in_seconds=30)
+            )
+
+    async def run():
+        task = asyncio.create_task(batch())
+        await asyncio.sleep(0.5)
+        async with queue.slot("interactive", "venue", 1.0, lambda: None):
+            return await task
+
+    result = asyncio.run(run())
+
+    assert result.stats.stop_reason == "preempted"
+    assert result.solutions
+    assert queue.stats()["batch"].preempted == 1
+    assert result.stats.wall_time < 30
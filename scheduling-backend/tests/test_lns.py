@@ -0,0 +1,168 @@
+"""Tests for the Large Neighborhood Search engine."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from scheduling.models.employee import Employee
+from scheduling.models.preferences.prefer_period import PreferPeriodPreference
+from scheduling.models.preferences.prefer_shift import PreferShiftPreference
+from scheduling.models.preferences.unavailable import UnavailablePeriodPreference
+from scheduling.models.shift import Shift
+from scheduling.solver.lns import LnsScheduler
+from scheduling.solver.problem import UNASSIGNED, compile_problem
+from scheduling.solver.scheduler import Scheduler
+from scheduling.solver.scoring import objective_value
+
+BASE = datetime(2024, 12, 2)
+
+
+def _week() -> tuple[list[Employee], list[Shift]]:
+    """A week of morning and evening shifts with a mix of preferences."""
+    shifts = []
+    for day in range(7):
+        for name, hour in (("morning", 8), ("evening", 18)):
+            start = BASE + timedelta(days=day, hours=hour)
+            shifts.append(
+                Shift(
+                    id=f"d{day}_{name}",
+                    name=f"Day {day} {name}",
+                    start_time=start,
+                    end_time=start + timedelta(hours=6),
+                    required_abilities=["waiter"],
+                )
+            )
+    employees = [
+        Employee(
+            id="alice",
+            name="Alice",
+            abilities=["waiter"],
+            preferences=[
+                PreferShiftPreference(shift_id="d0_evening"),
+                PreferShiftPreference(shift_id="d1_morning"),
+            ],
+        ),
+        Employee(
+            id="bob",
+            name="Bob",
+            abilities=["waiter"],
+            preferences=[
+                PreferPeriodPreference(
+                    start=BASE + timedelta(days=3), end=BASE + timedelta(days=4)
+                ),
+                UnavailablePeriodPreference(
+                    start=BASE + timedelta(days=5), end=BASE + timedelta(days=6)
+                ),
+            ],
+        ),
+        Employee(
+            id="carol",
+            name="Carol",
+            abilities=["waiter"],
+            preferences=[
+                UnavailablePeriodPreference(
+                    start=BASE, end=BASE + timedelta(days=2), is_hard=False
+                ),
+                PreferShiftPreference(shift_id="d6_morning"),
+            ],
+        ),
+        Employee(id="dave", name="Dave", abilities=["waiter"]),
+    ]
+    return employees, shifts
+
+
+class TestObjectiveValue:
+    def test_matches_solver_objective(self):
+        employees, shifts = _week()
+
+        problem = compile_problem(employees, shifts)
+
+        result = Scheduler.from_problem(problem).solve_with_stats(max_solutions=1)
+
+        assigned = problem.encode_assignments(result.solutions[0].assignments)
+        assert objective_value(problem, assigned) == result.stats.objective_value
+
+
+class TestRestrictedModel:
+    def test_only_active_shifts_are_scheduled_and_fixed_ones_keep_their_employee(self):
+        problem = compile_problem(*_week())
+        scheduler = Scheduler.from_problem(problem)
+        assigned = problem.encode_assignments(scheduler.solve(max_solutions=1)[0].assignments)
+        active = np.zeros(problem.num_shifts, dtype=bool)
+        active[:4] = True
+        fixed = np.full(problem.num_shifts, UNASSIGNED)
+        fixed[2:4] = assigned[2:4]
+
+        model = cp_model.CpModel()
+        assign_vars, _ = scheduler.build_model(model, active, fixed)
+        solver = cp_model.CpSolver()
+
+        assert {shift for _, shift in assign_vars} == {0, 1, 2, 3}
+        assert {key for key in assign_vars if key[1] >= 2} == {
+            (int(assigned[2]), 2),
+            (int(assigned[3]), 3),
+        }
+        assert solver.Solve(model) == cp_model.OPTIMAL
+
+
+class TestLnsScheduler:
+    def test_reaches_full_solve_objective(self):
+        employees, shifts = _week()
+        full = Scheduler(employees=employees, shifts=shifts).solve_with_stats()
+
+        result = LnsScheduler(employees, shifts, neighborhood_size=6).solve(
+            time_budget=10.0, max_iterations=40
+        )
+
+        assert result.stats.objective_value == full.stats.objective_value
+        assert len(result.solutions) == 1
+        assert set(result.solutions[0].assignments) == {s.id for s in shifts}
+
+    def test_keeps_hard_constraints(self):
+        employees, shifts = _week()
+
+        result = LnsScheduler(employees, shifts, neighborhood_size=4).solve(
+            time_budget=5.0, max_iterations=20
+        )
+
+        # Bob is hard-unavailable on day 5.
+        assignments = result.solutions[0].assignments
+        assert assignments["d5_morning"] != "bob"
+        assert assignments["d5_evening"] != "bob"
+
+    def test_reports_progress_and_never_gets_worse(self):
+        employees, shifts = _week()
+        # Start from a deliberately poor schedule: dave works everything he can.
+        initial = {s.id: ("dave" if s.id.endswith("morning") else "bob") for s in shifts}
+        initial["d5_evening"] = "dave"
+        initial["d5_morning"] = "alice"
+        progress = []
+
+        result = LnsScheduler(employees, shifts, neighborhood_size=6).solve(
+            time_budget=10.0, initial=initial, max_iterations=15, on_progress=progress.append
+        )
+
+        assert len(progress) == 15
+        objectives = [p.objective for p in progress]
+        assert objectives == sorted(objectives)
+        problem = compile_problem(employees, shifts)
+        assert objectives[-1] > objective_value(problem, problem.encode_assignments(initial))
+        assert result.stats.objective_value == objectives[-1]
+
+    def test_no_start_when_infeasible(self):
+        employees = [Employee(id="alice", name="Alice", abilities=["waiter"])]
+        shifts = [
+            Shift(
+                id="bar",
+                name="Bar",
+                start_time=BASE,
+                end_time=BASE + timedelta(hours=6),
+                required_abilities=["bartender"],
+            )
+        ]
+
+        result = LnsScheduler(employees, shifts).solve(time_budget=2.0)
+
+        assert result.solutions == []
+        assert result.stats.status == "infeasible"
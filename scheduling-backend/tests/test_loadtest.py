@@ -0,0 +1,112 @@
+"""Tests for the load generator."""
+
+import socket
+import threading
+import time
+
+import orjson
+import pytest
+import uvicorn
+
+from scheduling.api.app import app
+from scheduling.api.convert import compile_request, parse_request
+from scheduling.api.recorder import FlightRecorder
+from scheduling.api.store import MemoryStore
+from scheduling.loadtest import (
+    LoadRequest,
+    generate_request,
+    percentile,
+    read_captures,
+    run_load,
+    size_bucket,
+    summarize,
+)
+from scheduling.solver.scheduler import Scheduler
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    saved = app.state.store, app.state.recorder
+    app.state.store, app.state.recorder = MemoryStore(), None
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="error", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(timeout=10)
+    app.state.store, app.state.recorder = saved
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_size_buckets_are_powers_of_two():
+    assert size_bucket(100) == "<=1KiB"
+    assert size_bucket(3 * 1024) == "<=4KiB"
+    assert size_bucket(4 * 1024 + 1) == "<=8KiB"
+
+
+def test_generated_request_compiles():
+    problem = compile_request(parse_request(generate_request(12, 40, seed=3)))
+
+    assert (problem.num_employees, problem.num_shifts) == (12, 40)
+    assert problem.num_preferences == 36
+
+
+def test_captures_are_read_in_arrival_order(tmp_path):
+    recorder = FlightRecorder(tmp_path, threshold=0)
+    for num_shifts in (4, 2):
+        body = orjson.dumps(generate_request(3, num_shifts))
+        scheduler = Scheduler.from_problem(compile_request(parse_request(orjson.loads(body))))
+        result = scheduler.solve_with_stats(1)
+        recorder.record(
+            "/api/optimize", "application/json", body, 0.5, {}, scheduler.problem, result
+        )
+        time.sleep(0.01)
+
+    requests = read_captures(tmp_path)
+
+    assert [len(orjson.loads(r.body)["shifts"]) for r in requests] == [4, 2]
+    assert requests[0].offset == 0.0
+    assert requests[1].offset > 0.0
+
+
+class TestRunLoad:
+    def test_closed_loop(self, server_url: str):
+        requests = [LoadRequest(orjson.dumps(generate_request(3, 6, seed=i))) for i in range(2)]
+
+        samples, elapsed = run_load(server_url, requests, count=6, concurrency=2)
+        report = summarize(samples, elapsed)
+
+        assert report["overall"]["requests"] == 6
+        assert report["overall"]["http_errors"] == 0
+        assert report["overall"]["failures"] == 0
+        assert report["by_cache"]["hit"]["requests"] >= 2
+
+    def test_open_loop_replay_keeps_recorded_spacing(self, server_url: str):
+        body = orjson.dumps(generate_request(3, 6))
+        requests = [LoadRequest(body, offset=0.0), LoadRequest(body, offset=1.0)]
+
+        samples, elapsed = run_load(
+            server_url, requests, count=2, concurrency=2, replay=True, speedup=4
+        )
+
+        assert all(s.status == 200 for s in samples)
+        assert elapsed >= 0.25
+
+    def test_unreachable_server_counts_as_errors(self):
+        requests = [LoadRequest(orjson.dumps(generate_request(2, 2)))]
+
+        samples, elapsed = run_load("http://127.0.0.1:9", requests, count=2, concurrency=1)
+
+        assert summarize(samples, elapsed)["overall"]["http_errors"] == 1.0
@@ -0,0 +1,86 @@
+"""Tests for dumping built models and replaying them offline."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from scheduling.models.employee import Employee
+from scheduling.models.preferences.prefer_shift import PreferShiftPreference
+from scheduling.models.shift import Shift
+from scheduling.replay import main, replay
+from scheduling.solver.export import load_model
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.scheduler import Scheduler
+
+
+def _scheduler() -> Scheduler:
+    base = datetime(2024, 12, 2, 8, 0)
+    shifts = [
+        Shift(
+            id=f"shift{i}",
+            name=f"Shift {i}",
+            start_time=base + timedelta(days=i),
+            end_time=base + timedelta(days=i, hours=6),
+            required_abilities=["waiter"],
+        )
+        for i in range(3)
+    ]
+    employees = [
+        Employee(
+            id="alice",
+            name="Alice",
+            abilities=["waiter"],
+            preferences=[PreferShiftPreference(shift_id="shift1")],
+        ),
+        Employee(id="bob", name="Bob", abilities=["waiter"]),
+    ]
+    return Scheduler(employees, shifts)
+
+
+@pytest.fixture
+def dump_path(tmp_path) -> str:
+    path = str(tmp_path / "model.zip")
+    _scheduler().solve_with_stats(max_solutions=5, options=SolverOptions(dump_path=path))
+    return path
+
+
+class TestModelExport:
+    def test_dump_keeps_id_mappings_and_parameters(self, dump_path: str):
+        dump = load_model(dump_path)
+
+        assert dump.shift_ids == ["shift0", "shift1", "shift2"]
+        assert dump.employee_ids == ["alice", "bob"]
+        assert len(dump.assign_variables) == 6
+        assert dump.max_solutions == 5
+        assert "enumerate_all_solutions: true" in dump.parameters
+
+    def test_replay_reproduces_the_solve(self, dump_path: str):
+        expected = _scheduler().solve_with_stats(max_solutions=5)
+
+        result = replay(load_model(dump_path))
+
+        assert result.stats.status == expected.stats.status
+        assert result.stats.objective_value == expected.stats.objective_value
+        assert result.assignments["shift1"] == "alice"
+        assert set(result.assignments) == {"shift0", "shift1", "shift2"}
+
+    def test_replay_overrides_parameters(self, dump_path: str):
+        result = replay(load_model(dump_path), ["num_workers: 2"], max_solutions=1)
+
+        assert "num_workers: 2" in result.parameters
+        assert result.stats.num_solutions == 1
+
+    def test_invalid_override_is_rejected(self, dump_path: str):
+        with pytest.raises(ValueError, match="not_a_parameter"):
+            replay(load_model(dump_path), ["not_a_parameter: 1"])
+
+    def test_command_writes_json_result(self, dump_path: str, tmp_path):
+        output = tmp_path / "result.json"
+
+        code = main([dump_path, "--workers", "1", "--time-limit", "5", "--output", str(output)])
+
+        assert code == 0
+        data = json.loads(output.read_text())
+        assert data["stats"]["status"] == "optimal"
+        assert data["assignments"]["shift1"] == "alice"
@@ -0,0 +1,117 @@
+"""Tests for the plain-text and TSV schedule output."""
+
+import io
+from datetime import datetime, timedelta
+
+from scheduling.models.employee import Employee
+from scheduling.models.shift import Shift
+from scheduling.models.solution import Solution
+from scheduling.printer import TSV_HEADER, print_input_summary, print_solutions
+
+DAY = datetime(2024, 12, 25)
+
+
+def _problem() -> tuple[list[Employee], list[Shift], list[Solution]]:
+    employees = [
+        Employee(id="alice", name="Alice", abilities=["bartender"]),
+        Employee(id="bob", name="Bob", abilities=["bartender", "waiter"]),
+    ]
+    shifts = [
+        Shift(
+            id=f"s{i}",
+            name=f"Shift {i}",
+            start_time=DAY + timedelta(hours=12 * i),
+            end_time=DAY + timedelta(hours=12 * i + 6),
+            required_abilities=["bartender"],
+        )
+        for i in range(4)
+    ]
+    solutions = [
+        Solution(assignments={"s0": "alice", "s1": "bob", "s2": "alice", "s3": "bob"}),
+        Solution(assignments={"s0": "alice", "s1": "bob", "s2": "bob", "s3": "alice"}),
+        Solution(assignments={"s0": "bob", "s1": "bob", "s2": "alice", "s3": "bob"}),
+    ]
+    return employees, shifts, solutions
+
+
+def _render(**kwargs) -> list[str]:
+    employees, shifts, solutions = _problem()
+    out = io.StringIO()
+    print_solutions(solutions, employees, shifts, file=out, **kwargs)
+    return out.getvalue().splitlines()
+
+
+class TestPrintSolutions:
+    def test_tsv_has_a_row_per_assignment(self):
+        lines = _render(mode="tsv")
+
+        assert lines[0] == TSV_HEADER
+        assert len(lines) == 1 + 3 * 4
+        assert lines[1].split("\t") == [
+            "1",
+            "s0",
+            "Shift 0",
+            "2024-12-25T00:00:00",
+            "2024-12-25T06:00:00",
+            "alice",
+            "Alice",
+            "bartender",
+        ]
+
+    def test_top_limits_the_solutions(self):
+        lines = _render(mode="tsv", top=1)
+
+        assert {line.split("\t")[0] for line in lines[1:]} == {"1"}
+
+    def test_diff_lists_only_changed_shifts(self):
+        lines = _render(mode="tsv", diff=True)
+
+        rows = [line.split("\t")[:2] for line in lines[1:]]
+        assert rows[4:] == [["2", "s2"], ["2", "s3"], ["3", "s0"]]
+
+    def test_pagination_selects_a_window_of_shifts(self):
+        lines = _render(mode="tsv", page_size=3, page=2)
+
+        assert [line.split("\t")[1] for line in lines[1:]] == ["s3", "s3", "s3"]
+
+    def test_plain_text_includes_metrics(self):
+        lines = _render(mode="plain", top=1)
+
+        assert lines[0] == "Found 3 solution(s)"
+        assert "Solution 1" in lines
+        assert any("Shift 1" in line and "Bob" in line for line in lines)
+        assert lines[-1].strip().startswith("score 0")
+
+    def test_no_solutions(self):
+        employees, shifts, _ = _problem()
+        out = io.StringIO()
+
+        print_solutions([], employees, shifts, mode="plain", file=out)
+
+        assert out.getvalue() == "No solutions found\n"
+
+
+class TestPrintInputSummary:
+    def test_summary_by_day_and_ability(self):
+        employees, shifts, _ = _problem()
+        out = io.StringIO()
+
+        print_input_summary(employees, shifts, mode="tsv", summarize=True, file=out)
+
+        lines = out.getvalue().splitlines()
+        assert lines[0] == "2 employees, 4 shifts"
+        assert lines[1:4] == [
+            "day\tshifts\thours\trequired",
+            "2024-12-25\t2\t12\tbartender: 2",
+            "2024-12-26\t2\t12\tbartender: 2",
+        ]
+        assert lines[4:] == ["ability\temployees\tshifts", "bartender\t2\t4", "waiter\t1\t0"]
+
+    def test_small_inputs_are_listed(self):
+        employees, shifts, _ = _problem()
+        out = io.StringIO()
+
+        print_input_summary(employees, shifts, mode="plain", file=out)
+
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 1 + len(employees) + 1 + len(shifts)
@@ -0,0 +1,91 @@
+"""Tests for the solve summary returned alongside solutions."""
+
+from scheduling.models.employee import Employee
+from scheduling.models.preferences.prefer_shift import PreferShiftPreference
+from scheduling.solver.options import SolverOptions
+from scheduling.solver.scheduler import Scheduler, SearchLog
+from tests.conftest import make_shift
+
+
+class TestSolveStats:
+    def test_optimal_solve_reports_objective_and_zero_gap(self):
+        employees = [
+            Employee(
+                id="alice",
+                name="Alice",
+                abilities=["waiter"],
+                preferences=[PreferShiftPreference(shift_id="shift1", is_hard=False)],
+            ),
+            Employee(id="bob", name="Bob", abilities=["waiter"]),
+        ]
+        shifts = [make_shift("shift1", 8, 14, ["waiter"])]
+
+        result = Scheduler(employees=employees, shifts=shifts).solve_with_stats()
+
+        assert result.stats.status == "optimal"
+        assert result.stats.objective_value == 1000
+        assert result.stats.best_objective_bound == 1000
+        assert result.stats.gap == 0.0
+        assert result.stats.num_solutions == len(result.solutions)
+        assert result.stats.hit_time_limit is False
+
+    def test_no_objective_leaves_objective_fields_empty(self):
+        employees = [Employee(id="alice", name="Alice", abilities=["waiter"])]
+        shifts = [make_shift("shift1", 8, 14, ["waiter"])]
+
+        result = Scheduler(employees=employees, shifts=shifts).solve_with_stats()
+
+        assert result.stats.objective_value is None
+        assert result.stats.gap is None
+        assert len(result.solutions) == 1
+
+    def test_infeasible_is_distinguished_from_timeout(self):
+        employees = [Employee(id="alice", name="Alice", abilities=["waiter"])]
+        shifts = [make_shift("shift1", 8, 14, ["waiter"]), make_shift("shift2", 10, 16, ["waiter"])]
+
+        result = Scheduler(employees=employees, shifts=shifts).solve_with_stats()
+
+        assert result.solutions == []
+        assert result.stats.status == "infeasible"
+        assert result.stats.hit_time_limit is False
+
+    def test_stopping_at_max_solutions_is_not_a_timeout(self):
+        employees = [
+            Employee(id="alice", name="Alice", abilities=["waiter"]),
+            Employee(id="bob", name="Bob", abilities=["waiter"]),
+            Employee(id="carol", name="Carol", abilities=["waiter"]),
+        ]
+        shifts = [make_shift("shift1", 8, 14, ["waiter"])]
+
+        result = Scheduler(employees=employees, shifts=shifts).solve_with_stats(max_solutions=1)
+
+        assert result.stats.num_solutions == 1
+        assert result.stats.hit_time_limit is False
+
+
+class TestSolveTrace:
+    def test_slow_solve_returns_search_log_and_model_stats(self):
+        employees = [Employee(id="alice", name="Alice", abilities=["waiter"])]
+        scheduler = Scheduler(employees=employees, shifts=[make_shift("shift1", 8, 14, ["waiter"])])
+
+        result = scheduler.solve_with_stats(options=SolverOptions(trace_threshold=0))
+
+        assert result.trace is not None
+        assert any("CP-SAT" in line for line in result.trace.search_log)
+        assert "#Variables" in result.trace.model_stats
+        assert "log_search_progress: true" in result.trace.parameters
+
+    def test_fast_solve_has_no_trace(self):
+        employees = [Employee(id="alice", name="Alice", abilities=["waiter"])]
+        scheduler = Scheduler(employees=employees, shifts=[make_shift("shift1", 8, 14, ["waiter"])])
+
+        assert scheduler.solve_with_stats(options=SolverOptions(trace_threshold=60)).trace is None
+        assert scheduler.solve_with_stats().trace is None
+
+    def test_long_search_log_keeps_both_ends(self):
+        log = SearchLog(lines=2)
+        for i in range(7):
+            log.append(str(i))
+
+        assert log.lines == ["0", "1", "5", "6"]
+        assert log.dropped == 3
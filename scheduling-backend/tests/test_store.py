@@ -0,0 +1,98 @@
+"""Tests for the stores shared by the API workers."""
+
+import multiprocessing
+import time
+
+import pytest
+
+from scheduling.api.store import MemoryStore, SqliteStore, Store, open_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = MemoryStore() if request.param == "memory" else SqliteStore(tmp_path / "store.db")
+    yield store
+    store.close()
+
+
+def _claim(path: str, key: str, claimed) -> None:
+    if SqliteStore(path).add("jobs", key, b"worker"):
+        claimed.put(key)
+
+
+class TestStore:
+    def test_put_and_get(self, store: Store):
+        store.put("results", "a", b"1")
+        store.put("results", "a", b"2")
+
+        assert store.get("results", "a") == b"2"
+        assert store.get("results", "b") is None
+        assert store.get("jobs", "a") is None
+
+    def test_expired_entries_are_missing(self, store: Store):
+        store.put("results", "a", b"1", ttl=0.05)
+        store.put("results", "b", b"2")
+        time.sleep(0.1)
+
+        assert store.get("results", "a") is None
+        assert store.keys("results") == ["b"]
+
+    def test_add_only_stores_missing_keys(self, store: Store):
+        assert store.add("jobs", "a", b"1")
+        assert not store.add("jobs", "a", b"2")
+        assert store.get("jobs", "a") == b"1"
+
+        store.put("jobs", "b", b"1", ttl=0.05)
+        time.sleep(0.1)
+        assert store.add("jobs", "b", b"2")
+        assert store.get("jobs", "b") == b"2"
+
+    def test_delete(self, store: Store):
+        store.put("jobs", "a", b"1")
+        store.delete("jobs", "a")
+        store.delete("jobs", "missing")
+
+        assert store.get("jobs", "a") is None
+        assert store.keys("jobs") == []
+
+
+class TestSqliteStore:
+    def test_stores_on_one_file_share_entries(self, tmp_path):
+        first, second = SqliteStore(tmp_path / "store.db"), SqliteStore(tmp_path / "store.db")
+
+        first.put("results", "a", b"1")
+
+        assert second.get("results", "a") == b"1"
+        assert second.keys("results") == ["a"]
+
+    def test_only_one_process_claims_a_key(self, tmp_path):
+        path = str(tmp_path / "store.db")
+        SqliteStore(path).put("jobs", "warm", b"")
+        context = multiprocessing.get_context("spawn")
+        claimed = context.Queue()
+        workers = [
+            context.Process(target=_claim, args=(path, key, claimed))
+            for key in ("shared", "shared", "shared", "other")
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+
+        keys = sorted(claimed.get(timeout=5) for _ in range(2))
+        assert keys == ["other", "shared"]
+        assert claimed.empty()
+
+    def test_uses_write_ahead_logging(self, tmp_path):
+        store = SqliteStore(tmp_path / "store.db")
+        store.put("results", "a", b"1")
+
+        assert (tmp_path / "store.db-wal").exists()
+
+
+def test_open_store(tmp_path):
+    assert isinstance(open_store(None), MemoryStore)
+    assert isinstance(open_store("memory"), MemoryStore)
+    store = open_store(f"sqlite:{tmp_path / 'store.db'}")
+    assert isinstance(store, SqliteStore)
+    assert store.path == str(tmp_path / "store.db")
@@ -0,0 +1,105 @@
+"""Tests for warm starts from similar past schedules."""
+
+from datetime import datetime, timedelta, timezone
+
+from scheduling.models.employee import Employee
+from scheduling.models.shift import Shift
+from scheduling.models.solution import Solution
+from scheduling.solver.problem import UNASSIGNED, compile_problem
+from scheduling.solver.warmstart import (
+    best_warm_start,
+    map_schedule,
+    past_schedule,
+    shift_slots,
+    similarity,
+)
+
+
+def _week(monday: datetime, employees: list[Employee]):
+    shifts = [
+        Shift(
+            id=f"{monday:%m%d}-{day}-{name}",
+            name=name,
+            start_time=monday + timedelta(days=day, hours=hour),
+            end_time=monday + timedelta(days=day, hours=hour + 6),
+            required_abilities=[ability],
+        )
+        for day in range(3)
+        for name, hour, ability in (("am", 8, "waiter"), ("pm", 16, "bartender"))
+    ]
+    return compile_problem(employees, shifts)
+
+
+def _employees(*ids: str) -> list[Employee]:
+    return [
+        Employee(id=employee_id, name=employee_id, abilities=["waiter", "bartender"])
+        for employee_id in ids
+    ]
+
+
+def _solved(problem, pattern: list[str]) -> Solution:
+    return Solution(assignments=dict(zip(problem.shift_ids, pattern, strict=True)))
+
+
+MONDAY = datetime(2024, 12, 2)
+
+
+def test_slots_name_weekday_time_duration_and_abilities():
+    problem = _week(MONDAY, _employees("alice"))
+
+    assert shift_slots(problem)[:2] == ["0 28800 21600 waiter", "0 57600 21600 bartender"]
+
+
+def test_slots_use_local_time():
+    local = datetime(2024, 12, 2, 23, 0, tzinfo=timezone(timedelta(hours=-5)))
+    shift = Shift(
+        id="late",
+        name="Late",
+        start_time=local,
+        end_time=local + timedelta(hours=2),
+        required_abilities=["waiter"],
+    )
+
+    problem = compile_problem(_employees("alice"), [shift])
+
+    assert shift_slots(problem) == ["0 82800 7200 waiter"]
+
+
+def test_past_week_maps_onto_new_shift_ids():
+    last_week = _week(MONDAY, _employees("alice", "bob"))
+    pattern = ["alice", "bob", "bob", "alice", "alice", "bob"]
+    past = past_schedule(last_week, _solved(last_week, pattern))
+    this_week = _week(MONDAY + timedelta(days=7), _employees("alice", "bob"))
+
+    hint = map_schedule(past, this_week, shift_slots(this_week))
+
+    assert this_week.decode_assignments(hint) == dict(
+        zip(this_week.shift_ids, pattern, strict=True)
+    )
+    assert similarity(past, this_week, shift_slots(this_week)) == 1.0
+
+
+def test_departed_and_unqualified_employees_are_not_hinted():
+    last_week = _week(MONDAY, _employees("alice", "bob"))
+    past = past_schedule(
+        last_week, _solved(last_week, ["alice", "bob", "bob", "alice", "alice", "bob"])
+    )
+    carol = Employee(id="carol", name="carol", abilities=["waiter", "bartender"])
+    alice = Employee(id="alice", name="alice", abilities=["waiter"])
+    this_week = _week(MONDAY + timedelta(days=7), [alice, carol])
+
+    hint = map_schedule(past, this_week, shift_slots(this_week))
+
+    # Only alice's morning (waiter) shifts carry over; bob left and alice no longer tends bar.
+    assert hint.tolist() == [0, UNASSIGNED, UNASSIGNED, UNASSIGNED, 0, UNASSIGNED]
+
+
+def test_least_similar_schedules_are_ignored():
+    last_week = _week(MONDAY, _employees("alice", "bob"))
+    past = past_schedule(last_week, _solved(last_week, ["alice", "bob"] * 3))
+    other_venue = _week(MONDAY + timedelta(hours=3), _employees("dave", "erin"))
+
+    assert best_warm_start([past], other_venue, min_similarity=0.5) is None
+    warm_start = best_warm_start([past], _week(MONDAY, _employees("alice", "bob")), 0.5)
+    assert warm_start is not None
+    assert warm_start.hinted_shifts == 6